@@ -0,0 +1,71 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-06-01                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Time to convert one million BD-09 points to WGS84 one at a time     #
+# versus in one vectorized pass, and accuracy of the GCJ-02 inverse.  #
+# Run from the project root: python -m benchmarks.bench_coordutils    #
+# =================================================================== #
+import time
+import numpy as np
+
+from src.common.locTool.coordutils import CoordTransformer
+
+POINT_NUM = 1000000
+
+rng = np.random.default_rng(0)
+lng = rng.uniform(100.0, 122.0, POINT_NUM)
+lat = rng.uniform(20.0, 40.0, POINT_NUM)
+
+# ====================
+# 1.逐点转换
+# ====================
+print("=" * 50)
+print("1.逐点转换")
+print("=" * 50)
+start_time = time.time()
+scalar = [CoordTransformer(x, y) for x, y in zip(lng.tolist(), lat.tolist())]
+scalar_lng = np.array([item.res_lng for item in scalar])
+scalar_lat = np.array([item.res_lat for item in scalar])
+scalar_time = time.time() - start_time
+print("完成'逐点转换', %d个坐标, 用时%.3fs" % (POINT_NUM, scalar_time), end="\n\n")
+
+# ====================
+# 2.向量化转换
+# ====================
+print("=" * 50)
+print("2.向量化转换")
+print("=" * 50)
+start_time = time.time()
+vector_lng, vector_lat = CoordTransformer.bd09_to_wgs84(lng, lat)
+vector_time = time.time() - start_time
+print(
+    "完成'向量化转换', 用时%.3fs, 加速比%.0fx, 与逐点转换的最大差异%.1e度" % (
+        vector_time, scalar_time / vector_time, max(
+            np.abs(vector_lng - scalar_lng).max(), np.abs(vector_lat - scalar_lat).max()
+        )
+    )
+)
+# 完整数据集(12个城市约36000条房源)的转换时间
+start_time = time.time()
+CoordTransformer.bd09_to_wgs84(lng[:36000], lat[:36000])
+print("转换36000个坐标(完整数据集)用时%.1fms" % ((time.time() - start_time) * 1000), end="\n\n")
+
+# ====================
+# 3.GCJ-02反算精度
+# ====================
+# 将反算得到的WGS84坐标重新加上偏移量，与原始的GCJ-02坐标比较(1度约111km)
+print("=" * 50)
+print("3.GCJ-02反算精度")
+print("=" * 50)
+gcj_lng, gcj_lat = CoordTransformer.bd09_to_gcj02(lng, lat)
+for iterations in [1, 2, 3]:
+    start_time = time.time()
+    wgs_lng, wgs_lat = CoordTransformer.gcj02_to_wgs84(gcj_lng, gcj_lat, iterations)
+    elapsed = time.time() - start_time
+    back_lng, back_lat = CoordTransformer.wgs84_to_gcj02(wgs_lng, wgs_lat)
+    error = np.hypot(back_lng - gcj_lng, back_lat - gcj_lat).max() * 111000
+    print("迭代%d次: 用时%.3fs, 最大误差%.2em" % (iterations, elapsed, error))
@@ -0,0 +1,99 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-05-20                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Offline benchmark of the synchronous and asyncio crawl modes and    #
+# the multi-city scheduler against local stand-in servers.            #
+# Run from the project root: python -m benchmarks.bench_crawler       #
+# =================================================================== #
+import os
+import glob
+import time
+import tempfile
+from contextlib import ExitStack
+
+from src.common.infoTool.const import CONST_TABLE
+from benchmarks.stubserver import ListingStubServer
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+from src.modules.datapreparation.crawlscheduler import MultiCityCrawlScheduler
+
+PAGE_NUM = 50               # 与真实站点相同的页数
+LATENCY = 0.2               # 模拟的服务器响应时间(秒)
+MULTI_LATENCY = 1.0         # 多城市调度时模拟的服务器响应时间(秒)
+RATE = 50                   # 对站点的最大请求速率(次/秒)
+
+with ListingStubServer(latency=LATENCY) as server:
+
+    # ====================
+    # 1.同步模式
+    # ====================
+    print("=" * 50)
+    print("1.同步模式")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as save_path:
+        start_time = time.time()
+        HousingDataSpider(
+            city="CD", base_url=server.base_url, save_path=save_path,
+            rate=RATE, page_num=PAGE_NUM, max_retry=3,
+        )
+        sync_time = time.time() - start_time
+        saved = len(glob.glob(os.path.join(save_path, "CD_htmls", "*.html")))
+    print("完成'同步模式', 保存%d页, 用时%.3fs" % (saved, sync_time), end="\n\n")
+
+    # ====================
+    # 2.异步模式
+    # ====================
+    for concurrency in [2, 4, 8, 16]:
+        print("=" * 50)
+        print("2.异步模式(concurrency=%d)" % concurrency)
+        print("=" * 50)
+        with tempfile.TemporaryDirectory() as save_path:
+            start_time = time.time()
+            HousingDataSpider(
+                city="CD", base_url=server.base_url, save_path=save_path,
+                rate=RATE, page_num=PAGE_NUM, max_retry=3,
+                is_async=True, concurrency=concurrency,
+            )
+            async_time = time.time() - start_time
+            saved = len(glob.glob(os.path.join(save_path, "CD_htmls", "*.html")))
+        print(
+            "完成'异步模式', 保存%d页, 用时%.3fs, 加速比%.2fx" %
+            (saved, async_time, sync_time / async_time), end="\n\n"
+        )
+
+# ====================
+# 3.多城市并行调度
+# ====================
+# 每个城市使用一个独立的本地服务器，模拟58同城的不同子域名
+# 所有服务器与爬虫运行在同一个进程中，延迟设得更接近真实站点，
+# 避免本地解析的CPU开销掩盖网络等待
+print("=" * 50)
+print("3.多城市并行调度")
+print("=" * 50)
+with ExitStack() as stack:
+    base_urls = {
+        city: stack.enter_context(ListingStubServer(latency=MULTI_LATENCY)).base_url
+        for city in CONST_TABLE["URL"].keys()
+    }
+    with tempfile.TemporaryDirectory() as save_path:
+        start_time = time.time()
+        MultiCityCrawlScheduler(
+            cities=["CD"], base_urls=base_urls, save_path=save_path,
+            rate=RATE, page_num=PAGE_NUM, max_retry=3, concurrency=8,
+        ).run()
+        single_time = time.time() - start_time
+    with tempfile.TemporaryDirectory() as save_path:
+        start_time = time.time()
+        MultiCityCrawlScheduler(
+            base_urls=base_urls, save_path=save_path, rate=RATE,
+            page_num=PAGE_NUM, max_retry=3, concurrency=8,
+            global_concurrency=96,
+        ).run()
+        all_time = time.time() - start_time
+print(
+    "完成'多城市并行调度', 单个城市用时%.3fs, %d个城市用时%.3fs" %
+    (single_time, len(base_urls), all_time), end="\n\n"
+)
@@ -0,0 +1,60 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-06-06                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Time of loading one column (unitPrice) of every city: full csv      #
+# parsing versus column projection on the columnar files.             #
+# Run from the project root: python -m benchmarks.bench_datasetio     #
+# =================================================================== #
+import os
+import time
+import pandas as pd
+
+from src.common.infoTool.const import CONST_TABLE
+from src.common.fileTool.datasetio import DatasetIO
+
+REPEAT = 5
+PATTERN = "row_data/%s_housing_data"
+cities = list(CONST_TABLE["CITY"].keys())
+
+# ------ 第一次读取时由csv转换为列式存储，不计入用时 ------ #
+for city in cities:
+    DatasetIO.resolvePath(PATTERN % city)
+csv_size = sum(os.path.getsize(DatasetIO.getPath(PATTERN % city, "csv")) for city in cities)
+parquet_size = sum(os.path.getsize(DatasetIO.resolvePath(PATTERN % city)) for city in cities)
+print("csv: %.1fMB, parquet: %.1fMB" % (csv_size / 2 ** 20, parquet_size / 2 ** 20), end="\n\n")
+
+# ====================
+# 1.读取全部csv
+# ====================
+print("=" * 50)
+print("1.读取全部csv")
+print("=" * 50)
+start_time = time.time()
+for _ in range(REPEAT):
+    expected = pd.concat([
+        pd.read_csv(DatasetIO.getPath(PATTERN % city, "csv"))["unitPrice"]
+        for city in cities
+    ], ignore_index=True)
+csv_time = (time.time() - start_time) / REPEAT
+print("完成'读取全部csv', %d行, 用时%.3fs" % (len(expected), csv_time), end="\n\n")
+
+# ====================
+# 2.列式存储只读取unitPrice
+# ====================
+print("=" * 50)
+print("2.列式存储只读取unitPrice")
+print("=" * 50)
+start_time = time.time()
+for _ in range(REPEAT):
+    result = DatasetIO.loadCities(PATTERN, columns=["unitPrice"], cities=cities)
+column_time = (time.time() - start_time) / REPEAT
+print(
+    "完成'列式存储只读取unitPrice', %d行, 用时%.3fs, 加速比%.0fx, 结果一致: %s" % (
+        len(result), column_time, csv_time / column_time,
+        result["unitPrice"].equals(expected)
+    )
+)
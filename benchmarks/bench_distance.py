@@ -0,0 +1,73 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-06-02                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Time of the distance-to-city-centre step on all crawled listings:   #
+# the old per-row geopy loop versus the vectorized transformer, and   #
+# the accuracy of both vectorized modes against geopy.                #
+# Run from the project root: python -m benchmarks.bench_distance      #
+# =================================================================== #
+import glob
+import time
+import numpy as np
+import pandas as pd
+from geopy.distance import geodesic
+
+from src.common.fileTool.filesio import FilesIO
+from src.common.infoTool.const import CONST_TABLE
+from src.modules.datapreparation.pipeline58 import DistanceToCityCenter
+
+REPEAT = 2      # 行数据集约1.6万条，重复拼接以接近完整数据集(约3.6万条)的规模
+
+frames = []
+for path in sorted(glob.glob(FilesIO.getDataset("row_data/*_housing_data.csv"))):
+    frame = pd.read_csv(path)
+    center = CONST_TABLE["CITY_CENTER"][path.split("/")[-1][:2]]
+    frame["centerLat"], frame["centerLng"] = center["LAT"], center["LNG"]
+    frames.append(frame)
+data = pd.concat(frames * REPEAT, ignore_index=True).dropna(
+    subset=["latitude", "longitude"]
+).reset_index(drop=True)
+print("共%d条房源" % len(data), end="\n\n")
+
+# ====================
+# 1.逐行调用geopy
+# ====================
+print("=" * 50)
+print("1.逐行调用geopy")
+print("=" * 50)
+X = data.copy()
+start_time = time.time()
+for i in range(len(X)):
+    loc = (X.loc[i, "latitude"], X.loc[i, "longitude"])
+    X.loc[i, "distance"] = geodesic(
+        loc, (X.loc[i, "centerLat"], X.loc[i, "centerLng"])
+    ).kilometers
+loop_time = time.time() - start_time
+expected = X["distance"].to_numpy()
+print("完成'逐行调用geopy', 用时%.3fs" % loop_time, end="\n\n")
+
+# ====================
+# 2.向量化
+# ====================
+for method in ["vincenty", "haversine"]:
+    print("=" * 50)
+    print("2.向量化(%s)" % method)
+    print("=" * 50)
+    X = data.copy()
+    start_time = time.time()
+    # 各城市的市中心不同，作为逐行的参考点广播
+    DistanceToCityCenter(method=method, references={
+        "distance": (X["centerLat"].to_numpy(), X["centerLng"].to_numpy())
+    }).transform(X)
+    vector_time = time.time() - start_time
+    error = np.abs(X["distance"].to_numpy() - expected)
+    print(
+        "完成'%s', 用时%.3fs, 加速比%.0fx, 最大误差%.3em, 最大相对误差%.3f%%" % (
+            method, vector_time, loop_time / vector_time, error.max() * 1000,
+            100 * (error / np.maximum(expected, 1e-9)).max()
+        ), end="\n\n"
+    )
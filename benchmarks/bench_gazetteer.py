@@ -0,0 +1,98 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-06-11                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Build time, lookup time, hit rate and coordinate error of the       #
+# offline gazetteer, for respelled known addresses and for listings   #
+# held out of the index (new listings).                               #
+# Run from the project root: python -m benchmarks.bench_gazetteer     #
+# =================================================================== #
+import re
+import time
+import numpy as np
+import pandas as pd
+
+from src.common.infoTool.const import CONST_TABLE
+from src.common.fileTool.datasetio import DatasetIO
+from src.common.locTool.gazetteer import Gazetteer
+
+HOLDOUT = 0.1           # 不放入查找表的房源比例，模拟新房源
+
+rng = np.random.default_rng(0)
+entries = DatasetIO.loadCities(columns=["houseLoc", "longitude", "latitude"]).dropna()
+entries["city"] = entries["city"].map(CONST_TABLE["CITY"])
+is_holdout = rng.random(len(entries)) < HOLDOUT
+indexed, holdout = entries[~is_holdout], entries[is_holdout]
+
+
+def respell(address: str) -> str:
+
+    """
+    同一地址的另一种写法：去掉括号中的期数、分区，括号与数字改为全角，插入空格
+    """
+
+    address = re.sub(r"\(.*?\)", "", address)
+    address = address.translate(str.maketrans("()0123456789", "（）０１２３４５６７８９"))
+    return address[:2] + " " + address[2:]
+
+
+def evaluate(gazetteer: Gazetteer, queries: pd.DataFrame) -> tuple[float, float, float]:
+
+    """
+    依次查询，返回(每次查询的平均用时, 命中率, 命中时坐标误差的中位数(米))
+    """
+
+    matches = []
+    start_time = time.time()
+    for city, address in zip(queries["city"], queries["houseLoc"]):
+        matches.append(gazetteer.match(city, address))
+    lookup_time = (time.time() - start_time) / len(queries)
+    is_hit = np.array([match is not None for match in matches])
+    lng = np.array([match[0] for match in matches if match is not None])
+    lat = np.array([match[1] for match in matches if match is not None])
+    error = np.hypot(
+        (lng - queries["longitude"].to_numpy()[is_hit]) * 111320 * np.cos(np.radians(lat)),
+        (lat - queries["latitude"].to_numpy()[is_hit]) * 110540
+    )
+    return lookup_time, is_hit.mean(), np.median(error) if len(error) else np.nan
+
+
+# ====================
+# 1.构建查找表
+# ====================
+print("=" * 50)
+print("1.构建查找表")
+print("=" * 50)
+start_time = time.time()
+gazetteer = Gazetteer(indexed)
+print("完成'构建查找表', %d个地址, 用时%.3fs" % (len(gazetteer), time.time() - start_time), end="\n\n")
+
+# ====================
+# 2.已有地址的其他写法
+# ====================
+print("=" * 50)
+print("2.已有地址的其他写法")
+print("=" * 50)
+respelled = indexed.assign(houseLoc=indexed["houseLoc"].map(respell))
+lookup_time, hit_rate, error = evaluate(gazetteer, respelled)
+print(
+    "完成'已有地址的其他写法', %d次查询, 命中率%.1f%%, 误差中位数%.0fm, 每次查询用时%.3fms" % (
+        len(respelled), 100 * hit_rate, error, 1000 * lookup_time
+    ), end="\n\n"
+)
+
+# ====================
+# 3.新房源
+# ====================
+print("=" * 50)
+print("3.新房源")
+print("=" * 50)
+lookup_time, hit_rate, error = evaluate(gazetteer, holdout)
+print(
+    "完成'新房源', %d次查询, 命中率%.1f%%, 误差中位数%.0fm, 每次查询用时%.3fms" % (
+        len(holdout), 100 * hit_rate, error, 1000 * lookup_time
+    ), end="\n\n"
+)
@@ -0,0 +1,84 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-05-25                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Disk usage and read time of a full 12-city archive stored as raw    #
+# html files versus the compressed page store.                        #
+# Run from the project root: python -m benchmarks.bench_pagestore     #
+# =================================================================== #
+import os
+import time
+import tempfile
+
+from src.common.infoTool.const import CONST_TABLE
+from src.common.fileTool.pagestore import PageStore
+from benchmarks.stubserver import ListingStubServer
+
+PAGE_NUM = 50
+
+
+def folder_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+# ------ 每个城市使用不同的随机种子，保证各城市的页面内容不同 ------ #
+archive = {}
+for seed, city in enumerate(CONST_TABLE["URL"].keys()):
+    server = ListingStubServer(seed=seed)
+    archive[city] = {
+        page: server.build_page(page) for page in range(1, PAGE_NUM + 1)
+    }
+    server.stop()
+
+with tempfile.TemporaryDirectory() as raw_path, \
+     tempfile.TemporaryDirectory() as store_path:
+
+    # ====================
+    # 1.写入
+    # ====================
+    print("=" * 50)
+    print("1.写入")
+    print("=" * 50)
+    raw_store = PageStore(raw_path)
+    for city, pages in archive.items():
+        os.makedirs(os.path.join(raw_path, "%s_htmls" % city))
+        for page, text in pages.items():
+            with open(raw_store.legacy_path(city, page), "w", encoding="utf-8") as f:
+                f.write(text)
+    store = PageStore(store_path)
+    for city, pages in archive.items():
+        for page, text in pages.items():
+            store.put(city, page, text)
+    # 重复获取内容未变化的页面，只更新索引
+    for page, text in archive["CD"].items():
+        store.put("CD", page, text)
+    raw_size, store_size = folder_size(raw_path), folder_size(store_path)
+    print(
+        "html文件: %.2fMB, 页面仓库: %.2fMB, 压缩比%.1fx" %
+        (raw_size / 2**20, store_size / 2**20, raw_size / store_size),
+        end="\n\n"
+    )
+
+    # ====================
+    # 2.读取
+    # ====================
+    # 冷读取时耗时主要取决于从磁盘读取的字节数，即上面的占用空间
+    print("=" * 50)
+    print("2.读取")
+    print("=" * 50)
+    for name, path in [("html文件", raw_path), ("页面仓库", store_path)]:
+        reader = PageStore(path)
+        start_time = time.time()
+        for city, pages in archive.items():
+            for page in pages:
+                reader.get(city, page)
+        end_time = time.time()
+        print("%s: 读取%d页用时%.3fs" % (
+            name, PAGE_NUM * len(archive), end_time - start_time
+        ))
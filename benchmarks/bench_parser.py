@@ -0,0 +1,67 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-05-28                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Time to re-parse a full 12-city archive sequentially and with the   #
+# process pool.                                                       #
+# Run from the project root: python -m benchmarks.bench_parser        #
+# =================================================================== #
+import os
+import time
+import tempfile
+
+from src.common.infoTool.const import CONST_TABLE
+from src.common.fileTool.pagestore import PageStore
+from benchmarks.stubserver import ListingStubServer
+from src.modules.datapreparation.listingextractor import ListingExtractor
+
+PAGE_NUM = 50
+
+if __name__ == "__main__":
+
+    with tempfile.TemporaryDirectory() as root_path:
+
+        # ------ 生成12个城市的页面仓库 ------ #
+        store = PageStore(root_path)
+        for seed, city in enumerate(CONST_TABLE["URL"].keys()):
+            server = ListingStubServer(seed=seed)
+            for page in range(1, PAGE_NUM + 1):
+                store.put(city, page, server.build_page(page))
+            server.stop()
+        cities = list(CONST_TABLE["URL"].keys())
+
+        # ====================
+        # 1.单进程
+        # ====================
+        print("=" * 50)
+        print("1.单进程")
+        print("=" * 50)
+        start_time = time.time()
+        listings = 0
+        for city in cities:
+            for page in range(1, PAGE_NUM + 1):
+                listings += len(ListingExtractor.extract_page(root_path, city, page))
+        single_time = time.time() - start_time
+        print("完成'单进程', %d条房源, 用时%.3fs" % (listings, single_time), end="\n\n")
+
+        # ====================
+        # 2.多进程
+        # ====================
+        for workers in sorted({2, 4, os.cpu_count()}):
+            print("=" * 50)
+            print("2.多进程(workers=%d)" % workers)
+            print("=" * 50)
+            start_time = time.time()
+            records = ListingExtractor.extract_cities(
+                cities, workers=workers, root_path=root_path, page_num=PAGE_NUM
+            )
+            multi_time = time.time() - start_time
+            print(
+                "完成'多进程', %d条房源, 用时%.3fs, 加速比%.2fx" % (
+                    sum(len(item) for item in records.values()),
+                    multi_time, single_time / multi_time
+                ), end="\n\n"
+            )
@@ -0,0 +1,90 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-06-09                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# End-to-end time of one city with the stages run one after another   #
+# versus streamed through bounded queues, against the local stand-in  #
+# listing server and a stand-in Baidu session with fixed latency.     #
+# Run from the project root: python -m benchmarks.bench_pipeline      #
+# =================================================================== #
+import os
+import time
+import zlib
+import tempfile
+import pandas as pd
+
+from src.common.netTool.session import SessionPool
+from benchmarks.stubserver import ListingStubServer
+from src.common.locTool.geocache import GeocodeCache
+from src.common.locTool.poicache import POICache
+from src.common.locTool.gazetteer import Gazetteer
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+from src.modules.datapreparation.streampipeline import StreamingHousingPipeline
+
+PAGE_NUM = 50
+LISTINGS_PER_PAGE = 20
+PAGE_LATENCY = 0.2          # 模拟的页面响应时间(秒)
+API_LATENCY = 0.02          # 模拟的百度地图接口响应时间(秒)
+CONCURRENCY = 4             # 爬取页面的并发数
+
+
+class StubResponse:
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+
+    def json(self) -> dict:
+        return self.data
+
+
+class BaiduStubSession:
+
+    """
+    代替百度地图接口的会话，地址解析返回由地址决定的坐标(落在约200个不同的位置)，
+    周边设施检索返回由位置决定的数量
+    """
+
+    def get(self, url: str, params: dict) -> StubResponse:
+        time.sleep(API_LATENCY)
+        if "geocoding" in url:
+            h = zlib.crc32(params["address"].encode("utf-8")) % 200
+            return StubResponse({"status": 0, "result": {"location": {
+                "lng": 104.0 + (h % 20) * 0.01, "lat": 30.6 + (h // 20) * 0.01
+            }}})
+        h = zlib.crc32((params["location"] + params["query"]).encode("utf-8"))
+        return StubResponse({"status": 0, "results": [{}] * (h % 11)})
+
+
+SessionPool._sessions["baidu"] = BaiduStubSession()
+# 模拟的房源地址不在现有数据集中，使用空的离线查找表
+Gazetteer._default = Gazetteer(pd.DataFrame(columns=Gazetteer.COLUMNS))
+
+with ListingStubServer(latency=PAGE_LATENCY, listings_per_page=LISTINGS_PER_PAGE) as server:
+    for index, (name, is_streaming) in enumerate([("依次运行", False), ("流式管道", True)]):
+        print("=" * 50)
+        print("%d.%s" % (index + 1, name))
+        print("=" * 50)
+        with tempfile.TemporaryDirectory() as save_path:
+
+            # ------ 每次都使用空的地址解析与周边设施缓存 ------ #
+            GeocodeCache._default = GeocodeCache(os.path.join(save_path, "geocode.sqlite"))
+            POICache._default = POICache(os.path.join(save_path, "poi.sqlite"))
+            start_time = time.time()
+            df = StreamingHousingPipeline(
+                city="CD", spider=HousingDataSpider(
+                    city="CD", base_url=server.base_url, save_path=save_path,
+                    rate=50, page_num=PAGE_NUM, max_retry=3, is_start=False,
+                    concurrency=CONCURRENCY
+                ), is_async=True, is_poi_cache=True, is_incremental=False,
+                is_streaming=is_streaming, is_save=False
+            ).run()
+            total_time = time.time() - start_time
+            GeocodeCache._default.close()
+            POICache._default.close()
+        print(
+            "完成'%s', %d条房源, 用时%.3fs" % (name, len(df), total_time), end="\n\n"
+        )
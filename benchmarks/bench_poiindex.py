@@ -0,0 +1,72 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-05-30                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Time to fill the five *Around columns of one city from a synthetic  #
+# POI snapshot: per-listing scan versus the KD-tree index.            #
+# Run from the project root: python -m benchmarks.bench_poiindex      #
+# =================================================================== #
+import time
+import numpy as np
+import pandas as pd
+
+from src.common.infoTool.const import CONST_TABLE
+from src.common.locTool.poiindex import POIIndex, EARTH_RADIUS
+
+POI_NUM = 200000
+LISTING_NUM = 3000
+RADIUS = 1000
+
+rng = np.random.default_rng(0)
+center = CONST_TABLE["CITY_CENTER"]["CD"]
+poi = pd.DataFrame({
+    "category": rng.choice(list(CONST_TABLE["POI"].values()), POI_NUM),
+    "lat": center["LAT"] + rng.normal(0, 0.1, POI_NUM),
+    "lng": center["LNG"] + rng.normal(0, 0.1, POI_NUM),
+})
+lat = center["LAT"] + rng.normal(0, 0.08, LISTING_NUM)
+lng = center["LNG"] + rng.normal(0, 0.08, LISTING_NUM)
+
+# ====================
+# 1.逐个房源扫描
+# ====================
+print("=" * 50)
+print("1.逐个房源扫描")
+print("=" * 50)
+start_time = time.time()
+scan = {}
+for column, category in CONST_TABLE["POI"].items():
+    group = poi[poi["category"] == category]
+    poi_lat, poi_lng = np.radians(group["lat"].to_numpy()), np.radians(group["lng"].to_numpy())
+    counts = []
+    for i in range(LISTING_NUM):
+        a = np.sin((poi_lat - np.radians(lat[i])) / 2) ** 2 + \
+            np.cos(np.radians(lat[i])) * np.cos(poi_lat) * \
+            np.sin((poi_lng - np.radians(lng[i])) / 2) ** 2
+        counts.append(np.sum(2 * EARTH_RADIUS * np.arcsin(np.sqrt(a)) <= RADIUS))
+    scan[column] = np.array(counts)
+scan_time = time.time() - start_time
+print("完成'逐个扫描', 用时%.3fs" % scan_time, end="\n\n")
+
+# ====================
+# 2.KD树索引
+# ====================
+print("=" * 50)
+print("2.KD树索引")
+print("=" * 50)
+start_time = time.time()
+index = POIIndex(poi)
+build_time = time.time() - start_time
+result = index.count_all(CONST_TABLE["POI"], lat, lng, RADIUS)
+index_time = time.time() - start_time
+mismatch = sum(
+    int(np.sum(result[column] != scan[column])) for column in scan
+)
+print(
+    "完成'KD树索引', 建树%.3fs, 总用时%.3fs, 加速比%.1fx, 不一致%d个" % (
+        build_time, index_time, scan_time / index_time, mismatch
+    )
+)
@@ -0,0 +1,82 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-05-26                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Crawl time with uniformly random proxies versus the health-scored   #
+# proxy pool, when part of the proxies are dead.                      #
+# Run from the project root: python -m benchmarks.bench_proxypool     #
+# =================================================================== #
+import time
+import random
+import socket
+import tempfile
+from contextlib import ExitStack
+
+from src.common.infoTool.proxypool import ProxyPool
+from src.common.netTool.ratelimit import RateLimiter, BackoffPolicy
+from benchmarks.stubserver import ListingStubServer
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+
+PAGE_NUM = 50
+TIMEOUT = 2.0               # 请求超时时间(秒)
+DEAD_NUM = 6                # 失效代理数量
+ALIVE_NUM = 4               # 可用代理数量
+
+
+class UniformProxyChooser:
+
+    """
+    对照组：与原来的方式相同，每次均匀随机选择代理，不记录健康状况
+    """
+
+    def __init__(self, proxies: list[str]) -> None:
+        self.proxies = proxies
+
+    def acquire(self) -> str:
+        return random.choice(self.proxies)
+
+    def report(self, proxy: str, is_success: bool, latency: float=None) -> None:
+        pass
+
+
+with ExitStack() as stack:
+    # ------ 可用的代理：本地服务器可以直接处理代理形式的请求 ------ #
+    alive = [
+        stack.enter_context(ListingStubServer(latency=0.05 * (i + 1)))
+        for i in range(ALIVE_NUM)
+    ]
+    # ------ 失效的代理：接受连接但从不响应，直到请求超时 ------ #
+    dead = []
+    for _ in range(DEAD_NUM):
+        sock = stack.enter_context(socket.socket())
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(128)
+        dead.append(sock)
+    proxies = [
+        "%s:%d" % server._server.server_address[:2] for server in alive
+    ] + ["%s:%d" % sock.getsockname() for sock in dead]
+    # 代理会把请求转发到该地址，本地服务器直接返回页面
+    base_url = "http://listing.test/ershoufang/"
+
+    for name, pool in [
+        ("均匀随机选择", UniformProxyChooser(proxies)),
+        ("ProxyPool", ProxyPool(proxies, cooldown=60)),
+    ]:
+        print("=" * 50)
+        print(name)
+        print("=" * 50)
+        with tempfile.TemporaryDirectory() as save_path:
+            limiter = RateLimiter(
+                rate=100, max_retry=20, backoff=BackoffPolicy(base=0.05)
+            )
+            start_time = time.time()
+            HousingDataSpider(
+                city="CD", base_url=base_url, save_path=save_path,
+                page_num=PAGE_NUM, limiter=limiter, proxy_pool=pool,
+                timeout=TIMEOUT,
+            )
+            end_time = time.time()
+        print("完成'%s', 用时%.3fs" % (name, end_time - start_time), end="\n\n")
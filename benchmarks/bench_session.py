@@ -0,0 +1,41 @@
+# =================================================================== #
+# @Author: Fantasy_Silence                                            #
+# @Time: 2024-05-24                                                   #
+# @IDE: Visual Studio Code & PyCharm                                  #
+# @Python: 3.9.7                                                      #
+# =================================================================== #
+# @Description:                                                       #
+# Offline benchmark of requests/sec with and without the pooled       #
+# keep-alive sessions, against the local stand-in server.             #
+# Run from the project root: python -m benchmarks.bench_session       #
+# =================================================================== #
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from src.common.netTool.session import SessionPool
+from benchmarks.stubserver import ListingStubServer
+
+REQUESTS_NUM = 1000         # 每种情况的请求次数
+THREADS = 8                 # 并发线程数
+
+with ListingStubServer(listings_per_page=5) as server:
+    url = server.base_url
+    session = SessionPool.getSession("benchmark", pool_maxsize=THREADS)
+
+    for threads in [1, THREADS]:
+        for name, get in [("requests.get", requests.get), ("SessionPool", session.get)]:
+            print("=" * 50)
+            print("%s, %d线程" % (name, threads))
+            print("=" * 50)
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(lambda _: get(url).content, range(REQUESTS_NUM)))
+            end_time = time.time()
+            print(
+                "完成%d次请求, 用时%.3fs, %.1f requests/s" % (
+                    REQUESTS_NUM, end_time - start_time,
+                    REQUESTS_NUM / (end_time - start_time)
+                ), end="\n\n"
+            )
+    SessionPool.closeAll()
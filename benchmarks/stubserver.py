@@ -0,0 +1,209 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-20                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A local stand-in HTTP server that serves 58.com-like listing  #
+# pages, used by the benchmarks and tests to run the crawler    #
+# offline. Run from the project root:                           #
+# python -m benchmarks.stubserver                               #
+# ============================================================= #
+import time
+import random
+import threading
+from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# ------ 生成房源时使用的候选值 ------ #
+_DISTRICTS = ["锦江", "青羊", "金牛", "武侯", "成华", "高新"]
+_AREAS = ["春熙路", "天府广场", "九眼桥", "玉林", "建设路", "金融城"]
+_ROADS = ["人民南路", "红星路", "蜀都大道", "一环路", "天府大道", "府青路"]
+_FACING = ["南北", "南", "东南", "东", "西南", "北"]
+_FLOOR = ["低层", "中层", "高层"]
+_TAGS = ["近地铁", "满五年", "满二年", "精装修", "随时看房"]
+
+
+class ListingStubServer:
+
+    """
+    本地房源页面服务器
+    按照58同城二手房页面的结构生成HTML，路径与真实站点保持一致：
+    第1页为/ershoufang/，其余页为/ershoufang/p<n>/
+    可以作为上下文管理器使用，退出时自动关闭
+    """
+
+    def __init__(
+            self, host: str="127.0.0.1", port: int=0, latency: float=0.0,
+            listings_per_page: int=60, seed: int=42
+    ) -> None:
+
+        """
+        host, port: 监听地址，port=0时由系统分配空闲端口
+        latency: 每个请求的模拟网络延迟(秒)
+        listings_per_page: 每页房源数量
+        seed: 随机种子，相同页码总是返回相同的内容
+        """
+
+        self.latency = latency
+        self.listings_per_page = listings_per_page
+        self.seed = seed
+        self.requests_num = 0           # 服务器收到的请求总数
+        self._lock = threading.Lock()
+        self._pages = {}                # 已生成的页面
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+
+    @property
+    def base_url(self) -> str:
+
+        """
+        与CONST_TABLE["URL"]中格式一致的入口地址
+        """
+
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d/ershoufang/" % (host, port)
+
+
+    def start(self) -> "ListingStubServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+
+
+    def __enter__(self) -> "ListingStubServer":
+        return self.start()
+
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+    def build_page(self, page: int) -> str:
+
+        """
+        生成第page页的HTML文本
+        """
+
+        rng = random.Random(self.seed * 100003 + page)
+        listings = []
+        for i in range(self.listings_per_page):
+            area = round(rng.uniform(40, 200), 2)
+            unit_price = rng.randint(8000, 60000)
+            total_price = round(area * unit_price / 10000, 1)
+            floor_type = rng.choice(_FLOOR)
+            tags = "".join(
+                "<span>%s</span>" % tag for tag in rng.sample(_TAGS, 2)
+            )
+            listings.append(
+                '<div class="property"><a>'
+                '<div class="property-image"></div>'
+                '<div class="property-content">'
+                '<div class="property-content-detail"><section>'
+                '<div class="property-content-info">'
+                '<p class="property-content-info-attribute">'
+                '<span>%d</span><span>室</span><span>%d</span><span>厅</span>'
+                '<span>%d</span><span>卫</span></p>'
+                '<p>%.2f㎡</p><p>%s</p><p>%s(共%d层)</p><p>%d年建造</p>'
+                '</div>'
+                '<div class="property-content-info-comm">'
+                '<p>第%d页%d号小区</p>'
+                '<p><span>%s</span><span>%s</span><span>%s</span></p>'
+                '</div>'
+                '<div class="property-content-info">%s</div>'
+                '</section></div>'
+                '<div class="property-price">'
+                '<p><span class="property-price-total-num">%.1f</span>'
+                '<span>万</span></p>'
+                '<p>%d元/㎡</p>'
+                '</div>'
+                '</div></a></div>' % (
+                    rng.randint(1, 5), rng.randint(1, 2), rng.randint(1, 3),
+                    area, rng.choice(_FACING), floor_type,
+                    rng.randint(6, 40), rng.randint(1990, 2022),
+                    page, i, rng.choice(_DISTRICTS), rng.choice(_AREAS),
+                    rng.choice(_ROADS), tags, total_price, unit_price,
+                )
+            )
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            '<title>二手房</title></head><body><section class="list">'
+            + "".join(listings) +
+            '</section></body></html>'
+        )
+
+
+    def page_bytes(self, page: int) -> bytes:
+
+        """
+        第page页编码后的内容，生成一次后缓存，避免服务器自身成为瓶颈
+        """
+
+        with self._lock:
+            if page not in self._pages:
+                self._pages[page] = self.build_page(page).encode("utf-8")
+            return self._pages[page]
+
+
+    def _make_handler(self) -> type:
+
+        """
+        创建绑定到当前服务器实例的请求处理类
+        """
+
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            # HTTP/1.1，支持keep-alive；关闭Nagle算法，避免与延迟确认叠加
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                with stub._lock:
+                    stub.requests_num += 1
+                if stub.latency > 0:
+                    time.sleep(stub.latency)
+
+                # ------ 解析页码 ------ #
+                parts = [p for p in urlparse(self.path).path.split("/") if p]
+                if parts == ["ershoufang"]:
+                    page = 1
+                elif len(parts) == 2 and parts[0] == "ershoufang" and \
+                     parts[1].startswith("p") and parts[1][1:].isdigit():
+                    page = int(parts[1][1:])
+                else:
+                    self.send_error(404)
+                    return
+
+                body = stub.page_bytes(page)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+        return _Handler
+
+
+if __name__ == "__main__":
+
+    with ListingStubServer(latency=0.1) as server:
+        print(server.base_url)
+        input("Press Enter to stop...")
@@ -18,11 +18,16 @@ from sklearn.linear_model import LinearRegression, ElasticNet, SGDRegressor
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.model_selection import KFold, cross_val_score, train_test_split, GridSearchCV
 
-from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
+from src.common.fileTool.datasetcache import ProcessedDataCache
 from src.common.infoTool.const import CONST_TABLE
+from src.common.infoTool.proxypool import ProxyPool
+from src.common.modelTool.modelsio import ModelsIO
 from src.common.modelTool.split import TargetVaribleSplit
 from src.modules.datapreparation.dataparser import HousingDataParser
+from src.modules.datapreparation.crawlscheduler import MultiCityCrawlScheduler
 from src.modules.datapreparation.datacrawler import HousingDataSpider
+from src.modules.datapreparation.streampipeline import StreamingHousingPipeline
 from src.modules.visualization.geo_distribute import DrawGeoDistribution
 from src.modules.datapreparation.pipeline58 import PipeLineFor58HousingData
 from src.common.infoTool.randomIPandHeaders import RandomRequestInfoGenerator
@@ -35,10 +40,20 @@ print("=" * 50)
 print("1.数据爬取与解析")
 print("=" * 50)
 start_time = time.time()
+# MultiCityCrawlScheduler(
+#     cities=list(CONST_TABLE["CITY"].keys()),
+#     headers=RandomRequestInfoGenerator.getHeaders(), proxy_pool=ProxyPool()
+# ).run()
 # for city in CONST_TABLE["CITY"].keys():
-#     proxies, headers = RandomRequestInfoGenerator.get()
-#     HousingDataSpider(city=city, headers=headers, proxies=proxies)
 #     HousingDataParser(city=city)
+# 或者使用流式管道，爬取、解析、地址解析与检索周边设施同时进行
+# for city in CONST_TABLE["CITY"].keys():
+#     StreamingHousingPipeline(
+#         city=city, spider=HousingDataSpider(
+#             city=city, headers=RandomRequestInfoGenerator.getHeaders(),
+#             proxy_pool=ProxyPool(), is_start=False
+#         ), is_async=True
+#     ).run()
 end_time = time.time()
 print(
     "完成'数据爬取与解析', 用时%.3fms" % 
@@ -48,7 +63,7 @@ print(
 # ====================
 # 2.数据可视化(以成都房价为例)
 # ====================
-row_data = pd.read_csv(FilesIO.getDataset("row_data/CD_housing_data.csv"))
+row_data = DatasetIO.loadDataset("row_data/CD_housing_data")
 DrawGeoDistribution("CD").draw(is_show_alone=True, is_show=True)
 
 # ====================
@@ -151,6 +166,10 @@ best_regressor = RandomForestRegressor(
     n_estimators=400, max_features=0.4, max_samples=0.8, criterion="squared_error"
 )
 best_regressor.fit(X_train, y_train)
+# 拟合好的预处理管道与模型一起保存，对新房源打分时只需transform后predict
+ModelsIO.savePipeline(
+    pipe_CD.named_steps["prep"], best_regressor, "rf_regressor_CD.pkl"
+)
 y_pred = best_regressor.predict(X_test)
 fig, ax = plt.subplots(figsize=(10, 5), dpi=100)
 ax.scatter(y_test, y_pred, c="b", alpha=0.5)
@@ -174,16 +193,15 @@ print("=" * 50)
 start_time = time.time()
 train_data = pd.DataFrame()
 test_data = pd.DataFrame()
+# 原始数据与管道配置都没有变化时直接读取缓存的处理结果
+processed_cache = ProcessedDataCache()
 for city in CONST_TABLE["CITY"].keys():
 
-    # ------ 读取数据 ------ #
-    df = pd.read_csv(FilesIO.getDataset(f"row_data/{city}_housing_data.csv"))
-
-    # ------ 处理数据 ------ #
-    pipe_i = Pipeline([
-        ('prep', PipeLineFor58HousingData(city_name=city)),
-    ])
-    df_processed = pipe_i.fit_transform(df)
+    # ------ 读取并处理数据 ------ #
+    df_processed, _ = processed_cache.fit_transform(
+        f"row_data/{city}_housing_data",
+        PipeLineFor58HousingData(city_name=city)
+    )
 
     # ------ 随机选择900条组成新的训练集，剩下的为测试集 ------ #
     df_train = df_processed.sample(n=900, replace=False)
@@ -199,6 +217,7 @@ X_train_balanced, y_train_balanced = pipe_all.fit_transform(train_data)
 X_test_balanced, y_test_balanced = pipe_all.fit_transform(test_data)
 X_train_balanced.fillna(0, inplace=True)
 y_train_balanced.fillna(0, inplace=True)
+print("Processed data cache: %s" % processed_cache.summary())
 end_time = time.time()
 print(
     "完成'重新生成训练集', 用时%.3fms" % 
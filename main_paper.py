@@ -12,7 +12,6 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from xgboost import XGBRegressor
 from xgboost import XGBClassifier
-from sklearn.pipeline import Pipeline
 from sklearn.model_selection import KFold
 from sklearn.metrics import classification_report
 from sklearn.ensemble import RandomForestRegressor
@@ -20,6 +19,7 @@ from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split, ShuffleSplit
 
 from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
 from src.common.modelTool.modelsio import ModelsIO
 from src.common.modelTool.split import TargetVaribleSplit
 from src.modules.evaluation.pr_tradeoff import PRTradeOffCurve
@@ -36,22 +36,19 @@ print("=" * 50)
 print("0.读取数据并处理")
 print("=" * 50)
 start_time = time.time()
-row_data = pd.read_csv(FilesIO.getDataset(
-    "house-prices-advanced-regression-techniques/train.csv"
-))
-pipe = Pipeline([
-    ('prep', PipeLineForPaperHousingData()),
-    ('split', TargetVaribleSplit(target="SalePrice")),
-])
-X_train, X_test, y_train, y_test = train_test_split(
-    *pipe.fit_transform(row_data), test_size=0.3, random_state=42
+row_data = DatasetIO.loadDataset(
+    "house-prices-advanced-regression-techniques/train"
 )
-X_train = X_train.drop(
-    columns=["Exterior1st", "GarageQual", "GarageYrBlt", "1stFlrSF"],
-)
-X_test = X_test.drop(
-    columns=["Exterior1st", "GarageQual", "GarageYrBlt", "1stFlrSF"],
+# 预处理管道只在train.csv上拟合一次，之后的步骤以及test.csv都复用拟合好的状态
+prep = PipeLineForPaperHousingData()
+data_piped = prep.fit_transform(row_data)
+X_train, X_test, y_train, y_test = train_test_split(
+    *TargetVaribleSplit(target="SalePrice").transform(data_piped),
+    test_size=0.3, random_state=42
 )
+cols_dropped_in_paper = ["Exterior1st", "GarageQual", "GarageYrBlt", "1stFlrSF"]
+X_train = X_train.drop(columns=cols_dropped_in_paper)
+X_test = X_test.drop(columns=cols_dropped_in_paper)
 end_time = time.time()
 print(
     "完成'读取数据并处理', 用时%.3fms" % 
@@ -65,7 +62,7 @@ print("=" * 50)
 print("1.计算文中提到的相关系数并绘制目标变量分布")
 print("=" * 50)
 start_time = time.time()
-data_processed = PipeLineForPaperHousingData(is_drop=False).transform(row_data)
+data_processed = PipeLineForPaperHousingData(is_drop=False).fit_transform(row_data)
 # 第一个相关系数
 print(
     data_processed[
@@ -254,8 +251,7 @@ start_time = time.time()
 binary_label = row_data.SalePrice < row_data.SalePrice.median()
 binary_label = binary_label.astype(int)
 
-# 修改已经处理好的数据
-data_piped = PipeLineForPaperHousingData().transform(row_data)
+# 修改已经处理好的数据(复用第0步的结果)
 data_for_classification = data_piped.copy()
 data_for_classification["SalePrice"] = binary_label
 
@@ -320,3 +316,32 @@ print(
     "完成'更换目标变量，并训练XGBClassifier', 用时%.3fms" % 
     ((end_time - start_time) * 1000), end="\n\n"
 )
+
+# ==========
+# 7.对test.csv进行预测
+# ==========
+print("=" * 50)
+print("7.对test.csv进行预测")
+print("=" * 50)
+start_time = time.time()
+test_data = DatasetIO.loadDataset(
+    "house-prices-advanced-regression-techniques/test"
+)
+# 使用在train.csv上拟合的预处理管道，不重新拟合
+X_kaggle = prep.transform(test_data).drop(columns=cols_dropped_in_paper)
+pd.DataFrame({
+    "Id": test_data["Id"],
+    # 目标值在预处理时取了对数
+    "SalePrice": np.exp(
+        rf_model_paper.predict(X_kaggle[rf_model_paper.feature_names_in_])
+    ),
+}).to_csv(
+    FilesIO.getDataset(
+        "house-prices-advanced-regression-techniques/submission.csv"
+    ), index=False
+)
+end_time = time.time()
+print(
+    "完成'对test.csv进行预测', 用时%.3fms" % 
+    ((end_time - start_time) * 1000), end="\n\n"
+)
@@ -7,11 +7,10 @@
 # @Description:                                   #
 # Implement a function to combine data with maps  #
 # =============================================== #
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
 from src.common.infoTool.const import CONST_TABLE
 
 
@@ -23,7 +22,10 @@ def map_plot(city: str, is_show: bool = True) -> None:
     """
 
     # ------ 读取对应的城市房价数据 ------ #
-    data = pd.read_csv(FilesIO.getDataset("row_data/%s_housing_data.csv" % city))
+    data = DatasetIO.loadDataset(
+        "row_data/%s_housing_data" % city,
+        columns=["unitPrice", "longitude", "latitude"]
+    )
 
     # ------ 获取上四分位数，下四分位数 ------ #
     quantiles = data["unitPrice"].quantile([0.25, 0.75])
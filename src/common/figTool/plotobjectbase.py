@@ -7,9 +7,8 @@
 # @Description: Object base class for Various visualizations of data     #
 # ====================================================================== #
 import os
-import pandas as pd
 
-from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
 from src.common.infoTool.const import CONST_TABLE
 from src.common.fileTool.figuresio import FiguresIO
 
@@ -50,9 +49,7 @@ class PlotObjectBase:
 
         # ------ 尝试读取数据 ------ #
         try:
-            self.data = pd.read_csv(FilesIO.getDataset(
-                "row_data/%s_housing_data.csv" % self.city
-            ))
+            self.data = DatasetIO.loadDataset("row_data/%s_housing_data" % self.city)
         except:
             self.data = None
             
\ No newline at end of file
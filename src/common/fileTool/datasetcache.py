@@ -0,0 +1,115 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-05                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A cache of processed datasets keyed on the content hash of    #
+# the raw file and a hash of the pipeline configuration         #
+# ============================================================= #
+import os
+import glob
+import joblib
+import hashlib
+import pandas as pd
+from typing import Any
+
+from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
+
+
+class ProcessedDataCache:
+
+    """
+    预处理结果的缓存
+    键由原始数据集读取后的内容哈希(列名、类型与每一行的值)与预处理管道的配置哈希(类名、VERSION与全部参数)组成，
+    原始数据或管道任一变化都会重新计算；不使用文件本身的哈希，由csv重新生成的列式存储文件字节不一定相同，但内容相同。
+    缓存中同时保存拟合好的管道与处理后的数据，
+    文件存放在<root>/<数据集文件名>_<数据哈希>_<配置哈希>.pkl，同一数据集的旧缓存在写入时删除
+    """
+
+    FOLDER_NAME = "processed_cache"
+
+    def __init__(self, root_path: str=None) -> None:
+
+        """
+        root_path: 缓存目录，默认为datasets/processed_cache
+        """
+
+        self.root_path = root_path if root_path is not None \
+            else os.path.join(FilesIO.getDataset(), self.FOLDER_NAME)
+        os.makedirs(self.root_path, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+
+    @staticmethod
+    def data_hash(df: pd.DataFrame) -> str:
+
+        """
+        数据内容的sha256，由列名、类型以及pd.util.hash_pandas_object得到的每一行的哈希组成，
+        与数据的存储格式和文件字节无关
+        """
+
+        sha = hashlib.sha256()
+        columns = [(column, str(dtype)) for column, dtype in df.dtypes.items()]
+        sha.update(repr(columns).encode("utf-8"))
+        sha.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return sha.hexdigest()
+
+
+    @staticmethod
+    def config_hash(pipeline: Any) -> str:
+
+        """
+        管道配置的哈希，管道的输出发生变化时应增加其VERSION
+        """
+
+        config = "%s.%s|%s|%s" % (
+            type(pipeline).__module__, type(pipeline).__qualname__,
+            getattr(pipeline, "VERSION", 0),
+            sorted(pipeline.get_params(deep=False).items())
+        )
+        return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+
+    def cache_path(self, name: str, df: pd.DataFrame, pipeline: Any) -> str:
+        return os.path.join(self.root_path, "%s_%s_%s.pkl" % (
+            os.path.basename(name), self.data_hash(df)[:16], self.config_hash(pipeline)[:16]
+        ))
+
+
+    def fit_transform(self, name: str, pipeline: Any) -> tuple[pd.DataFrame, Any]:
+
+        """
+        读取数据集name并使用pipeline处理，返回(处理后的数据, 拟合好的管道)
+        name: 数据集名称，例如"row_data/CD_housing_data"
+        命中缓存时直接读取，否则计算后写入缓存
+        """
+
+        df = DatasetIO.loadDataset(name)
+        path = self.cache_path(name, df, pipeline)
+        if os.path.exists(path):
+            try:
+                cached = joblib.load(path)
+                self.hits += 1
+                return cached["data"], cached["pipeline"]
+            except Exception as e:
+                print("ERROR: Broken cache %s (%s), recomputing..." % (path, e))
+
+        self.misses += 1
+        data = pipeline.fit_transform(df)
+
+        # ------ 删除同一数据集的旧缓存，再写入新缓存 ------ #
+        stem = os.path.basename(name)
+        for old_path in glob.glob(os.path.join(self.root_path, stem + "_*.pkl")):
+            os.remove(old_path)
+        tmp_path = path + ".tmp"
+        joblib.dump({"data": data, "pipeline": pipeline}, tmp_path)
+        os.replace(tmp_path, path)
+        return data, pipeline
+
+
+    def summary(self) -> str:
+        return "%d hits, %d misses" % (self.hits, self.misses)
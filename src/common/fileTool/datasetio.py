@@ -0,0 +1,170 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-06                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Typed columnar (Parquet/Feather) storage for the datasets,    #
+# with column projection and CSV kept only as an export         #
+# ============================================================= #
+import os
+import pandas as pd
+from typing import Literal
+
+from src.common.fileTool.filesio import FilesIO
+from src.common.infoTool.const import CONST_TABLE
+
+
+class DatasetIO:
+
+    """
+    数据集的列式存储
+    数据集以名称标识，例如"row_data/CD_housing_data"，存放为datasets/<名称>.parquet(或.feather)，
+    读取时保留写入时的类型，并且可以只读取需要的列；csv文件只作为导出格式
+    """
+
+    FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+
+    @staticmethod
+    def getPath(name: str, fmt: Literal["parquet", "feather", "csv"]="parquet") -> str:
+        return FilesIO.getDataset(
+            name + (DatasetIO.FORMATS.get(fmt, ".csv"))
+        )
+
+
+    @staticmethod
+    def saveDataset(
+            df: pd.DataFrame, name: str,
+            fmt: Literal["parquet", "feather"]="parquet",
+            is_export_csv: bool=False
+    ) -> str:
+
+        """
+        存储数据集，返回文件路径
+        name: 数据集名称，例如"row_data/CD_housing_data"
+        fmt: 列式存储格式
+        is_export_csv: 是否同时导出一份utf-8-sig编码的csv文件，便于查看
+        """
+
+        path = DatasetIO.getPath(name, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df = df.reset_index(drop=True)
+        tmp_path = path + ".tmp"
+        if fmt == "feather":
+            df.to_feather(tmp_path)
+        else:
+            df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+        # ------ 导出csv，并保证csv不比列式存储新，避免下次读取时被重新转换 ------ #
+        if is_export_csv:
+            DatasetIO.exportCSV(name, df)
+            mtime = os.path.getmtime(path)
+            os.utime(DatasetIO.getPath(name, "csv"), (mtime, mtime))
+        return path
+
+
+    @staticmethod
+    def resolvePath(name: str) -> str:
+
+        """
+        数据集的列式存储文件路径
+        只有csv文件(旧版本生成的数据)或csv文件比列式存储新时，读取csv并转换为列式存储
+        """
+
+        csv_path = DatasetIO.getPath(name, "csv")
+        for fmt in DatasetIO.FORMATS:
+            path = DatasetIO.getPath(name, fmt)
+            if os.path.exists(path):
+                if os.path.exists(csv_path) and \
+                   os.path.getmtime(csv_path) > os.path.getmtime(path):
+                    break
+                return path
+
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError("Dataset %s not found..." % name)
+        return DatasetIO.saveDataset(pd.read_csv(csv_path), name)
+
+
+    @staticmethod
+    def loadDataset(name: str, columns: list[str]=None) -> pd.DataFrame:
+
+        """
+        读取数据集
+        name: 数据集名称，例如"row_data/CD_housing_data"
+        columns: 只读取的列，默认读取全部列
+        """
+
+        path = DatasetIO.resolvePath(name)
+        if path.endswith(DatasetIO.FORMATS["feather"]):
+            return pd.read_feather(path, columns=columns)
+        return pd.read_parquet(path, columns=columns)
+
+
+    @staticmethod
+    def mergeDataset(
+            df: pd.DataFrame, name: str, key: str, id_column: str=None
+    ) -> pd.DataFrame:
+
+        """
+        将df合并到已有的数据集name中，返回合并后的数据(不写入)
+        key: 标识同一条记录的列，df中已有的记录使用df中的新值，已有数据集中其余的记录保留在df之后
+        id_column: 合并后从1开始重新编号的列
+        数据集不存在或列与df不同时直接返回df
+        """
+
+        try:
+            existing = DatasetIO.loadDataset(name)
+        except FileNotFoundError:
+            return df
+        if existing.columns.tolist() != df.columns.tolist():
+            print("ERROR: Columns of dataset %s changed, not merged..." % name)
+            return df
+        existing = existing[~existing[key].isin(df[key])]
+        if len(existing) == 0:
+            return df
+
+        merged = pd.concat([df, existing], ignore_index=True)
+        # 类别不同的分类变量合并后为object，重新转换为分类变量
+        for column, dtype in df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                merged[column] = merged[column].astype("category")
+        if id_column is not None:
+            merged[id_column] = range(1, len(merged) + 1)
+        return merged
+
+
+    @staticmethod
+    def exportCSV(name: str, df: pd.DataFrame=None) -> str:
+
+        """
+        将数据集导出为csv文件，返回文件路径
+        """
+
+        df = df if df is not None else DatasetIO.loadDataset(name)
+        path = DatasetIO.getPath(name, "csv")
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+        return path
+
+
+    @staticmethod
+    def loadCities(
+            pattern: str="row_data/%s_housing_data", columns: list[str]=None,
+            cities: list[str]=None
+    ) -> pd.DataFrame:
+
+        """
+        读取多个城市的数据集并合并，增加city列
+        pattern: 数据集名称的模板，%s为城市名称
+        columns: 只读取的列
+        cities: 城市列表，默认为CONST_TABLE["CITY"]中的全部城市
+        """
+
+        cities = cities if cities is not None else list(CONST_TABLE["CITY"].keys())
+        frames = []
+        for city in cities:
+            df = DatasetIO.loadDataset(pattern % city, columns)
+            df.insert(0, "city", city)
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,237 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-25                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A compressed, content-addressed store for the crawled HTML    #
+# pages with a per-city index                                   #
+# ============================================================= #
+import os
+import time
+import gzip
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from src.common.fileTool.filesio import FilesIO
+
+
+class PageStore:
+
+    """
+    压缩存储的网页仓库
+    页面内容以gzip压缩后按内容哈希存放在<root>/objects/<哈希前两位>/<哈希>.html.gz，
+    内容相同的页面只存一份；每个城市在<root>/<city>_htmls/index.json中记录页码到哈希的映射
+    仓库中没有的页面会回退读取旧版本的<city>_htmls/<city>_page_<n>.html文件
+    多个实例(包括其他进程中的实例)可以同时写入同一个仓库，索引的更新由锁文件互斥
+    """
+
+    LOCK_TIMEOUT = 30.0         # 锁文件的有效期(秒)
+
+    def __init__(self, root_path: str=None, compress_level: int=6) -> None:
+
+        """
+        root_path: 仓库根目录，默认为FilesIO.getHTMLtext()
+        compress_level: gzip压缩等级(1-9)
+        """
+
+        self.root_path = root_path if root_path is not None \
+            else FilesIO.getHTMLtext()
+        self.compress_level = compress_level
+        self.objects_path = os.path.join(self.root_path, "objects")
+        self._indexes = {}          # 城市->(索引, 读取时索引文件的状态)
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+    def object_path(self, content_hash: str) -> str:
+        return os.path.join(
+            self.objects_path, content_hash[:2], content_hash + ".html.gz"
+        )
+
+
+    def legacy_path(self, city: str, page: int) -> str:
+        return os.path.join(
+            self.root_path, "%s_htmls" % city, "%s_page_%d.html" % (city, page)
+        )
+
+
+    def index(self, city: str) -> dict[int, str]:
+
+        """
+        城市的页码到内容哈希的索引
+        """
+
+        with self._lock:
+            return dict(self._load_index(city))
+
+
+    def put(self, city: str, page: int, text: str) -> str:
+
+        """
+        存入一页，返回内容哈希；内容已经存在时只更新索引
+        """
+
+        content_hash = self.content_hash(text)
+        path = self.object_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".%d.%d.tmp" % (os.getpid(), threading.get_ident())
+            with gzip.open(tmp_path, "wb", compresslevel=self.compress_level) as f:
+                f.write(text.encode("utf-8"))
+            os.replace(tmp_path, path)
+
+        with self._lock, self._index_lock(city):
+            index = self._load_index(city)
+            index[page] = content_hash
+            self._dump_index(city, index)
+        return content_hash
+
+
+    def has(self, city: str, page: int) -> bool:
+        with self._lock:
+            content_hash = self._load_index(city).get(page)
+        if content_hash is not None:
+            return os.path.exists(self.object_path(content_hash))
+        return os.path.exists(self.legacy_path(city, page))
+
+
+    def get(self, city: str, page: int) -> str:
+
+        """
+        读取一页的html文本，不存在时返回None
+        """
+
+        with self._lock:
+            content_hash = self._load_index(city).get(page)
+        if content_hash is not None:
+            path = self.object_path(content_hash)
+            if os.path.exists(path):
+                with gzip.open(path, "rb") as f:
+                    return f.read().decode("utf-8")
+
+        # ------ 回退到未压缩的旧文件 ------ #
+        path = self.legacy_path(city, page)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        return None
+
+
+    def migrate(self, city: str, is_remove: bool=False) -> int:
+
+        """
+        将旧版本的未压缩页面存入仓库，返回迁移的页数
+        is_remove: 迁移后是否删除原文件
+        """
+
+        folder = os.path.join(self.root_path, "%s_htmls" % city)
+        if not os.path.exists(folder):
+            return 0
+        prefix = "%s_page_" % city
+        migrated = 0
+        for file_name in os.listdir(folder):
+            if not (file_name.startswith(prefix) and file_name.endswith(".html")):
+                continue
+            page = int(file_name[len(prefix):-len(".html")])
+            path = os.path.join(folder, file_name)
+            with open(path, "r", encoding="utf-8") as f:
+                self.put(city, page, f.read())
+            if is_remove:
+                os.remove(path)
+            migrated += 1
+        return migrated
+
+
+    def _index_path(self, city: str) -> str:
+        return os.path.join(self.root_path, "%s_htmls" % city, "index.json")
+
+
+    @contextmanager
+    def _index_lock(self, city: str):
+
+        """
+        索引的读取-修改-写入在多个实例、多个进程之间互斥，避免并发写入时丢失页面
+        以O_EXCL创建的锁文件实现，持有者异常退出留下的锁文件超过LOCK_TIMEOUT秒后视为失效
+        """
+
+        path = self._index_path(city) + ".lock"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        while True:
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path) > self.LOCK_TIMEOUT:
+                        os.remove(path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.005)
+        try:
+            yield
+        finally:
+            os.remove(path)
+
+
+    def _index_stat(self, city: str) -> tuple:
+
+        """
+        索引文件的状态(修改时间, 大小, inode)，文件不存在时返回None
+        索引总是通过替换文件写入，每次写入后inode都会变化，修改时间精度较低时也能发现
+        """
+
+        try:
+            stat = os.stat(self._index_path(city))
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+    def _load_index(self, city: str) -> dict[int, str]:
+
+        """
+        读取索引并缓存在内存中，调用前需持有锁
+        索引文件被其他实例(例如爬虫与解析器各自的PageStore)修改后重新读取
+        """
+
+        stat = self._index_stat(city)
+        cached = self._indexes.get(city)
+        if cached is None or cached[1] != stat:
+            path = self._index_path(city)
+            index = {}
+            if stat is not None:
+                with open(path, "r", encoding="utf-8") as f:
+                    index = {
+                        int(page): content_hash
+                        for page, content_hash in json.load(f)["pages"].items()
+                    }
+            self._indexes[city] = (index, stat)
+        return self._indexes[city][0]
+
+
+    def _dump_index(self, city: str, index: dict[int, str]) -> None:
+
+        """
+        先写入临时文件再替换，调用前需持有锁
+        """
+
+        path = self._index_path(city)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".%d.%d.tmp" % (os.getpid(), threading.get_ident())
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"city": city, "pages": {
+                    str(page): index[page] for page in sorted(index)
+                }}, f, indent=1
+            )
+        os.replace(tmp_path, path)
+        self._indexes[city] = (index, self._index_stat(city))
@@ -0,0 +1,85 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-08                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A persistent SQLite cache of the records extracted from each  #
+# page, keyed on the content hash of the page                   #
+# ============================================================= #
+import json
+import time
+
+from src.common.fileTool.sqlitecache import SQLiteCache
+
+
+class PageParseCache(SQLiteCache):
+
+    """
+    页面解析结果的持久化缓存
+    以(页面内容哈希, 提取器版本)为键保存该页提取到的全部记录，内容没有变化的页面不再重新提取；
+    提取逻辑变化时增加提取器的版本，旧版本的记录由evict()清除；
+    页面内容相同时提取结果不会变化，因此默认永不过期(ttl=None)
+    """
+
+    FILE_NAME = "parse_cache.sqlite"
+
+    TABLE = "page"
+    SCHEMA = """
+        content_hash TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        records TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (content_hash, version)
+    """
+
+    _default = None
+
+    def get(self, content_hash: str, version: int) -> list[dict]:
+
+        """
+        查询缓存，返回该页的记录，不存在或已过期时返回None
+        """
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT records, created_at FROM page "
+                "WHERE content_hash = ? AND version = ?", (content_hash, version)
+            ).fetchone()
+            if row is None or self._is_expired(row[1]):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+
+    def put(self, content_hash: str, version: int, records: list[dict]) -> None:
+
+        """
+        写入(或覆盖)一页的记录，记录中的NaN会原样保存
+        """
+
+        text = json.dumps(records, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page VALUES (?, ?, ?, ?)",
+                (content_hash, version, text, time.time())
+            )
+            self._conn.commit()
+
+
+    def evict(self, version: int=None) -> int:
+
+        """
+        删除过期的记录，以及(给定version时)其他版本的记录，返回删除的数量
+        """
+
+        deleted = super().evict()
+        if version is not None:
+            with self._lock:
+                deleted += self._conn.execute(
+                    "DELETE FROM page WHERE version != ?", (version,)
+                ).rowcount
+                self._conn.commit()
+        return deleted
@@ -0,0 +1,116 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-29                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# The base class of the persistent SQLite caches: connection,   #
+# table creation, shared default instance, expiry and hit/miss  #
+# statistics                                                    #
+# ============================================================= #
+import os
+import time
+import sqlite3
+import threading
+
+from src.common.fileTool.filesio import FilesIO
+
+
+class SQLiteCache:
+
+    """
+    SQLite持久化缓存的基类
+    子类只需定义FILE_NAME(默认的数据库文件名)、TABLE(表名)与SCHEMA(列定义，必须包含created_at列)，
+    以及按自己的键读写的get/put；每条记录在写入时记录created_at，超过有效期ttl的记录视为不存在，
+    并可以通过evict()清除。同一个连接在多个线程间共享，由锁保证串行访问
+    """
+
+    FILE_NAME = None
+    TABLE = None
+    SCHEMA = None
+
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str=None, ttl: float=None) -> None:
+
+        """
+        path: 数据库文件路径，默认为datasets/<FILE_NAME>
+        ttl: 记录的有效期(秒)，None表示永不过期
+        """
+
+        self.path = path if path is not None \
+            else os.path.join(FilesIO.getDataset(), self.FILE_NAME)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS %s (%s)" % (self.TABLE, self.SCHEMA)
+        )
+        self._conn.commit()
+
+
+    @classmethod
+    def getDefault(cls) -> "SQLiteCache":
+
+        """
+        进程内共享的默认缓存，每个子类各有一个
+        """
+
+        with SQLiteCache._default_lock:
+            if cls.__dict__.get("_default") is None:
+                cls._default = cls()
+            return cls._default
+
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+
+    def _created_after(self) -> float:
+
+        """
+        未过期记录的最早写入时间
+        """
+
+        return time.time() - self.ttl if self.ttl is not None else 0.0
+
+
+    def evict(self) -> int:
+
+        """
+        删除所有过期的记录，返回删除的数量
+        """
+
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM %s WHERE created_at < ?" % self.TABLE,
+                (self._created_after(),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return "%d hits, %d misses (hit rate %.1f%%)" % (
+            self.hits, self.misses, 100.0 * self.hits / total if total else 0.0
+        )
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -69,6 +69,45 @@ CONST_TABLE = {
         "HOUSE_TAG": ".//div[2]//section/div[3]/span/text()",
     },
 
+    # ------ 以单个房源(//div[@class='property'])为根的相对xpath表达式 ------ #
+    "LISTING_XPATH": {
+        # 房价
+        "HOUSE_PRICE": ".//div[2]/div[2]//span[@class='property-price-total-num']/text()",
+
+        # 住房地址(区域、板块、街道)
+        "HOUSE_LOCATION": ".//div[2]/div[1]//section/div[2]/p[2]//text()",
+
+        # 住房小区名称
+        "COMMUNITY_LOCATION": ".//div[2]/div[1]//section/div[2]/p[1]//text()",
+
+        # 房屋面积
+        "HOUSE_AREA": ".//div[2]/div[1]//section//p[2]/text()",
+
+        # 每平方米价格
+        "UNIT_PRICE": ".//div[2]/div[2]/p[2]/text()",
+
+        # 卫生间数量(卫)
+        "HOUSE_BATHROOM_NUM": ".//div[2]//section//p[1]/span[5]/text()",
+
+        # 客厅数量(厅)
+        "HOUSE_LIVINGROOM_NUM": ".//div[2]//section//p[1]/span[3]/text()",
+
+        # 卧室数量(室)
+        "HOUSE_BEDROOM_NUM": ".//div[2]//section//p[1]/span[1]/text()",
+
+        # 朝向
+        "HOUSE_FACING": ".//div[2]//section//p[3]/text()",
+
+        # 房龄
+        "HOUSE_AGE": ".//div[2]//section//p[last()]/text()",
+
+        # 楼层信息
+        "HOUSE_FLOOR": ".//div[2]//section/div[1]/p[position()>=2]/text()",
+
+        # 交易信息的tag
+        "HOUSE_TAG": ".//div[2]//section/div[3]/span/text()",
+    },
+
     # ------ 城市名称 ------ #
     "CITY": {
         "BJ": "北京市", "SH": "上海市", "GZ": "广州市",
@@ -115,5 +154,14 @@ CONST_TABLE = {
         "CS": {
             "LNG": 112.97183346189286, "LAT": 28.19834354882077
         }
-    }
+    },
+
+    # ------ 周边设施：列名与百度地图检索的类别 ------ #
+    "POI": {
+        "schoolAround": "学校",
+        "subwayAround": "地铁",
+        "parkAround": "公园",
+        "shopping_mallAround": "购物",
+        "busAround": "公交",
+    },
 }
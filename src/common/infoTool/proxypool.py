@@ -0,0 +1,141 @@
+# ===================================================== #
+# @Author: Fantasy_Silence                              #
+# @Time: 2024-05-26                                     #
+# @IDE: Visual Studio Code & PyCharm                    #
+# @Python: 3.9.7                                        #
+# ===================================================== #
+# @Description:                                         #
+# A proxy pool that scores proxies by rolling latency   #
+# and success rate and takes failing ones out of        #
+# rotation                                              #
+# ===================================================== #
+import time
+import random
+import threading
+
+from src.common.infoTool.randomIPandHeaders import RandomRequestInfoGenerator
+
+
+class ProxyPool:
+
+    """
+    带健康评分的代理池
+    为每个代理记录滑动平均的延迟与成功率，按照 成功率/延迟 加权随机选择代理，
+    连续失败或成功率过低的代理会被移出轮换，冷却一段时间后再重新参与
+    """
+
+    def __init__(
+            self, proxies: list[str]=None, alpha: float=0.3,
+            max_failures: int=3, min_success_rate: float=0.2,
+            cooldown: float=300.0
+    ) -> None:
+
+        """
+        proxies: 代理地址列表，例如["36.6.144.153:8089"]，默认使用RandomRequestInfoGenerator中的IP
+        alpha: 滑动平均的权重，越大越看重最近的请求
+        max_failures: 连续失败多少次后移出轮换
+        min_success_rate: 成功率低于该值时移出轮换
+        cooldown: 移出轮换后的冷却时间(秒)
+        """
+
+        if proxies is None:
+            proxies = RandomRequestInfoGenerator.IP_LIST
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.min_success_rate = min_success_rate
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+        # ------ 每个代理的健康状况 ------ #
+        self.health = {
+            proxy: {
+                "latency": None,            # 滑动平均延迟(秒)
+                "success_rate": 1.0,        # 滑动平均成功率，初始时假设可用
+                "failures": 0,              # 连续失败次数
+                "requests": 0,              # 总请求次数
+                "disabled_until": 0.0,      # 冷却结束时间
+            } for proxy in proxies
+        }
+
+
+    @staticmethod
+    def to_requests(proxy: str) -> dict[str, str]:
+
+        """
+        转换为requests使用的proxies参数
+        """
+
+        return {"http": "http://" + proxy, "https": "http://" + proxy}
+
+
+    def _score(self, health: dict, default_latency: float) -> float:
+        latency = health["latency"] if health["latency"] is not None \
+            else default_latency
+        return health["success_rate"] / max(latency, 1e-3)
+
+
+    def acquire(self) -> str:
+
+        """
+        选择一个代理，速度快、成功率高的代理被选中的概率更大
+        所有代理都在冷却中时返回最早结束冷却的代理
+        """
+
+        with self._lock:
+            now = time.time()
+            active = [
+                proxy for proxy, health in self.health.items()
+                if health["disabled_until"] <= now
+            ]
+            if not active:
+                return min(
+                    self.health, key=lambda p: self.health[p]["disabled_until"]
+                )
+
+            # 还没有延迟记录的代理使用已知延迟的中位数，保证新代理也会被尝试
+            latencies = sorted(
+                self.health[proxy]["latency"] for proxy in active
+                if self.health[proxy]["latency"] is not None
+            )
+            default_latency = latencies[len(latencies) // 2] if latencies else 1.0
+            weights = [
+                self._score(self.health[proxy], default_latency)
+                for proxy in active
+            ]
+            return random.choices(active, weights=weights)[0]
+
+
+    def report(self, proxy: str, is_success: bool, latency: float=None) -> None:
+
+        """
+        报告一次请求的结果
+        """
+
+        with self._lock:
+            health = self.health[proxy]
+            health["requests"] += 1
+            health["success_rate"] += self.alpha * (
+                float(is_success) - health["success_rate"]
+            )
+            if is_success:
+                health["failures"] = 0
+                if latency is not None:
+                    health["latency"] = latency if health["latency"] is None \
+                        else health["latency"] + self.alpha * (
+                            latency - health["latency"]
+                        )
+                return
+
+            # ------ 失败过多时移出轮换 ------ #
+            health["failures"] += 1
+            if health["failures"] >= self.max_failures or \
+               health["success_rate"] < self.min_success_rate:
+                health["disabled_until"] = time.time() + self.cooldown
+                # 冷却结束后以中等的成功率重新参与
+                health["failures"] = 0
+                health["success_rate"] = 0.5
+
+
+    def stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {proxy: dict(health) for proxy, health in self.health.items()}
@@ -0,0 +1,111 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-02                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Vectorized great-circle (haversine) and ellipsoidal           #
+# (Vincenty, WGS84) distances between arrays of coordinates     #
+# ============================================================= #
+import numpy as np
+
+# ------ 一些常量 ------ #
+EARTH_RADIUS = 6371.0088                # 地球平均半径(km)，与geopy.distance.great_circle一致
+WGS84_A = 6378.137                      # WGS84椭球长半轴(km)
+WGS84_F = 1 / 298.257223563             # WGS84椭球扁率
+WGS84_B = WGS84_A * (1 - WGS84_F)       # WGS84椭球短半轴(km)
+
+
+class GeoDistance:
+
+    """
+    向量化的距离计算，参数为纬度、经度(度)的标量或NumPy数组，支持广播，返回距离(km)
+    haversine: 球面距离，与geopy.distance.geodesic(椭球面)相比误差不超过约0.5%
+    vincenty: WGS84椭球面上的Vincenty反算，与geopy.distance.geodesic相比误差在毫米级
+    """
+
+    @staticmethod
+    def haversine(
+            lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray
+    ) -> np.ndarray:
+
+        lat1, lng1, lat2, lng2 = (
+            np.radians(np.asarray(item, dtype=float))
+            for item in (lat1, lng1, lat2, lng2)
+        )
+        a = np.sin((lat2 - lat1) / 2) ** 2 + \
+            np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(a))
+
+
+    @staticmethod
+    def vincenty(
+            lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray,
+            max_iter: int=200, tol: float=1e-12
+    ) -> np.ndarray:
+
+        """
+        Vincenty反算公式，所有点同时迭代，已收敛的点不再更新
+        近似对跖点可能不收敛，这些点退化为haversine距离
+        """
+
+        lat1, lng1, lat2, lng2 = np.broadcast_arrays(
+            *(np.asarray(item, dtype=float) for item in (lat1, lng1, lat2, lng2))
+        )
+        u1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+        u2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+        sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+        sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+        big_l = np.radians(lng2 - lng1)
+
+        lam = big_l.copy()
+        active = np.ones(lam.shape, dtype=bool)
+        sin_sigma = cos_sigma = sigma = cos_sq_alpha = cos_2sigma_m = None
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for _ in range(max_iter):
+                sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+                sin_sigma = np.hypot(
+                    cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam
+                )
+                cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+                sigma = np.arctan2(sin_sigma, cos_sigma)
+                sin_alpha = np.where(
+                    sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma
+                )
+                cos_sq_alpha = 1 - sin_alpha ** 2
+                # 赤道上的线cos_sq_alpha为0，此时cos_2sigma_m取0
+                cos_2sigma_m = np.where(
+                    cos_sq_alpha == 0, 0.0,
+                    cos_sigma - 2 * sin_u1 * sin_u2 / cos_sq_alpha
+                )
+                c = WGS84_F / 16 * cos_sq_alpha * (4 + WGS84_F * (4 - 3 * cos_sq_alpha))
+                lam_new = big_l + (1 - c) * WGS84_F * sin_alpha * (
+                    sigma + c * sin_sigma * (
+                        cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+                    )
+                )
+                lam_new = np.where(active, lam_new, lam)
+                active &= np.abs(lam_new - lam) > tol
+                lam = lam_new
+                if not active.any():
+                    break
+
+            u_sq = cos_sq_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+            big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+            big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+            delta_sigma = big_b * sin_sigma * (
+                cos_2sigma_m + big_b / 4 * (
+                    cos_sigma * (-1 + 2 * cos_2sigma_m ** 2) -
+                    big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) *
+                    (-3 + 4 * cos_2sigma_m ** 2)
+                )
+            )
+            distance = WGS84_B * big_a * (sigma - delta_sigma)
+
+        # ------ 未收敛的点使用球面距离 ------ #
+        if active.any():
+            distance = np.where(
+                active, GeoDistance.haversine(lat1, lng1, lat2, lng2), distance
+            )
+        return distance
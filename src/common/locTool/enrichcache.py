@@ -0,0 +1,93 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-08                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A persistent SQLite cache of the per-listing enrichment       #
+# (coordinates and POI counts) so that a re-parse only enriches #
+# new listings                                                  #
+# ============================================================= #
+import json
+import time
+
+from src.common.fileTool.sqlitecache import SQLiteCache
+
+
+class EnrichmentCache(SQLiteCache):
+
+    """
+    房源补充信息的持久化缓存
+    以(城市, 房源地址houseLoc)为键，保存经纬度与周边设施的数量，重新解析时已有的房源不再地址解析和检索周边设施，
+    有效期与POICache一致
+    """
+
+    FILE_NAME = "enrichment_cache.sqlite"
+    DEFAULT_TTL = 30 * 24 * 3600.0      # 默认有效期30天
+    CHUNK_SIZE = 500                    # 批量查询时每条SQL的最大参数个数(SQLite默认上限为999)
+    TABLE = "listing"
+    SCHEMA = """
+        city TEXT NOT NULL,
+        house_loc TEXT NOT NULL,
+        enrichment TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (city, house_loc)
+    """
+
+    _default = None
+
+    def __init__(self, path: str=None, ttl: float=DEFAULT_TTL) -> None:
+
+        """
+        参数见SQLiteCache，有效期默认为30天
+        """
+
+        super().__init__(path, ttl)
+
+
+    def get_many(self, city: str, house_locs: list[str]) -> list[dict]:
+
+        """
+        批量查询，按house_locs的顺序返回每个房源的补充信息(列名->值)，不存在或已过期时为None
+        每次查询最多CHUNK_SIZE个房源，不逐条查询
+        """
+
+        created_after = self._created_after()
+        with self._lock:
+            found = {}
+            for start in range(0, len(house_locs), self.CHUNK_SIZE):
+                chunk = house_locs[start:start + self.CHUNK_SIZE]
+                found.update(self._conn.execute(
+                    "SELECT house_loc, enrichment FROM listing "
+                    "WHERE city = ? AND created_at >= ? AND house_loc IN (%s)" %
+                    ", ".join("?" * len(chunk)),
+                    [city, created_after] + list(chunk)
+                ).fetchall())
+            results = [
+                json.loads(found[house_loc]) if house_loc in found else None
+                for house_loc in house_locs
+            ]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+            return results
+
+
+    def put_many(self, city: str, items: dict[str, dict]) -> None:
+
+        """
+        在一个事务中写入(或覆盖)多个房源的补充信息
+        items: 房源地址->补充信息(列名->值)
+        """
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO listing VALUES (?, ?, ?, ?)",
+                [
+                    (city, house_loc, json.dumps(enrichment), now)
+                    for house_loc, enrichment in items.items()
+                ]
+            )
+            self._conn.commit()
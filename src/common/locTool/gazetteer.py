@@ -0,0 +1,171 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-11                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# An offline gazetteer of already geocoded listing addresses    #
+# with a trigram index for fuzzy address-to-coordinate lookup   #
+# ============================================================= #
+import threading
+import numpy as np
+import pandas as pd
+
+from src.common.fileTool.datasetio import DatasetIO
+from src.common.infoTool.const import CONST_TABLE
+from src.common.locTool.geocache import GeocodeCache
+
+
+class Gazetteer:
+
+    """
+    离线的地址->经纬度查找表
+    由已经地址解析过的房源(city, houseLoc, longitude, latitude)构建，每个城市建立一个三元组(trigram)倒排索引。
+    查询时地址先经GeocodeCache.normalize()规范化，完全相同的地址直接命中，
+    否则取同一城市中三元组Jaccard相似度最高的地址，不低于阈值时返回其经纬度，低于阈值视为未命中。
+    经纬度与数据集一致(已转换的坐标)，没有百度坐标系下的原始坐标
+    """
+
+    NGRAM = 3
+    DEFAULT_THRESHOLD = 0.85        # 在现有数据集上，相似度不低于0.85的最近地址几乎都是同一个小区
+    COLUMNS = ["city", "houseLoc", "longitude", "latitude"]
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, entries: pd.DataFrame, threshold: float=DEFAULT_THRESHOLD) -> None:
+
+        """
+        entries: 包含city, houseLoc, longitude, latitude四列的DataFrame，city为城市名称(例如"成都市")
+        threshold: 模糊匹配的相似度阈值(0~1)
+        """
+
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cities = {}
+
+        # ------ 每个城市: 地址->编号、坐标、三元组个数，以及三元组->编号数组 ------ #
+        entries = entries.dropna(subset=["houseLoc", "longitude", "latitude"])
+        for city, group in entries.groupby("city", sort=False):
+            exact, grams, postings = {}, [], {}
+            lng, lat = [], []
+            for address, x, y in zip(group["houseLoc"], group["longitude"], group["latitude"]):
+                key = GeocodeCache.normalize(str(address))
+                if not key or key in exact:
+                    continue
+                exact[key] = len(lng)
+                key_grams = self.ngrams(key)
+                for gram in key_grams:
+                    postings.setdefault(gram, []).append(len(lng))
+                grams.append(len(key_grams))
+                lng.append(float(x))
+                lat.append(float(y))
+            self._cities[GeocodeCache.normalize(city)] = {
+                "exact": exact,
+                "lng": np.array(lng), "lat": np.array(lat),
+                "grams": np.array(grams),
+                "postings": {
+                    gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()
+                },
+            }
+
+
+    def __len__(self) -> int:
+        return sum(len(index["exact"]) for index in self._cities.values())
+
+
+    @staticmethod
+    def load(
+            pattern: str="row_data/%s_housing_data", cities: list[str]=None,
+            threshold: float=DEFAULT_THRESHOLD
+    ) -> "Gazetteer":
+
+        """
+        由各城市的数据集构建，只读取houseLoc, longitude, latitude三列
+        pattern: 数据集名称的模板，%s为城市名称
+        cities: 城市列表，默认为CONST_TABLE["CITY"]中的全部城市，缺少数据集的城市跳过
+        """
+
+        frames = []
+        for city in cities if cities is not None else list(CONST_TABLE["CITY"].keys()):
+            try:
+                frames.append(DatasetIO.loadCities(
+                    pattern, columns=["houseLoc", "longitude", "latitude"], cities=[city]
+                ))
+            except FileNotFoundError:
+                print("ERROR: Dataset of %s not found, skipped..." % city)
+        if not frames:
+            return Gazetteer(pd.DataFrame(columns=Gazetteer.COLUMNS), threshold)
+        entries = pd.concat(frames, ignore_index=True)
+        entries["city"] = entries["city"].map(CONST_TABLE["CITY"])
+        return Gazetteer(entries, threshold)
+
+
+    @staticmethod
+    def getDefault() -> "Gazetteer":
+
+        """
+        进程内共享的默认查找表，第一次使用时由row_data中的全部城市构建
+        """
+
+        with Gazetteer._default_lock:
+            if Gazetteer._default is None:
+                Gazetteer._default = Gazetteer.load()
+            return Gazetteer._default
+
+
+    @staticmethod
+    def ngrams(key: str, n: int=NGRAM) -> set[str]:
+
+        """
+        规范化地址的n元组集合，不足n个字符的地址本身作为唯一的元组
+        """
+
+        return {key[i:i + n] for i in range(max(1, len(key) - n + 1))}
+
+
+    def match(self, city: str, address: str) -> tuple[float, float, float]:
+
+        """
+        查找地址的经纬度，返回(经度, 纬度, 相似度)，未命中时返回None
+        """
+
+        index = self._cities.get(GeocodeCache.normalize(city))
+        key = GeocodeCache.normalize(address)
+        result = None
+        if index is not None and key:
+            i = index["exact"].get(key)
+            if i is not None:
+                result = (index["lng"][i], index["lat"][i], 1.0)
+            else:
+                # ------ 共有的三元组个数，Jaccard = 共有 / (查询 + 候选 - 共有) ------ #
+                key_grams = self.ngrams(key)
+                ids = [index["postings"][gram] for gram in key_grams if gram in index["postings"]]
+                if ids:
+                    shared = np.bincount(np.concatenate(ids), minlength=len(index["grams"]))
+                    similarity = shared / (len(key_grams) + index["grams"] - shared)
+                    i = int(np.argmax(similarity))
+                    if similarity[i] >= self.threshold:
+                        result = (index["lng"][i], index["lat"][i], float(similarity[i]))
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return "%d hits, %d misses (hit rate %.1f%%)" % (
+            self.hits, self.misses, 100.0 * self.hits / total if total else 0.0
+        )
@@ -0,0 +1,179 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-10                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Batch geocoding that groups addresses by their normalized key #
+# and sends one request per unique key, sharing in-flight       #
+# requests between duplicate addresses                          #
+# ============================================================= #
+import time
+import threading
+from collections import Counter
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.common.locTool.geocache import GeocodeCache
+from src.common.locTool.gazetteer import Gazetteer
+from src.common.locTool.lnglat import GetLongitudeLatitude
+
+
+class BatchGeocoder:
+
+    """
+    批量地址解析
+    地址按GeocodeCache.normalize()规范化后的键分组(忽略空白、标点与全角/半角的差别)，
+    每个键只解析一次；同一个键正在解析时，后到的地址等待并共享结果，不再重复请求。
+    同一个实例在多次调用之间保留已解析的结果，并按结果的来源(缓存、离线查找表、百度地图接口)分别统计
+    """
+
+    def __init__(
+            self, city: str, concurrency: int=8, cache: GeocodeCache=None,
+            is_cache: bool=True, gazetteer: Gazetteer=None, is_gazetteer: bool=True
+    ) -> None:
+
+        """
+        city: 城市名称，与GetLongitudeLatitude相同，例如"成都市"
+        concurrency: geocode_many()同时进行的最大请求数
+        cache: 地址解析结果的缓存，默认使用GeocodeCache.getDefault()
+        is_cache: 是否使用缓存，设置为False时每个键都请求百度地图接口
+        gazetteer: 离线的地址查找表，默认使用Gazetteer.getDefault()
+        is_gazetteer: 是否使用离线的地址查找表
+        """
+
+        self.city = city
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.is_cache = is_cache
+        self.gazetteer = gazetteer
+        self.is_gazetteer = is_gazetteer
+        self.addresses = 0          # 提交的地址数
+        self.api_time = 0.0         # 请求百度地图接口的累计用时(秒)
+        self._futures = {}          # 键->(经度, 纬度)
+        self._counts = Counter()    # 键->提交的地址数
+        self._sources = {}          # 键->结果的来源
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def key(address: str) -> str:
+        return GeocodeCache.normalize(address)
+
+
+    def _lookup(self, key: str, address: str) -> tuple[float, float]:
+
+        """
+        解析一个键，先到的地址负责请求，正在请求时后到的地址等待并共享结果
+        """
+
+        with self._lock:
+            future = self._futures.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._futures[key] = Future()
+        if is_owner:
+            start_time = time.time()
+            source = "error"
+            try:
+                lnglat = GetLongitudeLatitude(
+                    city=self.city, address=address, cache=self.cache,
+                    is_cache=self.is_cache, gazetteer=self.gazetteer,
+                    is_gazetteer=self.is_gazetteer
+                )
+                source = lnglat.source
+                if lnglat.longtitude is None or lnglat.latitude is None:
+                    future.set_result((np.nan, np.nan))
+                else:
+                    future.set_result((lnglat.longtitude, lnglat.latitude))
+            except Exception as e:
+                print("ERROR: Failed to geocode %s (%s)..." % (address, e))
+                future.set_result((np.nan, np.nan))
+            with self._lock:
+                self._sources[key] = source
+                # 只统计实际请求百度地图接口的用时，缓存与离线查找表的命中不计入
+                if source == "api":
+                    self.api_time += time.time() - start_time
+        return future.result()
+
+
+    def geocode(self, address: str) -> tuple[float, float]:
+
+        """
+        解析一个地址，返回(经度, 纬度)，解析失败时为NaN
+        """
+
+        key = self.key(address)
+        with self._lock:
+            self.addresses += 1
+            self._counts[key] += 1
+        return self._lookup(key, address)
+
+
+    def geocode_many(
+            self, addresses: list[str], is_progress: bool=False
+    ) -> tuple[np.ndarray, np.ndarray]:
+
+        """
+        批量解析，返回与addresses一一对应的经度、纬度数组，解析失败的为NaN
+        相同键的地址只解析第一个，不同的键最多同时进行concurrency个请求
+        is_progress: 是否打印解析进度
+        """
+
+        groups = {}
+        for i, address in enumerate(addresses):
+            groups.setdefault(self.key(address), []).append(i)
+        with self._lock:
+            self.addresses += len(addresses)
+            for key, rows in groups.items():
+                self._counts[key] += len(rows)
+
+        # ------ 每个键解析一次，结果写入该组的所有位置 ------ #
+        longitude = np.full(len(addresses), np.nan)
+        latitude = np.full(len(addresses), np.nan)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._lookup, key, addresses[rows[0]]): rows
+                for key, rows in groups.items()
+            }
+            for k, future in enumerate(futures):
+                rows = futures[future]
+                longitude[rows], latitude[rows] = future.result()
+
+                # ------ 解析进度 ------ #
+                if is_progress:
+                    print(
+                        "Parsing...",
+                        f'|{"■" * ((k + 1) * 50 // len(futures)):50}|',
+                        f'{(k + 1) * 100 // len(futures)}%', end='\r'
+                    )
+        return longitude, latitude
+
+
+    def summary(self) -> str:
+
+        """
+        地址数与不同的键数，各来源的键数，以及合并重复地址节省的接口请求
+        节省的请求只计算结果来自百度地图接口的键：这些键的重复地址原本也会各自请求一次，
+        节省的时间按接口的平均用时估计；结果来自缓存或离线查找表的重复地址不计入
+        """
+
+        with self._lock:
+            keys = len(self._sources)
+            sources = Counter(self._sources.values())
+            api_calls = sources["api"]
+            saved_calls = sum(
+                self._counts[key] - 1 for key, source in self._sources.items()
+                if source == "api"
+            )
+            mean_time = self.api_time / api_calls if api_calls else 0.0
+            return (
+                "%d addresses, %d unique keys (%.1f%%), %d cache hits, %d gazetteer hits, "
+                "%d API calls in %.2fs, %d duplicate API calls saved (~%.2fs)" % (
+                    self.addresses, keys,
+                    100.0 * keys / self.addresses if self.addresses else 0.0,
+                    sources["cache"], sources["gazetteer"], api_calls, self.api_time,
+                    saved_calls, saved_calls * mean_time
+                )
+            )
@@ -0,0 +1,99 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-29                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A persistent SQLite cache of geocoding results so that known  #
+# addresses are never sent to the Baidu API again               #
+# ============================================================= #
+import time
+import unicodedata
+
+from src.common.fileTool.sqlitecache import SQLiteCache
+
+
+class GeocodeCache(SQLiteCache):
+
+    """
+    地址解析结果的持久化缓存
+    以规范化后的(城市, 地址)为键，同时保存百度坐标系(BD-09)下的原始坐标与转换后的坐标
+    """
+
+    FILE_NAME = "geocode_cache.sqlite"
+    DEFAULT_TTL = 90 * 24 * 3600.0      # 默认有效期90天
+    TABLE = "geocode"
+    SCHEMA = """
+        city TEXT NOT NULL,
+        address TEXT NOT NULL,
+        bd_lng REAL NOT NULL,
+        bd_lat REAL NOT NULL,
+        lng REAL NOT NULL,
+        lat REAL NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (city, address)
+    """
+
+    _default = None
+
+    def __init__(self, path: str=None, ttl: float=DEFAULT_TTL) -> None:
+
+        """
+        参数见SQLiteCache，有效期默认为90天
+        """
+
+        super().__init__(path, ttl)
+
+
+    @staticmethod
+    def normalize(text: str) -> str:
+
+        """
+        规范化城市或地址：全角字符转为半角，去掉所有空白与标点，
+        例如"银港水晶城（D区）"与"银港水晶城 (D区)"得到相同的键
+        """
+
+        return "".join(
+            char for char in unicodedata.normalize("NFKC", text or "")
+            if not (char.isspace() or unicodedata.category(char).startswith("P"))
+        )
+
+
+    def get(self, city: str, address: str) -> dict:
+
+        """
+        查询缓存，返回{"bd_lng", "bd_lat", "lng", "lat"}，不存在或已过期时返回None
+        """
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT bd_lng, bd_lat, lng, lat, created_at FROM geocode "
+                "WHERE city = ? AND address = ?",
+                (self.normalize(city), self.normalize(address))
+            ).fetchone()
+            if row is None or self._is_expired(row[4]):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(zip(["bd_lng", "bd_lat", "lng", "lat"], row[:4]))
+
+
+    def put(
+            self, city: str, address: str, bd_lng: float, bd_lat: float,
+            lng: float, lat: float
+    ) -> None:
+
+        """
+        写入(或覆盖)一条地址解析结果
+        """
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.normalize(city), self.normalize(address),
+                    bd_lng, bd_lat, lng, lat, time.time()
+                )
+            )
+            self._conn.commit()
@@ -8,9 +8,10 @@
 # This module encapsulates the class that converts         # 
 # addresses to latitude and longitude                      # 
 # ======================================================== #
-import requests
-
 from src.common.infoTool.const import AK_KEY
+from src.common.netTool.session import SessionPool
+from src.common.locTool.geocache import GeocodeCache
+from src.common.locTool.gazetteer import Gazetteer
 from src.common.locTool.coordutils import CoordTransformer
 
 
@@ -20,10 +21,17 @@ class GetLongitudeLatitude:
     获取某个地址的经纬度
     """
 
-    def __init__(self, city: str, address: str) -> None:
+    def __init__(
+            self, city: str, address: str, cache: GeocodeCache=None,
+            is_cache: bool=True, gazetteer: Gazetteer=None, is_gazetteer: bool=True
+    ) -> None:
 
         """
         初始化参数
+        cache: 地址解析结果的缓存，默认使用GeocodeCache.getDefault()
+        is_cache: 是否使用缓存，设置为False时总是请求百度地图接口且不写入缓存
+        gazetteer: 离线的地址查找表，缓存未命中时先模糊匹配已有的房源地址，默认使用Gazetteer.getDefault()
+        is_gazetteer: 是否使用离线的地址查找表，设置为False时缓存未命中即请求百度地图接口
         """
 
         self.url = "https://api.map.baidu.com/geocoding/v3"
@@ -32,7 +40,32 @@ class GetLongitudeLatitude:
         self.address = address
         self.longtitude = None
         self.latitude = None
+        self.bd_longitude = None        # 百度坐标系(BD-09)下的原始坐标
+        self.bd_latitude = None
+        self.similarity = None          # 由离线查找表得到时为匹配地址的相似度
+        self.source = None              # 结果的来源: "cache", "gazetteer"或"api"(包括请求失败)
+        self.cache = (cache if cache is not None else GeocodeCache.getDefault()) \
+            if is_cache else None
+
+        # ------ 优先从缓存中读取 ------ #
+        if self.cache is not None:
+            record = self.cache.get(city, address)
+            if record is not None:
+                self.bd_longitude, self.bd_latitude = record["bd_lng"], record["bd_lat"]
+                self.longtitude, self.latitude = record["lng"], record["lat"]
+                self.source = "cache"
+                return
+
+        # ------ 其次在离线查找表中模糊匹配，命中时只有转换后的坐标 ------ #
+        if is_gazetteer:
+            gazetteer = gazetteer if gazetteer is not None else Gazetteer.getDefault()
+            match = gazetteer.match(city, address)
+            if match is not None:
+                self.longtitude, self.latitude, self.similarity = match
+                self.source = "gazetteer"
+                return
 
+        self.source = "api"
         try:
             self.get_longitude_latitude()
         except:
@@ -51,7 +84,7 @@ class GetLongitudeLatitude:
             "output": "json",
             "ak": self.ak
         }
-        response = requests.get(url=self.url, params=params)
+        response = SessionPool.getSession("baidu").get(url=self.url, params=params)
         res = response.json()
 
         # ------ 从返回的json文件中获得经纬度坐标 ------ #
@@ -59,5 +92,15 @@ class GetLongitudeLatitude:
         latitude = res['result']['location']['lat']
 
         # ------ 使用坐标转换工具转换为真正的经纬度坐标 ------ #
-        self.longtitude = CoordTransformer(longtitude, latitude).res_lng
-        self.latitude = CoordTransformer(longtitude, latitude).res_lat
+        transformer = CoordTransformer(longtitude, latitude)
+        self.bd_longitude, self.bd_latitude = longtitude, latitude
+        self.longtitude = transformer.res_lng
+        self.latitude = transformer.res_lat
+
+        # ------ 写入缓存 ------ #
+        if self.cache is not None:
+            self.cache.put(
+                self.city, self.address, longtitude, latitude,
+                self.longtitude, self.latitude
+            )
+
@@ -0,0 +1,178 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-31                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A persistent SQLite cache of POI search results keyed on a    #
+# geohash-quantized location, so that listings of the same      #
+# compound share one search                                     #
+# ============================================================= #
+import time
+
+from src.common.fileTool.sqlitecache import SQLiteCache
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+class POICache(SQLiteCache):
+
+    """
+    周边设施检索结果的持久化缓存
+    以(类别, 位置的geohash, 半径)为键，同一个geohash格子内的位置共享一次检索结果，
+    精度为7时格子约为150m x 150m，相对1000m的检索半径误差很小。
+    半径不同时，只复用能够确定结果的记录：检索结果最多API_PAGE_SIZE条，
+    更大半径内没有设施时更小半径内也没有，更小半径内已达到上限时更大半径内也达到上限；
+    其余情况(例如以1000m的数量推断500m的数量)无法确定，视为未命中
+    """
+
+    FILE_NAME = "poi_cache.sqlite"
+    DEFAULT_TTL = 30 * 24 * 3600.0      # 默认有效期30天
+    DEFAULT_PRECISION = 7
+    API_PAGE_SIZE = 10                  # 百度地图检索接口每页返回的数量，即检索结果的上限
+    TABLE = "poi"
+    SCHEMA = """
+        category TEXT NOT NULL,
+        geohash TEXT NOT NULL,
+        radius INTEGER NOT NULL,
+        num_of_query INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (category, geohash, radius)
+    """
+
+    _default = None
+
+    def __init__(
+            self, path: str=None, ttl: float=DEFAULT_TTL,
+            precision: int=DEFAULT_PRECISION
+    ) -> None:
+
+        """
+        path, ttl: 见SQLiteCache，有效期默认为30天
+        precision: geohash的长度，越长格子越小，命中率越低
+        """
+
+        super().__init__(path, ttl)
+        self.precision = precision
+
+
+    @staticmethod
+    def geohash(lat: float, lng: float, precision: int=DEFAULT_PRECISION) -> str:
+
+        """
+        计算位置的geohash，经度与纬度的二分结果交替组成比特串，每5位编码为一个字符
+        """
+
+        lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+        code, bits, value, is_lng = [], 0, 0, True
+        while len(code) < precision:
+            interval, coord = (lng_range, lng) if is_lng else (lat_range, lat)
+            mid = (interval[0] + interval[1]) / 2
+            value <<= 1
+            if coord >= mid:
+                value |= 1
+                interval[0] = mid
+            else:
+                interval[1] = mid
+            is_lng = not is_lng
+            bits += 1
+            if bits == 5:
+                code.append(GEOHASH_BASE32[value])
+                bits, value = 0, 0
+        return "".join(code)
+
+
+    @staticmethod
+    def cell_center(geohash: str) -> tuple[float, float]:
+
+        """
+        geohash格子的中心点(纬度, 经度)，与geohash()的二分过程相反
+        """
+
+        lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+        is_lng = True
+        for char in geohash:
+            value = GEOHASH_BASE32.index(char)
+            for shift in range(4, -1, -1):
+                interval = lng_range if is_lng else lat_range
+                mid = (interval[0] + interval[1]) / 2
+                if (value >> shift) & 1:
+                    interval[0] = mid
+                else:
+                    interval[1] = mid
+                is_lng = not is_lng
+        return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+    def _key(self, category: str, lat: float, lng: float, radius: int) -> tuple:
+
+        """
+        缓存的键，坐标缺失(None或NaN)时返回None，不参与缓存
+        """
+
+        if lat is None or lng is None or lat != lat or lng != lng:
+            return None
+        return (category, self.geohash(lat, lng, self.precision), int(radius))
+
+
+    def get(self, category: str, lat: float, lng: float, radius: int) -> int:
+
+        """
+        查询缓存，返回检索到的数量，不存在、已过期或无法由其他半径的记录确定时返回None
+        """
+
+        key = self._key(category, lat, lng, radius)
+        if key is None:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT radius, num_of_query, created_at FROM poi "
+                "WHERE category = ? AND geohash = ?", key[:2]
+            ).fetchall()
+            num_of_query = self._reuse(
+                [(r, n) for r, n, created_at in rows if not self._is_expired(created_at)],
+                key[2]
+            )
+            if num_of_query is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return num_of_query
+
+
+    def _reuse(self, records: list[tuple[int, int]], radius: int) -> int:
+
+        """
+        由同一位置各个半径的(半径, 数量)记录确定radius内的数量，无法确定时返回None
+        """
+
+        for record_radius, num_of_query in records:
+            if record_radius == radius:
+                return num_of_query
+        for record_radius, num_of_query in records:
+            if record_radius > radius and num_of_query == 0:
+                return 0
+            if record_radius < radius and num_of_query >= self.API_PAGE_SIZE:
+                return num_of_query
+        return None
+
+
+    def put(
+            self, category: str, lat: float, lng: float, radius: int,
+            num_of_query: int
+    ) -> None:
+
+        """
+        写入(或覆盖)一次检索结果
+        """
+
+        key = self._key(category, lat, lng, radius)
+        if key is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO poi VALUES (?, ?, ?, ?, ?)",
+                key + (num_of_query, time.time())
+            )
+            self._conn.commit()
@@ -0,0 +1,132 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-30                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Counts points of interest around many locations at once from  #
+# a local POI snapshot indexed with a KD-tree                   #
+# ============================================================= #
+import os
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from src.common.fileTool.filesio import FilesIO
+
+EARTH_RADIUS = 6371008.8        # 地球平均半径(米)
+
+
+class POIIndex:
+
+    """
+    离线的周边设施检索
+    读取某个城市的POI快照(每行为 category, lat, lng，坐标系与房源经纬度一致，即WGS84)，
+    每个类别建立一棵KD树。坐标先转换为单位球面上的三维直角坐标，
+    球面距离r对应的弦长为2*sin(r/2R)，因此半径检索得到的是精确的球面距离，
+    所有房源的检索一次完成，不需要任何网络请求
+    """
+
+    FOLDER_NAME = "poi_snapshot"
+    API_PAGE_SIZE = 10      # 百度地图检索接口每页返回的数量，在线模式下计数的上限
+
+    def __init__(self, poi: pd.DataFrame) -> None:
+
+        """
+        poi: 包含category, lat, lng三列的DataFrame
+        """
+
+        self.trees = {}
+        for category, group in poi.groupby("category"):
+            self.trees[category] = cKDTree(
+                self.to_xyz(group["lat"].to_numpy(), group["lng"].to_numpy())
+            )
+
+
+    @staticmethod
+    def snapshot_path(city: str) -> str:
+
+        """
+        城市POI快照的默认路径，优先使用parquet文件
+        """
+
+        folder = os.path.join(FilesIO.getDataset(), POIIndex.FOLDER_NAME)
+        parquet_path = os.path.join(folder, "%s_poi.parquet" % city)
+        if os.path.exists(parquet_path):
+            return parquet_path
+        return os.path.join(folder, "%s_poi.csv" % city)
+
+
+    @staticmethod
+    def load(city: str=None, path: str=None) -> "POIIndex":
+
+        """
+        读取POI快照(csv或parquet)并建立索引
+        city: 城市名称，例如北京市(city="BJ")，读取datasets/poi_snapshot/<city>_poi.csv
+        path: 直接指定快照文件的路径
+        """
+
+        path = path if path is not None else POIIndex.snapshot_path(city)
+        if path.endswith(".parquet"):
+            poi = pd.read_parquet(path, columns=["category", "lat", "lng"])
+        else:
+            poi = pd.read_csv(path, usecols=["category", "lat", "lng"])
+        return POIIndex(poi.dropna())
+
+
+    @staticmethod
+    def to_xyz(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+
+        """
+        经纬度转换为单位球面上的三维直角坐标
+        """
+
+        lat, lng = np.radians(lat), np.radians(lng)
+        return np.column_stack([
+            np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)
+        ])
+
+
+    def count(
+            self, category: str, lat: np.ndarray, lng: np.ndarray,
+            radius: float=1000, max_count: int=None
+    ) -> np.ndarray:
+
+        """
+        统计每个位置半径radius(米)内某一类别的设施数量
+        lat, lng: 位置的经纬度数组，缺失的位置返回NaN
+        max_count: 计数的上限，传入API_PAGE_SIZE时与在线检索的结果可比
+        """
+
+        lat = np.asarray(lat, dtype=float)
+        lng = np.asarray(lng, dtype=float)
+        counts = np.full(len(lat), np.nan)
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        tree = self.trees.get(category)
+        if tree is None:
+            counts[valid] = 0
+            return counts
+
+        chord = 2 * np.sin(radius / (2 * EARTH_RADIUS))
+        counts[valid] = tree.query_ball_point(
+            self.to_xyz(lat[valid], lng[valid]), r=chord, return_length=True
+        )
+        if max_count is not None:
+            counts = np.minimum(counts, max_count)
+        return counts
+
+
+    def count_all(
+            self, categories: dict[str, str], lat: np.ndarray, lng: np.ndarray,
+            radius: float=1000, max_count: int=None
+    ) -> dict[str, np.ndarray]:
+
+        """
+        一次统计多个类别，categories为 列名->类别 的字典，返回 列名->计数
+        """
+
+        return {
+            column: self.count(category, lat, lng, radius, max_count)
+            for column, category in categories.items()
+        }
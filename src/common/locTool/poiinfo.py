@@ -6,9 +6,9 @@
 # ========================================================================== #
 # @Description: Used to obtain POI information for the current location      #
 # ========================================================================== #
-import requests
-
 from src.common.infoTool.const import AK_KEY
+from src.common.netTool.session import SessionPool
+from src.common.locTool.poicache import POICache
 
 
 class POICollector:
@@ -19,23 +19,36 @@ class POICollector:
     """
 
     def __init__(
-            self, query: str, lat: float, lng: float, radius: int=2000
+            self, query: str, lat: float, lng: float, radius: int=2000,
+            cache: POICache=None, is_cache: bool=True
     ) -> None:
         
         """
         初始化参数
         query: 检索目标
         lat, lng: 当前位置的坐标
+        cache: 检索结果的缓存，默认使用POICache.getDefault()
+        is_cache: 是否使用缓存，设置为False时总是请求百度地图接口且不写入缓存
         """
 
         self.url = "https://api.map.baidu.com/place/v2/search"
         self.ak = AK_KEY
         self.query = query
+        self.lat = lat
+        self.lng = lng
         self.location = f"{lat},{lng}"
         self.radius = radius
 
         # ------ 检索结果 ------ #
         self.num_of_query = None
+        self.cache = (cache if cache is not None else POICache.getDefault()) \
+            if is_cache else None
+
+        # ------ 优先从缓存中读取 ------ #
+        if self.cache is not None:
+            self.num_of_query = self.cache.get(query, lat, lng, radius)
+            if self.num_of_query is not None:
+                return
 
         try:
             self.get_poi_info()
@@ -53,11 +66,15 @@ class POICollector:
             "ak": self.ak,
         }
 
-        response = requests.get(url=self.url, params=params)
+        response = SessionPool.getSession("baidu").get(url=self.url, params=params)
         res = response.json()
 
         # ------ 从返回的json文件中获取结果 ------ #
         if res["status"] == 0:
             self.num_of_query = len(res["results"])
+            if self.cache is not None:
+                self.cache.put(
+                    self.query, self.lat, self.lng, self.radius, self.num_of_query
+                )
         else:
             self.num_of_query = None
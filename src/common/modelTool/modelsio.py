@@ -55,3 +55,27 @@ class ModelsIO:
         else:
             model_path = os.path.join(resources_path, "models", model_name)
             return joblib.load(model_path)
+
+
+    @staticmethod
+    def savePipeline(preprocessor: Any, model: Any, model_name: str=None) -> None:
+
+        """
+        将拟合好的预处理管道与模型保存在同一个文件中，
+        加载后可以直接对新数据transform并predict，不需要重新拟合预处理管道
+        """
+
+        ModelsIO.saveModel(
+            {"preprocessor": preprocessor, "model": model}, model_name
+        )
+
+
+    @staticmethod
+    def loadPipeline(model_name: str=None) -> tuple[Any, Any]:
+
+        """
+        加载savePipeline保存的(预处理管道, 模型)
+        """
+
+        pipeline = ModelsIO.loadModel(model_name)
+        return pipeline["preprocessor"], pipeline["model"]
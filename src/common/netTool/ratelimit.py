@@ -0,0 +1,249 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-22                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Per-host token bucket rate limiting and jittered exponential  #
+# backoff for the crawlers                                      #
+# ============================================================= #
+import time
+import random
+import asyncio
+import threading
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+
+class RequestStats:
+
+    """
+    请求计数器，记录请求次数、重试次数以及被限流和退避等待的时间
+    """
+
+    def __init__(self) -> None:
+
+        self.attempts = 0               # 总请求次数
+        self.retries = 0                # 重试次数
+        self.successes = 0              # 成功次数
+        self.failures = 0               # 超过最大重试次数而放弃的次数
+        self.throttled_time = 0.0       # 等待令牌的总时间(秒)
+        self.backoff_time = 0.0         # 失败后退避的总时间(秒)
+        self._lock = threading.Lock()
+
+
+    def add(self, **counters) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+    def as_dict(self) -> dict:
+        return {
+            "attempts": self.attempts, "retries": self.retries,
+            "successes": self.successes, "failures": self.failures,
+            "throttled_time": round(self.throttled_time, 3),
+            "backoff_time": round(self.backoff_time, 3),
+        }
+
+
+    def summary(self) -> str:
+        return (
+            "attempts=%(attempts)d, retries=%(retries)d, "
+            "successes=%(successes)d, failures=%(failures)d, "
+            "throttled=%(throttled_time).3fs, backoff=%(backoff_time).3fs"
+            % self.as_dict()
+        )
+
+
+class TokenBucket:
+
+    """
+    令牌桶，按rate(个/秒)补充令牌，最多积累capacity个
+    请求失败时速率减半(不低于min_rate)，成功时逐步恢复到rate，
+    以在站点可以承受的范围内获得尽可能高的吞吐量
+    """
+
+    def __init__(
+            self, rate: float, capacity: int=1, min_rate: float=None
+    ) -> None:
+
+        """
+        rate: 令牌补充速率(个/秒)，即允许的最大请求速率
+        capacity: 令牌桶容量，即允许的突发请求数
+        min_rate: 失败降速时的最低速率，默认为rate的1/8
+        """
+
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 8
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def reserve(self) -> float:
+
+        """
+        预定一个令牌，返回拿到令牌前需要等待的时间(秒)
+        令牌数可以为负，表示已经被预定的未来的令牌
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+    def penalize(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+
+    def reward(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class BackoffPolicy:
+
+    """
+    带随机抖动的指数退避(full jitter)
+    第n次重试前等待[0, min(max_delay, base * factor^(n-1))]内的随机时间
+    """
+
+    def __init__(
+            self, base: float=1.0, factor: float=2.0, max_delay: float=60.0
+    ) -> None:
+
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(
+            0, min(self.max_delay, self.base * self.factor ** (retry - 1))
+        )
+
+
+class RateLimiter:
+
+    """
+    按站点(host)区分令牌桶的请求执行器，负责限流、失败重试以及计数
+    同一个RateLimiter可以被多个爬虫共享，以保证对同一站点的总速率不超过限制
+    """
+
+    def __init__(
+            self, rate: float=0.5, capacity: int=1, max_retry: int=None,
+            backoff: BackoffPolicy=None
+    ) -> None:
+
+        """
+        rate: 每个站点允许的最大请求速率(次/秒)
+        capacity: 每个站点允许的突发请求数
+        max_retry: 最大重试次数，默认一直重试直到成功
+        backoff: 失败后的退避策略
+        """
+
+        self.rate = rate
+        self.capacity = capacity
+        self.max_retry = max_retry
+        self.backoff = backoff if backoff is not None else BackoffPolicy()
+        self.stats = RequestStats()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+
+    def bucket(self, url: str) -> TokenBucket:
+
+        """
+        获取url所在站点的令牌桶
+        """
+
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[host]
+
+
+    def _can_retry(self, attempts: int) -> bool:
+        return self.max_retry is None or attempts <= self.max_retry
+
+
+    def call(self, url: str, func: Callable[..., Any], *args) -> Any:
+
+        """
+        同步执行func(*args)，返回None视为失败并在退避后重试
+        超过最大重试次数时返回None
+        """
+
+        bucket = self.bucket(url)
+        attempts = 0
+        while self._can_retry(attempts):
+            if attempts > 0:
+                wait = self.backoff.delay(attempts)
+                self.stats.add(retries=1, backoff_time=wait)
+                time.sleep(wait)
+            attempts += 1
+
+            # ------ 获取令牌，成功时不再额外等待 ------ #
+            wait = bucket.reserve()
+            if wait > 0:
+                self.stats.add(throttled_time=wait)
+                time.sleep(wait)
+            self.stats.add(attempts=1)
+
+            result = func(*args)
+            if result is not None:
+                bucket.reward()
+                self.stats.add(successes=1)
+                return result
+            bucket.penalize()
+        self.stats.add(failures=1)
+        return None
+
+
+    async def call_async(
+            self, url: str, func: Callable[..., Any], *args,
+            executor=None
+    ) -> Any:
+
+        """
+        call的异步版本，阻塞的func在executor中执行
+        """
+
+        loop = asyncio.get_running_loop()
+        bucket = self.bucket(url)
+        attempts = 0
+        while self._can_retry(attempts):
+            if attempts > 0:
+                wait = self.backoff.delay(attempts)
+                self.stats.add(retries=1, backoff_time=wait)
+                await asyncio.sleep(wait)
+            attempts += 1
+
+            # ------ 获取令牌，成功时不再额外等待 ------ #
+            wait = bucket.reserve()
+            if wait > 0:
+                self.stats.add(throttled_time=wait)
+                await asyncio.sleep(wait)
+            self.stats.add(attempts=1)
+
+            result = await loop.run_in_executor(executor, func, *args)
+            if result is not None:
+                bucket.reward()
+                self.stats.add(successes=1)
+                return result
+            bucket.penalize()
+        self.stats.add(failures=1)
+        return None
@@ -0,0 +1,129 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-24                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Shared keep-alive HTTP sessions with connection pools and     #
+# retry adapters for the crawler and the Baidu map clients      #
+# ============================================================= #
+import threading
+import requests
+from http.cookiejar import DefaultCookiePolicy
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+
+
+class TimeoutSession(requests.Session):
+
+    """
+    带有默认超时的会话，请求没有指定timeout时使用默认值，避免请求无限期等待
+    """
+
+    def __init__(self, timeout: float=None) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().request(method, url, **kwargs)
+
+
+class SessionPool:
+
+    """
+    按名称共享的HTTP会话
+    同一名称的会话在整个进程内只创建一次，连接在请求之间保持(keep-alive)复用，
+    避免每次请求都重新建立TCP/TLS连接；所有请求默认有超时(TIMEOUT)
+    """
+
+    _sessions = {}
+    _lock = threading.Lock()
+
+    # ------ 默认配置 ------ #
+    POOL_CONNECTIONS = 16       # 缓存连接池的站点数量
+    POOL_MAXSIZE = 32           # 每个站点连接池的最大连接数
+    MAX_RETRIES = 3             # 连接错误以及5xx/429状态码的自动重试次数
+    BACKOFF_FACTOR = 0.5        # 自动重试的退避系数
+    TIMEOUT = (3.05, 10.0)      # 请求没有指定timeout时的默认值(连接, 读取)，单位秒
+
+    @staticmethod
+    def getSession(
+            name: str="default", pool_connections: int=None,
+            pool_maxsize: int=None, max_retries: int=None,
+            backoff_factor: float=None, timeout: float=None,
+            is_cookies: bool=True
+    ) -> requests.Session:
+
+        """
+        获取名为name的会话，第一次获取时按照参数创建，之后的参数不再生效
+        name: 会话名称，例如爬虫使用"crawler"，百度地图接口使用"baidu"
+        pool_connections: 缓存连接池的站点数量
+        pool_maxsize: 每个站点连接池的最大连接数，应不小于并发线程数
+        max_retries: 自动重试次数，由调用者自行重试时设置为0
+        backoff_factor: 自动重试的退避系数
+        timeout: 请求没有指定timeout时的默认超时，默认为TIMEOUT
+        is_cookies: 是否保存响应中的cookie并在之后的请求中发送；
+                    爬虫经由不同的代理共享同一个会话，设置为False，
+                    避免一个代理得到的验证码、反爬虫cookie被其他代理带上
+        """
+
+        with SessionPool._lock:
+            session = SessionPool._sessions.get(name)
+            if session is None:
+                session = SessionPool._create(
+                    pool_connections if pool_connections is not None
+                    else SessionPool.POOL_CONNECTIONS,
+                    pool_maxsize if pool_maxsize is not None
+                    else SessionPool.POOL_MAXSIZE,
+                    max_retries if max_retries is not None
+                    else SessionPool.MAX_RETRIES,
+                    backoff_factor if backoff_factor is not None
+                    else SessionPool.BACKOFF_FACTOR,
+                    timeout if timeout is not None else SessionPool.TIMEOUT,
+                    is_cookies,
+                )
+                SessionPool._sessions[name] = session
+            return session
+
+
+    @staticmethod
+    def closeAll() -> None:
+
+        """
+        关闭所有会话并释放连接
+        """
+
+        with SessionPool._lock:
+            for session in SessionPool._sessions.values():
+                session.close()
+            SessionPool._sessions.clear()
+
+
+    @staticmethod
+    def _create(
+            pool_connections: int, pool_maxsize: int,
+            max_retries: int, backoff_factor: float, timeout: float,
+            is_cookies: bool
+    ) -> requests.Session:
+
+        retry = Retry(
+            total=max_retries, connect=max_retries, read=max_retries,
+            status=max_retries, backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"], raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+            max_retries=retry, pool_block=False,
+        )
+        session = TimeoutSession(timeout)
+        if not is_cookies:
+            # 不接受任何域名的cookie，响应中的Set-Cookie不会写入会话
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
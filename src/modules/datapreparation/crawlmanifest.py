@@ -0,0 +1,127 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-21                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# This module records the state of every crawled page so that   #
+# an interrupted crawl can be resumed                           #
+# ============================================================= #
+import os
+import json
+import time
+import threading
+
+from src.common.fileTool.pagestore import PageStore
+
+
+class CrawlManifest:
+
+    """
+    每个城市一份的爬取清单，存放在<city>_htmls/manifest.json中
+    记录每一页的状态、内容哈希以及获取时间，重新启动爬取时只获取缺失或过期的页面
+    """
+
+    FILE_NAME = "manifest.json"
+
+    def __init__(
+            self, data_folder: str, city: str, store: PageStore,
+            max_age: float=None
+    ) -> None:
+
+        """
+        data_folder: 存放清单的文件夹，即<city>_htmls
+        city: 城市名称，例如北京市(city="BJ")
+        store: 存放页面内容的仓库
+        max_age: 页面的有效期(秒)，超过有效期的页面会被重新获取，默认永不过期
+        """
+
+        self.data_folder = data_folder
+        self.city = city
+        self.store = store
+        self.max_age = max_age
+        self.path = os.path.join(data_folder, self.FILE_NAME)
+        self._lock = threading.Lock()
+
+        # ------ 读取已有的清单 ------ #
+        self.pages = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.pages = {
+                        int(page): record
+                        for page, record in json.load(f)["pages"].items()
+                    }
+            except (ValueError, KeyError):
+                print("ERROR: Broken manifest of %s, rebuilding..." % city)
+                self.pages = {}
+
+
+    def is_fresh(self, page: int) -> bool:
+
+        """
+        判断某一页是否已经成功获取且仍在有效期内
+        """
+
+        record = self.pages.get(page)
+        if record is None:
+            # 没有记录但文件已经存在(旧版本爬取的页面)，按文件修改时间补录
+            path = self.store.legacy_path(self.city, page)
+            if not os.path.exists(path):
+                return False
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            self.record(page, "ok", text, fetched_at=os.path.getmtime(path))
+            record = self.pages[page]
+
+        if record["status"] != "ok" or not self.store.has(self.city, page):
+            return False
+        if self.max_age is not None and \
+           time.time() - record["fetched_at"] > self.max_age:
+            return False
+        return True
+
+
+    def pending(self, pages: range) -> list[int]:
+
+        """
+        返回需要(重新)获取的页码
+        """
+
+        return [page for page in pages if not self.is_fresh(page)]
+
+
+    def record(
+            self, page: int, status: str, text: str=None,
+            fetched_at: float=None
+    ) -> None:
+
+        """
+        记录某一页的获取结果并立即写入磁盘
+        status: "ok"表示成功，"failed"表示超过最大重试次数
+        """
+
+        with self._lock:
+            self.pages[page] = {
+                "status": status,
+                "hash": PageStore.content_hash(text) if text is not None else None,
+                "fetched_at": fetched_at if fetched_at is not None else time.time(),
+            }
+            self._dump()
+
+
+    def _dump(self) -> None:
+
+        """
+        先写入临时文件再替换，避免中断时留下损坏的清单
+        """
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"city": self.city, "pages": {
+                    str(page): self.pages[page] for page in sorted(self.pages)
+                }}, f, ensure_ascii=False, indent=1
+            )
+        os.replace(tmp_path, self.path)
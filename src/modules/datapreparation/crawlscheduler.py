@@ -0,0 +1,155 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-23                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# This module schedules the crawls of several cities in         #
+# parallel, interleaving their pages across hosts               #
+# ============================================================= #
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.common.infoTool.const import CONST_TABLE
+from src.common.infoTool.proxypool import ProxyPool
+from src.common.netTool.ratelimit import RateLimiter
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+
+
+class MultiCityCrawlScheduler:
+
+    """
+    多城市爬取调度器
+    每个城市都是58同城的一个独立子域名(bj.58.com, sh.58.com, ...)，
+    因此各城市的页面队列可以并行爬取：每个站点有各自的并发上限与令牌桶，
+    所有站点共享一个全局并发上限
+    """
+
+    def __init__(
+            self, cities: list[str]=None, headers: dict=None,
+            proxies: dict=None, cookie: str=None, max_retry: int=None,
+            concurrency: int=4, global_concurrency: int=32,
+            rate: float=0.5, burst: int=1, page_num: int=50,
+            base_urls: dict[str, str]=None, save_path: str=None,
+            max_age: float=None, report_interval: float=10.0,
+            proxy_pool: ProxyPool=None, timeout: float=10.0
+    ) -> None:
+
+        """
+        cities: 待爬取的城市列表，默认为CONST_TABLE["URL"]中的全部城市
+        headers, proxies, cookie, max_retry, proxy_pool, timeout:
+            与HousingDataSpider相同，代理池由所有城市共享
+        concurrency: 每个站点同时进行的最大请求数
+        global_concurrency: 所有站点同时进行的最大请求数
+        rate, burst: 每个站点的最大请求速率(次/秒)与允许的突发请求数
+        page_num: 每个城市爬取的页数
+        base_urls: 替换部分城市的地址，例如指向本地的测试服务器
+        save_path: 替换页面仓库的根目录，默认为FilesIO.getHTMLtext()
+        max_age: 已获取页面的有效期(秒)
+        report_interval: 打印进度的时间间隔(秒)
+        """
+
+        self.cities = cities if cities is not None \
+            else list(CONST_TABLE["URL"].keys())
+        self.global_concurrency = global_concurrency
+        self.report_interval = report_interval
+
+        # ------ 所有城市共享一个限流器，令牌桶按站点区分 ------ #
+        self.limiter = RateLimiter(rate=rate, capacity=burst, max_retry=max_retry)
+
+        # ------ 为每个城市准备爬虫，但不立即开始爬取 ------ #
+        base_urls = base_urls if base_urls is not None else {}
+        self.spiders = {
+            city: HousingDataSpider(
+                city=city, headers=headers, proxies=proxies, cookie=cookie,
+                concurrency=concurrency, limiter=self.limiter,
+                page_num=page_num, base_url=base_urls.get(city),
+                save_path=save_path, max_age=max_age, is_start=False,
+                proxy_pool=proxy_pool, timeout=timeout
+            ) for city in self.cities
+        }
+        self.start_time = {}
+        self.end_time = {}
+
+
+    def run(self) -> dict[str, dict]:
+
+        """
+        并行爬取所有城市，返回每个城市的爬取报告
+        """
+
+        asyncio.run(self._run_async())
+        report = self.report()
+        for city, item in report.items():
+            print(
+                "%s: %d/%d pages, %d failed, %.1fs, %.2f pages/s" % (
+                    city, item["done"], item["pending"], item["failed"],
+                    item["elapsed"], item["throughput"]
+                )
+            )
+        print("Requests: %s" % self.limiter.stats.summary())
+        return report
+
+
+    def report(self) -> dict[str, dict]:
+
+        """
+        每个城市的进度与吞吐量
+        """
+
+        now = time.time()
+        report = {}
+        for city, spider in self.spiders.items():
+            elapsed = self.end_time.get(city, now) - self.start_time.get(city, now)
+            report[city] = {
+                "pending": len(spider.pending_pages),
+                "done": spider.done_pages,
+                "failed": spider.failed_pages,
+                "elapsed": elapsed,
+                "throughput": spider.done_pages / elapsed if elapsed > 0 else 0.0,
+            }
+        return report
+
+
+    async def _run_async(self) -> None:
+
+        global_semaphore = asyncio.Semaphore(self.global_concurrency)
+        with ThreadPoolExecutor(max_workers=self.global_concurrency) as executor:
+            reporter = asyncio.ensure_future(self._report_progress())
+            try:
+                await asyncio.gather(*[
+                    self._crawl_city(city, global_semaphore, executor)
+                    for city in self.cities
+                ])
+            finally:
+                reporter.cancel()
+
+
+    async def _crawl_city(
+            self, city: str, global_semaphore: asyncio.Semaphore,
+            executor: ThreadPoolExecutor
+    ) -> None:
+
+        self.start_time[city] = time.time()
+        try:
+            await self.spiders[city].crawl_async(global_semaphore, executor)
+        except Exception as e:
+            print("Error: Failed to get data from %s (%s)" % (city, e))
+        self.end_time[city] = time.time()
+
+
+    async def _report_progress(self) -> None:
+
+        """
+        定期打印各城市的进度
+        """
+
+        while True:
+            await asyncio.sleep(self.report_interval)
+            progress = [
+                "%s %d/%d" % (city, item["done"] + item["failed"], item["pending"])
+                for city, item in self.report().items()
+            ]
+            print("Progress: " + ", ".join(progress))
@@ -9,12 +9,19 @@
 # ============================================================== #
 import os
 import time
-import random
+import asyncio
 import requests
 from lxml import etree
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.pagestore import PageStore
 from src.common.infoTool.const import CONST_TABLE
+from src.common.infoTool.proxypool import ProxyPool
+from src.common.netTool.session import SessionPool
+from src.common.netTool.ratelimit import RateLimiter
+from src.modules.datapreparation.crawlmanifest import CrawlManifest
 
 
 class HousingDataSpider:
@@ -25,14 +32,35 @@ class HousingDataSpider:
 
     def __init__(
         self, city: str=None, headers: dict=None, 
-        proxies: dict=None, cookie: str=None, max_retry: int=None
+        proxies: dict=None, cookie: str=None, max_retry: int=None,
+        is_async: bool=False, concurrency: int=4, rate: float=0.5,
+        burst: int=1, limiter: RateLimiter=None, page_num: int=50,
+        base_url: str=None, save_path: str=None, max_age: float=None,
+        is_start: bool=True, proxy_pool: ProxyPool=None, timeout: float=10.0,
+        on_page: Callable[[int, str], None]=None
     ) -> None:
         
         """
         city: 待爬取城市, 例如北京市(city="BJ")
         headers: 请求头
-        proxies: 代理IP
+        proxies: 代理IP，传入proxy_pool时忽略
         max_retry: 最大重试次数，超过会放弃当前页的获取，默认一直爬直到获取到数据
+        is_async: 是否使用asyncio并发爬取
+        concurrency: 异步模式下对同一站点同时进行的最大请求数
+        rate: 对同一站点的最大请求速率(次/秒)，用于避免反爬
+        burst: 允许的突发请求数
+        limiter: 共享的限流器，传入时忽略max_retry、rate和burst
+        page_num: 爬取的页数
+        base_url: 替换CONST_TABLE["URL"]中的地址，例如指向本地的测试服务器
+        save_path: 替换页面仓库的根目录，默认为FilesIO.getHTMLtext()
+        max_age: 已获取页面的有效期(秒)，超过有效期的页面会被重新获取，默认永不过期
+        is_start: 是否立即开始爬取，设置为False时由调用者(例如多城市调度器)
+                  自行调用crawl_async
+        proxy_pool: 代理池，每次请求都从中选择代理并报告结果
+        timeout: 单次请求的超时时间(秒)，避免卡在失效的代理上
+        on_page: 每成功获取并存储一页后调用on_page(页码, html文本)，
+                 例如交给流式管道立即解析；异步模式下与页面的存储一起在单独的线程中依次调用，
+                 阻塞不会暂停其他页面的请求，但会推迟之后页面的存储与on_page
         """
 
         # ------ 检查输入 ------ #
@@ -48,114 +76,218 @@ class HousingDataSpider:
             self.city = city
         
         self.proxies = proxies
-        self.headers = headers
+        self.proxy_pool = proxy_pool
+        self.timeout = timeout
+        self.headers = headers if headers is not None else {}
         if cookie is not None:
             self.headers["cookie"] = cookie
+        self.concurrency = concurrency
+        self.page_num = page_num
+        self.on_page = on_page
+        self.base_url = base_url if base_url is not None \
+            else CONST_TABLE["URL"][self.city]
 
-        # ------ 设置最大重试次数 ------ #
-        self.requests_num = 0       # 总请求次数，用于max_retry的验证
-        if max_retry is None:
-            # 默认一直请求直到获得数据
-            self.flag = "True"
-        else:
-            # 小于等于max_retry时进行请求，超过则不再请求
-            self.flag = "self.requests_num <= %d" % max_retry
+        # ------ 共享的keep-alive会话，重试由限流器负责，不再自动重试，不保存响应中的cookie ------ #
+        self.session = SessionPool.getSession(
+            "crawler", max_retries=0, is_cookies=False
+        )
+
+        # ------ 限流与重试 ------ #
+        # 令牌桶控制请求速率，失败时指数退避，成功时不额外等待
+        if limiter is None:
+            limiter = RateLimiter(rate=rate, capacity=burst, max_retry=max_retry)
+        self.limiter = limiter
         
         # ------ 创建存储数据的文件夹 ------ #
         self.folder_name = city + "_htmls"
-        data_folder = os.path.join(FilesIO.getHTMLtext(), self.folder_name)
-        if not os.path.exists(data_folder):
-            os.mkdir(data_folder)
+        self.save_path = save_path if save_path is not None \
+            else FilesIO.getHTMLtext()
+        self.data_folder = os.path.join(self.save_path, self.folder_name)
+        if not os.path.exists(self.data_folder):
+            os.makedirs(self.data_folder)
         else:
             pass
 
-        # ------ 获取HTML数据 ------ #
+        # ------ 页面压缩后按内容哈希存入仓库 ------ #
+        self.store = PageStore(self.save_path)
+
+        # ------ 读取爬取清单，只获取缺失或过期的页面 ------ #
+        self.manifest = CrawlManifest(
+            self.data_folder, city, self.store, max_age=max_age
+        )
+        self.pending_pages = self.manifest.pending(range(1, page_num + 1))
+        self.done_pages = 0         # 已成功获取的页数
+        self.failed_pages = 0       # 超过最大重试次数的页数
+        print(
+            "%d of %d pages of %s need to be fetched..." %
+            (len(self.pending_pages), page_num, city)
+        )
+        if not is_start:
+            return
+        self.crawl(is_async)
+
+
+    def crawl(self, is_async: bool=False) -> None:
+
+        """
+        获取所有待获取的页面
+        每一页的结果都会立即写入清单，中断后重新运行即可从断点继续
+        """
+
         try:
-            self._get_first_page_data()
-            time.sleep(random.randint(5, 10))
-            self._get_rest_of_pages()
-        except:
-            print("Error: Failed to get data from %s" % self.city) 
+            if is_async:
+                asyncio.run(self.crawl_async())
+            else:
+                self._crawl()
+        except Exception as e:
+            print("Error: Failed to get data from %s (%s)" % (self.city, e))
+        print("Requests of %s: %s" % (self.city, self.limiter.stats.summary()))
 
 
-    def _get_first_page_data(self) -> None:
+    def _page_url(self, page: int) -> str:
 
         """
-        获取第一页的数据
+        获取第page页的url，第1页没有页码后缀
         """
 
-        while eval(self.flag):
-            # 计数，循环每进行一次就会发一次请求
-            self.requests_num += 1
+        if page == 1:
+            return self.base_url
+        return self.base_url + "p%d/" % page
+
 
-            # ------ 设置随机延时避免反爬 ------ #
-            time.sleep(random.randint(5, 10))
+    def _request_page(self, page: int) -> str:
 
-            # ------ 发送请求并设置编码 ------ #
-            response = requests.get(
-                url=CONST_TABLE["URL"][self.city],
-                headers=self.headers, proxies=self.proxies,
+        """
+        请求第page页，返回包含房源信息的html文本，没有房源信息时返回None
+        """
+
+        # ------ 从代理池中选择代理 ------ #
+        proxy, proxies = None, self.proxies
+        if self.proxy_pool is not None:
+            proxy = self.proxy_pool.acquire()
+            proxies = ProxyPool.to_requests(proxy)
+
+        # ------ 发送请求并设置编码 ------ #
+        start_time = time.monotonic()
+        try:
+            response = self.session.get(
+                url=self._page_url(page), headers=self.headers,
+                proxies=proxies, timeout=self.timeout,
             )
-            response.encoding = "utf-8"
-
-            # ------ 获取html文件并储存 ------ #
-            tree = etree.HTML(response.text)
-            if len(tree.xpath('//div[@class="property"]')) != 0:
-                file_name = "%s_page_%d.html" % (self.city, 1)
-                path = FilesIO.getHTMLtext("%s/%s" % (self.folder_name, file_name))
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(response.text)
-                print("Get data from page_%d successfully!" % 1)
-                # 数据请求成功，循环即将退出(break)，将该数字重置为0，以便下次继续使用
-                self.requests_num = 0
-                break
-            else:
-                print("ERROR: Failed to get data from page_1. Retry...")
-        
+        except requests.RequestException:
+            if proxy is not None:
+                self.proxy_pool.report(proxy, False)
+            return None
+        latency = time.monotonic() - start_time
+        response.encoding = "utf-8"
+
+        # ------ 检查页面中是否有房源信息 ------ #
+        # 没有房源信息通常意味着该代理被要求输入验证码，同样视为代理失败
+        tree = etree.HTML(response.text)
+        is_success = tree is not None and \
+            len(tree.xpath('//div[@class="property"]')) != 0
+        if proxy is not None:
+            self.proxy_pool.report(proxy, is_success, latency)
+        return response.text if is_success else None
+
+
+    def _save_page(self, page: int, text: str) -> None:
+
+        """
+        将第page页的html文件压缩存入页面仓库，内容相同的页面只存一份
+        """
+
+        self.store.put(self.city, page, text)
+        self.manifest.record(page, "ok", text)
+
+
+    def _handle_result(self, page: int, text: str) -> None:
+
+        """
+        储存获取成功的页面，或记录超过最大重试次数的页面
+        """
+
+        if text is not None:
+            self._save_page(page, text)
+            self.done_pages += 1
+            print("Get data from page_%d successfully!" % page)
+            if self.on_page is not None:
+                self.on_page(page, text)
         else:
-            # 请求失败，循环正常退出，没走break
-            # 说明达到最大重试次数，退出循环时将该数字重置为0，以便下次继续使用
-            self.requests_num = 0
-            print("ERROR: When getting data from page_1, max retry exceeded....")
+            self.manifest.record(page, "failed")
+            self.failed_pages += 1
+            print(
+                "ERROR: When getting data from page_%d, max retry exceeded..." % page
+            )
 
 
-    def _get_rest_of_pages(self) -> None:
+    def _crawl(self) -> None:
 
         """
-        获取其余页面的数据
+        依次获取所有待获取的页面
         """
 
-        for i in range(2, 51):
-            while eval(self.flag):
-                # 计数，循环每进行一次就会发一次请求
-                self.requests_num += 1
+        for page in self.pending_pages:
+            text = self.limiter.call(
+                self._page_url(page), self._request_page, page
+            )
+            self._handle_result(page, text)
+
 
-                # ------ 设置随机延时避免反爬 ------ #
-                time.sleep(random.randint(5, 10))
+    async def crawl_async(
+            self, global_semaphore: asyncio.Semaphore=None,
+            executor: ThreadPoolExecutor=None
+    ) -> None:
 
-                # ------ 发送请求并设置编码 ------ #
-                response = requests.get(
-                    url=CONST_TABLE["URL"][self.city] + "p%d/" % i,
-                    headers=self.headers, proxies=self.proxies,
+        """
+        使用asyncio并发获取所有页面，由信号量限制同一站点的并发请求数
+        global_semaphore: 多个爬虫共享的全局并发上限
+        executor: 多个爬虫共享的线程池，默认新建一个大小为concurrency的线程池
+        """
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        is_own_executor = executor is None
+        if is_own_executor:
+            executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        # 压缩存储、写入清单与on_page在单独的线程中依次执行，不阻塞事件循环中的其他请求
+        handler = ThreadPoolExecutor(max_workers=1)
+        try:
+            await asyncio.gather(*[
+                self._get_page_async(
+                    page, semaphore, global_semaphore, executor, handler
                 )
-                response.encoding = "utf-8"
-
-                # ------ 获取html文件并储存 ------ #
-                tree = etree.HTML(response.text)
-                if len(tree.xpath('//div[@class="property"]')) != 0:
-                    file_name = "%s_page_%d.html" % (self.city, i)
-                    path = FilesIO.getHTMLtext("%s/%s" % (self.folder_name, file_name))
-                    with open(path, "w", encoding="utf-8") as f:
-                        f.write(response.text)
-                    print("Get data from page_%d successfully!" % i)
-                    # 数据请求成功，循环即将退出(break)，将该数字重置为0，以便下次继续使用
-                    self.requests_num = 0
-                    break
-                else:
-                    print("ERROR: Failed to get data from page_%d. Retry..." % i)
+                for page in self.pending_pages
+            ])
+        finally:
+            handler.shutdown()
+            if is_own_executor:
+                executor.shutdown()
+
 
+    async def _get_page_async(
+            self, page: int, semaphore: asyncio.Semaphore,
+            global_semaphore: asyncio.Semaphore, executor: ThreadPoolExecutor,
+            handler: ThreadPoolExecutor
+    ) -> None:
+
+        """
+        异步获取单个页面，失败时重试直到超过max_retry
+        先占用站点的并发名额，再占用全局名额，避免空占全局名额；
+        获取到的页面交给handler处理，处理时已释放并发名额，不影响其他页面的请求
+        """
+
+        async with semaphore:
+            if global_semaphore is None:
+                text = await self.limiter.call_async(
+                    self._page_url(page), self._request_page, page,
+                    executor=executor
+                )
             else:
-                # 请求失败，循环正常退出，没走break
-                # 说明达到最大重试次数，退出循环时将该数字重置为0，以便下次继续使用
-                self.requests_num = 0
-                print("ERROR: When getting data from page_%d, max retry exceeded..." % i)
+                async with global_semaphore:
+                    text = await self.limiter.call_async(
+                        self._page_url(page), self._request_page, page,
+                        executor=executor
+                    )
+        await asyncio.get_running_loop().run_in_executor(
+            handler, self._handle_result, page, text
+        )
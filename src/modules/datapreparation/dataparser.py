@@ -7,16 +7,24 @@
 # @Description:                             #
 # This module is used for parsing HTML data #
 # ========================================= #
-import os
 import numpy as np
 import pandas as pd
 from lxml import etree
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.pagestore import PageStore
+from src.common.fileTool.datasetio import DatasetIO
+from src.common.fileTool.parsecache import PageParseCache
 from src.common.infoTool.const import CONST_TABLE
 from src.common.locTool.poiinfo import POICollector
-from src.common.locTool.lnglat import GetLongitudeLatitude
+from src.common.locTool.poiindex import POIIndex
+from src.common.locTool.poicache import POICache
+from src.common.locTool.geobatch import BatchGeocoder
+from src.common.locTool.geocache import GeocodeCache
+from src.common.locTool.gazetteer import Gazetteer
+from src.common.locTool.enrichcache import EnrichmentCache
+from src.modules.datapreparation.listingextractor import ListingExtractor
+from src.modules.datapreparation.recordbuilder import ColumnarRecordBuilder
 
 
 class HousingDataParser:
@@ -25,10 +33,26 @@ class HousingDataParser:
     封装一个数据解析类，用于解析爬取网页的html文件
     """
 
-    def __init__(self, city: str=None) -> None:
+    def __init__(
+            self, city: str=None, is_single_pass: bool=True, workers: int=None,
+            is_offline_poi: bool=False, poi_concurrency: int=16,
+            is_poi_cache: bool=False, is_incremental: bool=True
+    ) -> None:
 
         """
         city: 待解析数据的城市名称，如北京(city="BJ")
+        is_single_pass: 是否逐个房源单次遍历提取(ListingExtractor)，
+                        设置为False时使用原来的整页xpath提取方式
+        workers: 并行解析页面的进程数，默认在当前进程中依次解析，
+                 仅在is_single_pass=True时生效
+        is_offline_poi: 是否使用本地POI快照(POIIndex)统计周边设施，不发送网络请求，
+                        快照存放在datasets/poi_snapshot/<city>_poi.csv
+        poi_concurrency: 在线检索周边设施时同时进行的最大请求数
+        is_poi_cache: 在线检索周边设施时是否使用POICache，同一geohash格子内的房源共享一次以格子中心的检索，
+                      默认以每个房源自身的坐标检索
+        is_incremental: 是否增量解析，内容没有变化的页面直接读取PageParseCache(仅在is_single_pass=True时生效)，
+                        已有房源的经纬度与周边设施读取EnrichmentCache，只对新房源地址解析和检索周边设施；
+                        结果合并到已有的数据集中，本次没有解析到的已有房源保留在后面
         """
         
         # ------ 检查输入 ------ #
@@ -42,195 +66,57 @@ class HousingDataParser:
             exit(1)
         else:
             self.city = city
+        self.is_single_pass = is_single_pass
+        self.workers = workers
+        self.is_offline_poi = is_offline_poi
+        self.poi_concurrency = poi_concurrency
+        self.is_poi_cache = is_poi_cache
+        self.is_incremental = is_incremental
 
-        # ------ 初始化存储爬取信息的列表，便于存入csv ------ #
-        self.house_price_list = []              # 存储房价
-        self.unit_price_list = []               # 存储每平方米价格
-        self.house_area_list = []               # 存储房子面积
-        self.house_loc_list = []                # 存储房子地址
-        self.house_bedroom_list = []            # 存储房子卧室数量(室)
-        self.house_livingroom_list = []         # 存储房间客厅数量(厅)
-        self.house_bathroom_list = []           # 存储房子卫生间数量(卫)
-        self.house_orientation_list = []        # 存储房子朝向
-        self.house_age_list = []                # 存储房子年龄
-        self.longitude_list = []                # 存储房子经度
-        self.latitude_list = []                 # 存储房子纬度
-        self.house_subway_list = []             # 存储房子是否临近地铁
-        self.house_floor_type_list = []         # 存储房子所在楼层高低
-        self.house_floor_sum_list = []          # 存储房子所在楼层总数
-        self.house_housing_period_list = []     # 存储房子房本年限
-        self.school_around_list = []            # 存储房子周围学校数量
-        self.subway_around_list = []            # 存储房子周围地铁站数量
-        self.park_around_list = []              # 存储房子周围公园数量
-        self.shopping_mall_around_list = []     # 存储房子周围购物商场数量
-        self.bus_around_list = []               # 存储房子周围购物商城数量
+        # ------ 按ListingExtractor.SCHEMA逐条转换为最终类型，存入类型化的列 ------ #
+        self.builder = ColumnarRecordBuilder(ListingExtractor.SCHEMA)
 
         # ------ 提取 ------ #
+        self.store = PageStore()
+        self.parse_cache = PageParseCache.getDefault() if is_incremental else None
+        self.enrich_cache = EnrichmentCache.getDefault() if is_incremental else None
         self._parse_data()
-        self._parse_loc_to_lnglat()
- 
-        # ------ 使用多线程解析数据 ------ #
-        # 创建线程
-        thread_school = Thread(target=self._parse_school_around)
-        thread_subway = Thread(target=self._parse_subway_around)
-        thread_park = Thread(target=self._parse_park_around)
-        thread_shopping_mall = Thread(target=self._parse_shopping_mall_around)
-        thread_bus = Thread(target=self._parse_bus_around)
-        # 启动线程
-        thread_school.start(); thread_subway.start(); thread_park.start()
-        thread_shopping_mall.start(); thread_bus.start()
-        # 等待所有线程执行完毕
-        thread_school.join(); thread_subway.join(); thread_park.join()
-        thread_shopping_mall.join(); thread_bus.join()
-        print("All data parsed...")
 
-        # ------ 创建存放数据的文件夹 ------ #
-        folder_name = "row_data"
-        data_folder = os.path.join(FilesIO.getDataset(), folder_name)
-        if not os.path.exists(data_folder):
-            os.mkdir(data_folder)
+        # ------ 只对没有缓存的房源获取经纬度与周边设施 ------ #
+        rows = self._load_enrichment()
+        self._parse_loc_to_lnglat(rows)
+        if self.is_offline_poi:
+            self._parse_poi_offline(rows)
         else:
-            pass
+            self._parse_poi_online(rows)
+        self._save_enrichment(rows)
+        print("All data parsed...")
+
+        # ------ 增量解析时合并到已有的数据集中 ------ #
+        if self.is_incremental:
+            self.df = DatasetIO.mergeDataset(
+                self.df, "row_data/%s_housing_data" % self.city, key="houseLoc", id_column="ID"
+            )
 
-        # ------ 存入csv文件中 ------ #
-        self.df.to_csv(
-            FilesIO.getDataset(
-                "%s/%s_housing_data.csv" % (folder_name, self.city)
-            ), index=False, encoding="utf-8-sig"
+        # ------ 以列式存储，同时导出csv文件 ------ #
+        DatasetIO.saveDataset(
+            self.df, "row_data/%s_housing_data" % self.city, is_export_csv=True
         )
     
 
     def _parse_data(self) -> None:
 
         """
-        解析html文件，并将信息存储到列表中
+        解析html文件，并将信息存入self.builder
         """
 
         print("Parsing data...")
-        for j in range(1, 51):
-
-            # ------ 读取并解析html文件 ------ #
-            path = FilesIO.getHTMLtext(
-                "%s_htmls/%s_page_%d.html" % (self.city, self.city, j)
-            )
+        for j, page_records in self._iter_pages(range(1, 51)):
 
-            parser = etree.HTMLParser(encoding="utf-8")
-            try:
-                tree = etree.parse(path, parser=parser)
-            except:
-                pass
-
-            # ------ 解析房价信息，并存储 ------ #
-            house_price = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_PRICE"])
-            house_price_list = [i.strip() for i in house_price]
-            self.house_price_list.extend(house_price_list)
-
-            # ------ 解析每平方米房价信息，并存储 ------ #
-            unit_price = tree.xpath(CONST_TABLE["XPATH"]["UNIT_PRICE"])
-            unit_price_list = [i.strip()[:-3] for i in unit_price]
-            self.unit_price_list.extend(unit_price_list)
-
-            # ------ 解析房屋面积信息，并存储 ------ #
-            house_area = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_AREA"])
-            house_area_list = [i.strip()[:-1] for i in house_area]
-            self.house_area_list.extend(house_area_list)
-
-            # ------ 解析房屋地址信息，并存储 ------ #
-            community_loc = tree.xpath(CONST_TABLE["XPATH"]["COMMUNITY_LOCATION"])
-            house_loc = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_LOCATION"])
-            house_loc_list = [i.strip() for i in house_loc]
-            i = 2
-            house_loc = []
-            while i < len(house_loc_list):
-                house_loc.append(house_loc_list[i-2] + house_loc_list[i-1] + house_loc_list[i])
-                i += 3
-            for i in range(len(community_loc)):
-                house_loc[i] += community_loc[i]
-            self.house_loc_list.extend(house_loc)
-
-            # ------ 解析房屋卧室数量信息，并存储 ------ #
-            house_bedroom = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_BEDROOM_NUM"])
-            house_bedroom_list = [i.strip() for i in house_bedroom]
-            self.house_bedroom_list.extend(house_bedroom_list)
-
-            # ------ 解析房屋客厅数量信息，并存储 ------ #
-            house_livingroom = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_LIVINGROOM_NUM"])
-            house_livingroom_list = [i.strip() for i in house_livingroom]
-            self.house_livingroom_list.extend(house_livingroom_list)
-
-            # ------ 解析房屋卫生间数量信息，并存储 ------ #
-            house_toilet = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_BATHROOM_NUM"])
-            house_toilet_list = [i.strip() for i in house_toilet]
-            self.house_bathroom_list.extend(house_toilet_list)
-
-            # ------ 解析房屋朝向信息，并存储 ------ #
-            house_orientation = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_FACING"])
-            house_orientation_list = [i.strip() for i in house_orientation]
-            self.house_orientation_list.extend(house_orientation_list)
-
-            # ------ 解析房屋年龄信息，并存储 ------ #
-            house_age = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_AGE"])
-            house_age_list = [
-                2024 - int(i.strip()[:-3]) if i.strip()[0].isdigit() else np.nan 
-                for i in house_age
-            ]
-            self.house_age_list.extend(house_age_list)
-
-            # ------ 信息存储在房屋信息的tag中，提取这些tag ------ #
-            tag_info = []
-            divs = tree.xpath(CONST_TABLE["XPATH"]["ROOT_PATH"])
-            for div in divs:
-                spans = div.xpath(CONST_TABLE["XPATH"]["HOUSE_TAG"])
-                near_metro = []
-                for span in spans:
-                    near_metro.append("".join(span.split()))
-                tag_info.append(near_metro)
-            
-            # ------ 解析房屋是否近地铁 ------ #
-            is_near_metro = [
-                1 if "近地铁" in item else 0 
-                for item in tag_info
-            ]
-            self.house_subway_list.extend(is_near_metro)
-
-            # ------ 解析房屋的房本年限 ------ #
-            fangben_info = []
-            for item in tag_info:
-                if "满五年" in item:
-                    fangben_info.append("满五年")
-                elif "满二年" in item:
-                    fangben_info.append("满二年")
-                else:
-                    fangben_info.append(np.nan)
-            self.house_housing_period_list.extend(fangben_info)
-
-            # ------ 解析房屋的楼层(高中低)与楼层总数 ------ #
-            info_list = []      # 获取存储信息的div标签中的所有文字
-            for div in range(len(divs)):
-                ps = divs[div].xpath(CONST_TABLE["XPATH"]["HOUSE_FLOOR"])
-                sub_info_list = []
-                for text in ps:
-                    sub_info_list.append("".join(text.split()))
-                info_list.append(sub_info_list)
-
-            for item in info_list:
-                try:
-                    # 获取楼层高低以及总层数
-                    if item[2][:2] in ["低层", "中层", "高层"]:
-                        self.house_floor_type_list.append(item[2][:2])
-                        self.house_floor_sum_list.append(
-                            int("".join([i for i in item[2] if i.isdigit()]))
-                        )
-                    else:
-                        # 楼层高低可能缺失
-                        self.house_floor_type_list.append(np.nan)
-                        self.house_floor_sum_list.append(
-                            int("".join([i for i in item[2] if i.isdigit()]))
-                        )
-                # 楼层高低可能缺失，总层数也可能缺失
-                except IndexError:
-                    self.house_floor_type_list.append(np.nan)
-                    self.house_floor_sum_list.append(np.nan)
+            if page_records is None:
+                print("ERROR: Page_%d of %s not found, skipped..." % (j, self.city))
+                continue
+            self.builder.extend(page_records)
 
             # ------ 解析进度 ------ #
             print(
@@ -240,198 +126,378 @@ class HousingDataParser:
             )
 
         # ------ 临时存入DataFrame, 用于去重 ------ #
-        self.df = pd.DataFrame({
-            "houseLoc": self.house_loc_list, 
-            "unitPrice": self.unit_price_list, 
-            "housePrice": self.house_price_list, 
-            "houseArea": self.house_area_list,  
-            "houseBedroom": self.house_bedroom_list, 
-            "houseLivingRoom": self.house_livingroom_list,
-            "houseBathroom": self.house_bathroom_list, 
-            "houseOrientation": self.house_orientation_list, 
-            "houseAge": self.house_age_list, 
-            "houseSubway": self.house_subway_list, 
-            "houseHousingPeriod": self.house_housing_period_list,
-            "houseFloorType": self.house_floor_type_list,
-            "houseFloorSum": self.house_floor_sum_list,
-        })
+        self.df = self.builder.build()
         self.df.drop_duplicates(inplace=True, subset=["houseLoc"], keep="first")
         print("\nParsing complete...")
-            
-    
-    def _parse_loc_to_lnglat(self) -> None:
+        if self.parse_cache is not None and self.is_single_pass:
+            print("Parse cache: %s" % self.parse_cache.summary())
+
+
+    def _iter_pages(self, pages: range):
 
         """
-        将房屋的地址信息转换为经纬度
+        按页码顺序逐个返回(页码, 该页的记录)，页面不存在时记录为None
+        增量解析时，内容哈希与提取器版本都没有变化的页面直接读取缓存，只重新提取其余页面并写入缓存；
+        只有存入页面仓库(有内容哈希)的页面参与缓存
         """
 
-        print("Parsing location to longitude and latitude...")
-        # ------ 转换 ------ #
-        for i in range(len(self.df["houseLoc"].tolist())):
-            true_lnglat = GetLongitudeLatitude(
-                city=CONST_TABLE["CITY"][self.city], 
-                address=self.df["houseLoc"].tolist()[i]
-            )
-            self.longitude_list.append(true_lnglat.longtitude)
-            self.latitude_list.append(true_lnglat.latitude)
-            
-            # ------ 解析进度 ------ #
-            print(
-                "Parsing...", 
-                f'|{"■" * ((i + 1) * 50 // len(self.df["houseLoc"].tolist())):50}|', 
-                f'{(i + 1) * 100 // len(self.df["houseLoc"].tolist())}%', end='\r'
+        is_cached = self.parse_cache is not None and self.is_single_pass
+        hashes = self.store.index(self.city) if is_cached else {}
+        cached = {}
+        if is_cached:
+            self.parse_cache.evict(ListingExtractor.VERSION)
+            self.parse_cache.reset_stats()
+            for j in pages:
+                if j in hashes:
+                    records = self.parse_cache.get(hashes[j], ListingExtractor.VERSION)
+                    if records is not None:
+                        cached[j] = records
+
+        # ------ 需要重新提取的页面 ------ #
+        missing = [j for j in pages if j not in cached]
+        if not missing:
+            extracted = iter([])
+        elif self.is_single_pass and self.workers is not None:
+            # 多进程并行提取，按页码顺序返回每页的记录
+            extracted = ListingExtractor.extract_pages(
+                [(self.city, j) for j in missing],
+                self.workers, self.store.root_path
             )
-        
-        # ------ 添加到最终的DataFrame ------ #
-        self.df.insert(1, "longitude", self.longitude_list)
-        self.df.insert(2, "latitude", self.latitude_list)
-        self.df.insert(0, "ID", range(1, len(self.df) + 1))
-        self.df.reset_index(drop=True, inplace=True)
-        print("\nParsing complete...")
+        else:
+            extracted = (self._parse_page(j) for j in missing)
+        extracted = zip(missing, extracted)
 
+        for j in pages:
+            if j in cached:
+                yield j, cached[j]
+                continue
+            _, records = next(extracted)
+            if is_cached and records is not None and j in hashes:
+                self.parse_cache.put(hashes[j], ListingExtractor.VERSION, records)
+            yield j, records
 
-    def _parse_school_around(self) -> None:
+
+    def _parse_page(self, page: int) -> list[dict]:
 
         """
-        解析周边学校信息
+        从页面仓库读取并解析一页，返回单次遍历提取的记录，页面不存在时返回None
+        使用整页xpath提取时信息直接按列存入self.builder，返回空列表
         """
 
-        print("Parsing school around...")
-        for i in range(len(self.df["houseLoc"].tolist())):
-            self.school_around_list.append(
-                POICollector(
-                    query="学校", lat=self.df.loc[i, "latitude"], 
-                    lng=self.df.loc[i, "longitude"], radius=1000
-                ).num_of_query
-            )
-            
-            # ------ 解析进度 ------ #
-            print(
-                "Parsing...", 
-                f'|{"■" * ((i + 1) * 50 // len(self.df["houseLoc"].tolist())):50}|', 
-                f'{(i + 1) * 100 // len(self.df["houseLoc"].tolist())}%', end='\r'
-            )
-        
-        # ------ 添加到最终的DataFrame ------ #
-        self.df.insert(
-            len(self.df.columns), "schoolAround", self.school_around_list
-        )
-        print("\nParsing complete...")
-    
+        text = self.store.get(self.city, page)
+        if text is None:
+            return None
+        tree = etree.HTML(text)
+        if self.is_single_pass:
+            return ListingExtractor.extract(tree)
+        self._parse_page_by_xpath(tree)
+        return []
 
-    def _parse_subway_around(self) -> None:
+
+    def _parse_page_by_xpath(self, tree) -> None:
 
         """
-        解析周边地铁信息
+        对整页分别执行每个字段的xpath表达式，整页的各列一次性存入self.builder
         """
 
-        print("Parsing subway around...")
-        for i in range(len(self.df["houseLoc"].tolist())):
-            self.subway_around_list.append(
-                POICollector(
-                    query="地铁", lat=self.df.loc[i, "latitude"], 
-                    lng=self.df.loc[i, "longitude"], radius=1000
-                ).num_of_query
-            )
+        columns = {}
+
+        # ------ 解析房价信息，并存储 ------ #
+        house_price = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_PRICE"])
+        house_price_list = [i.strip() for i in house_price]
+        columns["housePrice"] = house_price_list
+
+        # ------ 解析每平方米房价信息，并存储 ------ #
+        unit_price = tree.xpath(CONST_TABLE["XPATH"]["UNIT_PRICE"])
+        unit_price_list = [i.strip()[:-3] for i in unit_price]
+        columns["unitPrice"] = unit_price_list
+
+        # ------ 解析房屋面积信息，并存储 ------ #
+        house_area = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_AREA"])
+        house_area_list = [i.strip()[:-1] for i in house_area]
+        columns["houseArea"] = house_area_list
+
+        # ------ 解析房屋地址信息，并存储 ------ #
+        community_loc = tree.xpath(CONST_TABLE["XPATH"]["COMMUNITY_LOCATION"])
+        house_loc = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_LOCATION"])
+        house_loc_list = [i.strip() for i in house_loc]
+        i = 2
+        house_loc = []
+        while i < len(house_loc_list):
+            house_loc.append(house_loc_list[i-2] + house_loc_list[i-1] + house_loc_list[i])
+            i += 3
+        for i in range(len(community_loc)):
+            house_loc[i] += community_loc[i]
+        columns["houseLoc"] = house_loc
+
+        # ------ 解析房屋卧室数量信息，并存储 ------ #
+        house_bedroom = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_BEDROOM_NUM"])
+        house_bedroom_list = [i.strip() for i in house_bedroom]
+        columns["houseBedroom"] = house_bedroom_list
+
+        # ------ 解析房屋客厅数量信息，并存储 ------ #
+        house_livingroom = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_LIVINGROOM_NUM"])
+        house_livingroom_list = [i.strip() for i in house_livingroom]
+        columns["houseLivingRoom"] = house_livingroom_list
+
+        # ------ 解析房屋卫生间数量信息，并存储 ------ #
+        house_toilet = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_BATHROOM_NUM"])
+        house_toilet_list = [i.strip() for i in house_toilet]
+        columns["houseBathroom"] = house_toilet_list
+
+        # ------ 解析房屋朝向信息，并存储 ------ #
+        house_orientation = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_FACING"])
+        house_orientation_list = [i.strip() for i in house_orientation]
+        columns["houseOrientation"] = house_orientation_list
+
+        # ------ 解析房屋年龄信息，并存储 ------ #
+        house_age = tree.xpath(CONST_TABLE["XPATH"]["HOUSE_AGE"])
+        house_age_list = [
+            2024 - int(i.strip()[:-3]) if i.strip()[0].isdigit() else np.nan 
+            for i in house_age
+        ]
+        columns["houseAge"] = house_age_list
+
+        # ------ 信息存储在房屋信息的tag中，提取这些tag ------ #
+        tag_info = []
+        divs = tree.xpath(CONST_TABLE["XPATH"]["ROOT_PATH"])
+        for div in divs:
+            spans = div.xpath(CONST_TABLE["XPATH"]["HOUSE_TAG"])
+            near_metro = []
+            for span in spans:
+                near_metro.append("".join(span.split()))
+            tag_info.append(near_metro)
+        
+        # ------ 解析房屋是否近地铁 ------ #
+        is_near_metro = [
+            1 if "近地铁" in item else 0 
+            for item in tag_info
+        ]
+        columns["houseSubway"] = is_near_metro
+
+        # ------ 解析房屋的房本年限 ------ #
+        fangben_info = []
+        for item in tag_info:
+            if "满五年" in item:
+                fangben_info.append("满五年")
+            elif "满二年" in item:
+                fangben_info.append("满二年")
+            else:
+                fangben_info.append(np.nan)
+        columns["houseHousingPeriod"] = fangben_info
+
+        # ------ 解析房屋的楼层(高中低)与楼层总数 ------ #
+        info_list = []      # 获取存储信息的div标签中的所有文字
+        floor_type_list, floor_sum_list = [], []
+        for div in range(len(divs)):
+            ps = divs[div].xpath(CONST_TABLE["XPATH"]["HOUSE_FLOOR"])
+            sub_info_list = []
+            for text in ps:
+                sub_info_list.append("".join(text.split()))
+            info_list.append(sub_info_list)
+
+        for item in info_list:
+            try:
+                # 获取楼层高低以及总层数
+                if item[2][:2] in ["低层", "中层", "高层"]:
+                    floor_type_list.append(item[2][:2])
+                    floor_sum_list.append(
+                        int("".join([i for i in item[2] if i.isdigit()]))
+                    )
+                else:
+                    # 楼层高低可能缺失
+                    floor_type_list.append(np.nan)
+                    floor_sum_list.append(
+                        int("".join([i for i in item[2] if i.isdigit()]))
+                    )
+            # 楼层高低可能缺失，总层数也可能缺失
+            except IndexError:
+                floor_type_list.append(np.nan)
+                floor_sum_list.append(np.nan)
+        columns["houseFloorType"] = floor_type_list
+        columns["houseFloorSum"] = floor_sum_list
+        self.builder.extend_columns(columns)
+
+
+    def _load_enrichment(self) -> np.ndarray:
 
-            # ------ 解析进度 ------ #
-            print(
-                "Parsing...", 
-                f'|{"■" * ((i + 1) * 50 // len(self.df["houseLoc"].tolist())):50}|', 
-                f'{(i + 1) * 100 // len(self.df["houseLoc"].tolist())}%', end='\r'
+        """
+        读取已有房源缓存的经纬度与周边设施，存入self.enrichment(列名->数组，没有缓存的为NaN)，
+        返回需要重新地址解析和检索周边设施的行号
+        """
+
+        columns = ["longitude", "latitude"] + list(CONST_TABLE["POI"])
+        self.enrichment = {column: np.full(len(self.df), np.nan) for column in columns}
+        if self.enrich_cache is None:
+            return np.arange(len(self.df))
+
+        # 清除过期的补充信息，过期的房源会重新获取
+        self.enrich_cache.evict()
+        self.enrich_cache.reset_stats()
+        is_missing = np.ones(len(self.df), dtype=bool)
+        cached = self.enrich_cache.get_many(self.city, self.df["houseLoc"].tolist())
+        for i, enrichment in enumerate(cached):
+            # 周边设施的类别增加后，旧记录视为不存在
+            if enrichment is None or any(column not in enrichment for column in columns):
+                continue
+            for column in columns:
+                self.enrichment[column][i] = enrichment[column]
+            is_missing[i] = False
+        print(
+            "Enrichment cache: %s, %d new listings to enrich" % (
+                self.enrich_cache.summary(), is_missing.sum()
             )
-        
-        # ------ 添加到最终的DataFrame ------ #
-        self.df.insert(
-            len(self.df.columns), "subwayAround", self.subway_around_list
         )
-        print("\nParsing complete...")
+        return np.flatnonzero(is_missing)
 
 
-    def _parse_park_around(self) -> None:
+    def _save_enrichment(self, rows: np.ndarray) -> None:
 
         """
-        解析周边公园信息
+        将新获取的房源补充信息写入缓存，地址解析或检索失败(存在NaN)的房源不写入，下次重新获取
         """
 
-        print("Parsing park around...")
-        for i in range(len(self.df["houseLoc"].tolist())):
-            self.park_around_list.append(
-                POICollector(
-                    query="公园", lat=self.df.loc[i, "latitude"], 
-                    lng=self.df.loc[i, "longitude"], radius=1000
-                ).num_of_query
-            )
+        if self.enrich_cache is None:
+            return
+        addresses = self.df["houseLoc"].tolist()
+        items = {}
+        for i in rows:
+            enrichment = {
+                column: float(values[i]) for column, values in self.enrichment.items()
+            }
+            if not any(np.isnan(value) for value in enrichment.values()):
+                items[addresses[i]] = enrichment
+        self.enrich_cache.put_many(self.city, items)
 
-            # ------ 解析进度 ------ #
-            print(
-                "Parsing...", 
-                f'|{"■" * ((i + 1) * 50 // len(self.df["houseLoc"].tolist())):50}|', 
-                f'{(i + 1) * 100 // len(self.df["houseLoc"].tolist())}%', end='\r'
-            )
-        
-        # ------ 添加到最终的DataFrame ------ #
-        self.df.insert(
-            len(self.df.columns), "parkAround", self.park_around_list
+
+    def _parse_loc_to_lnglat(self, rows: np.ndarray) -> None:
+
+        """
+        将房屋的地址信息转换为经纬度
+        rows: 需要转换的行号，其余行使用self.enrichment中缓存的经纬度
+        """
+
+        print("Parsing location to longitude and latitude...")
+        # 清除过期的地址解析缓存，过期的地址会重新请求
+        GeocodeCache.getDefault().evict()
+        GeocodeCache.getDefault().reset_stats()
+        Gazetteer.getDefault().reset_stats()
+        # ------ 转换，相同的地址只解析一次，结果写入预先分配好的数组，解析失败的为NaN ------ #
+        addresses = self.df["houseLoc"].to_numpy()
+        longitude = self.enrichment["longitude"]
+        latitude = self.enrichment["latitude"]
+        geocoder = BatchGeocoder(city=CONST_TABLE["CITY"][self.city])
+        longitude[rows], latitude[rows] = geocoder.geocode_many(
+            addresses[rows].tolist(), is_progress=True
         )
+
+        # ------ 添加到最终的DataFrame ------ #
+        self.df.insert(1, "longitude", longitude)
+        self.df.insert(2, "latitude", latitude)
+        self.df.insert(0, "ID", range(1, len(self.df) + 1))
+        self.df.reset_index(drop=True, inplace=True)
         print("\nParsing complete...")
-    
+        print("Geocode of %s: %s" % (self.city, geocoder.summary()))
+        print("Geocode cache: %s" % GeocodeCache.getDefault().summary())
+        print("Gazetteer: %s" % Gazetteer.getDefault().summary())
 
-    def _parse_shopping_mall_around(self) -> None:
+
+    def _parse_poi_offline(self, rows: np.ndarray) -> None:
 
         """
-        解析周边购物商城信息
+        使用本地POI快照一次性统计房源的周边设施
+        计数上限与在线检索一致(每页10条)，保证两种方式得到的特征可比
+        rows: 需要统计的行号，其余行使用self.enrichment中缓存的数量
         """
 
-        print("Parsing shopping mall around...")
-        for i in range(len(self.df["houseLoc"].tolist())):
-            self.shopping_mall_around_list.append(
-                POICollector(
-                    query="购物", lat=self.df.loc[i, "latitude"], 
-                    lng=self.df.loc[i, "longitude"], radius=1000
-                ).num_of_query
+        print("Parsing POI around from local snapshot...")
+        if len(rows):
+            index = POIIndex.load(self.city)
+            counts = index.count_all(
+                CONST_TABLE["POI"],
+                self.df["latitude"].to_numpy(dtype=float)[rows],
+                self.df["longitude"].to_numpy(dtype=float)[rows], radius=1000,
+                max_count=POIIndex.API_PAGE_SIZE
             )
+            for column, count in counts.items():
+                self.enrichment[column][rows] = count
 
-            # ------ 解析进度 ------ #
-            print(
-                "Parsing...", 
-                f'|{"■" * ((i + 1) * 50 // len(self.df["houseLoc"].tolist())):50}|', 
-                f'{(i + 1) * 100 // len(self.df["houseLoc"].tolist())}%', end='\r'
+        # ------ 添加到最终的DataFrame ------ #
+        for column in CONST_TABLE["POI"]:
+            self.df.insert(
+                len(self.df.columns), column,
+                pd.Series(self.enrichment[column]).astype("Int64")
             )
-        
-        # # ------ 添加到最终的DataFrame ------ #
-        self.df.insert(
-            len(self.df.columns), "shopping_mallAround", 
-            self.shopping_mall_around_list
-        )
-        print("\nParsing complete...")
-    
-    
-    def _parse_bus_around(self) -> None:
+        print("Parsing complete...")
+
+
+    def _parse_poi_online(self, rows: np.ndarray) -> None:
 
         """
-        解析周边公交站台信息
+        使用百度地图检索周边设施
+        默认每个(房源, 类别)都是一个独立的任务，以房源自身的坐标检索；
+        is_poi_cache=True时位于同一个geohash格子内的房源只检索一次(与POICache的键一致)，
+        检索中心为格子的中心，因此结果与房源的顺序无关，缓存中每个格子的数量也总是对应同一个中心，
+        此时任务为(格子, 类别)，同一格子内房源的数量相同，与逐个房源检索的结果会略有差别。
+        任务由线程池并发执行，同时进行的请求数不超过poi_concurrency，
+        结果写入预先分配好的数组，全部完成后按CONST_TABLE["POI"]的顺序一次性添加到DataFrame
+        rows: 需要检索的行号，其余行使用self.enrichment中缓存的数量
         """
 
-        print("Parsing bus around...")
-        for i in range(len(self.df["houseLoc"].tolist())):
-            self.bus_around_list.append(
-                POICollector(
-                    query="公交", lat=self.df.loc[i, "latitude"], 
-                    lng=self.df.loc[i, "longitude"], radius=1000
-                ).num_of_query
-            )
+        print("Parsing POI around...")
+        cache = POICache.getDefault() if self.is_poi_cache else None
+        if cache is not None:
+            # 清除过期的周边设施缓存，过期的位置会重新检索
+            cache.evict()
+            cache.reset_stats()
+        lat = self.df["latitude"].to_numpy(dtype=float)
+        lng = self.df["longitude"].to_numpy(dtype=float)
+        counts = {column: self.enrichment[column] for column in CONST_TABLE["POI"]}
+
+        # ------ 检索中心：房源自身的坐标，或按geohash格子分组后格子的中心，坐标缺失的房源单独成组 ------ #
+        groups = {}
+        for i in rows:
+            cell = cache.geohash(lat[i], lng[i], cache.precision) \
+                if cache is not None and not (np.isnan(lat[i]) or np.isnan(lng[i])) else i
+            groups.setdefault(cell, []).append(i)
+        centers = {
+            cell: cache.cell_center(cell) if isinstance(cell, str) else (lat[cell], lng[cell])
+            for cell in groups
+        }
+        jobs = [
+            (group, centers[cell], column, category) for cell, group in groups.items()
+            for column, category in CONST_TABLE["POI"].items()
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.poi_concurrency) as executor:
+            futures = {
+                executor.submit(
+                    POICollector, query=category, lat=center[0], lng=center[1],
+                    radius=1000, cache=cache, is_cache=cache is not None
+                ): (group, column) for group, center, column, category in jobs
+            }
+            for finished, future in enumerate(as_completed(futures), start=1):
+                group, column = futures[future]
+                num_of_query = future.result().num_of_query
+                if num_of_query is not None:
+                    counts[column][group] = num_of_query
+
+                # ------ 解析进度 ------ #
+                print(
+                    "Parsing...",
+                    f'|{"■" * (finished * 50 // len(jobs)):50}|',
+                    f'{finished * 100 // len(jobs)}%', end='\r'
+                )
 
-            # ------ 解析进度 ------ #
-            print(
-                "Parsing...", 
-                f'|{"■" * ((i + 1) * 50 // len(self.df["houseLoc"].tolist())):50}|', 
-                f'{(i + 1) * 100 // len(self.df["houseLoc"].tolist())}%', end='\r'
-            )
-        
         # ------ 添加到最终的DataFrame ------ #
-        self.df.insert(
-            len(self.df.columns), "busAround", 
-            self.bus_around_list
-        )
+        for column, count in counts.items():
+            self.df.insert(
+                len(self.df.columns), column, pd.Series(count).astype("Int64")
+            )
         print("\nParsing complete...")
+        if cache is not None:
+            print(
+                "POI cache: %s, %d listings in %d cells" % (
+                    cache.summary(), len(rows), len(groups)
+                )
+            )
@@ -0,0 +1,207 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-05-27                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Single-pass extraction of one record per listing using        #
+# precompiled relative XPath expressions                        #
+# ============================================================= #
+import os
+import numpy as np
+from lxml import etree
+from concurrent.futures import ProcessPoolExecutor
+
+from src.common.infoTool.const import CONST_TABLE
+from src.common.fileTool.pagestore import PageStore
+
+
+class ListingExtractor:
+
+    """
+    逐个房源提取信息
+    每个//div[@class='property']节点只遍历一次，所有字段都用预编译的相对xpath提取，
+    每个房源输出一条记录，某个字段缺失时该字段为NaN，不会导致各列错位
+    """
+
+    # ------ 提取结果的版本，修改提取逻辑后需要增加，使PageParseCache中的旧记录失效 ------ #
+    VERSION = 1
+
+    # ------ 预编译的xpath表达式 ------ #
+    ROOT_PATH = etree.XPath(CONST_TABLE["XPATH"]["ROOT_PATH"])
+    XPATH = {
+        name: etree.XPath(expr)
+        for name, expr in CONST_TABLE["LISTING_XPATH"].items()
+    }
+
+    # ------ 输出的列及其最终类型(见ColumnarRecordBuilder)，与HousingDataParser生成的数据集一致 ------ #
+    SCHEMA = {
+        "houseLoc": "str",
+        "unitPrice": "float64",
+        "housePrice": "float64",
+        "houseArea": "float64",
+        "houseBedroom": "int16",
+        "houseLivingRoom": "int16",
+        "houseBathroom": "int16",
+        "houseOrientation": "category",
+        "houseAge": "int16",
+        "houseSubway": "int8",
+        "houseHousingPeriod": "category",
+        "houseFloorType": "category",
+        "houseFloorSum": "int16",
+    }
+    COLUMNS = list(SCHEMA)
+
+    @staticmethod
+    def extract_text(text: str) -> list[dict]:
+
+        """
+        从html文本中提取所有房源
+        """
+
+        return ListingExtractor.extract(etree.HTML(text))
+
+
+    @staticmethod
+    def extract(tree) -> list[dict]:
+
+        """
+        从解析好的html树中提取所有房源
+        """
+
+        if tree is None:
+            return []
+        return [
+            ListingExtractor.extract_listing(div)
+            for div in ListingExtractor.ROOT_PATH(tree)
+        ]
+
+
+    @staticmethod
+    def extract_page(root_path: str, city: str, page: int) -> list[dict]:
+
+        """
+        从页面仓库读取一页并提取所有房源，页面不存在时返回None
+        供进程池调用，只传递页码，由子进程自行读取页面
+        """
+
+        text = PageStore(root_path).get(city, page)
+        if text is None:
+            return None
+        return ListingExtractor.extract_text(text)
+
+
+    @staticmethod
+    def extract_pages(
+            jobs: list[tuple[str, int]], workers: int=None, root_path: str=None
+    ):
+
+        """
+        使用进程池并行提取多页，按jobs的顺序逐个返回每页的记录(页面不存在时为None)
+        jobs: (城市, 页码)的列表，可以包含多个城市
+        workers: 进程数，默认为CPU核数
+        root_path: 页面仓库的根目录，默认为FilesIO.getHTMLtext()
+        注意：Windows下调用的脚本需要放在 if __name__ == "__main__": 之下
+        """
+
+        root_path = root_path if root_path is not None else PageStore().root_path
+        workers = workers if workers is not None else os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(
+                ListingExtractor.extract_page,
+                [root_path] * len(jobs),
+                [city for city, _ in jobs],
+                [page for _, page in jobs],
+                chunksize=max(1, len(jobs) // (workers * 4)),
+            )
+
+
+    @staticmethod
+    def extract_cities(
+            cities: list[str], workers: int=None, root_path: str=None,
+            page_num: int=50
+    ) -> dict[str, list[dict]]:
+
+        """
+        一次性并行提取多个城市的全部页面，每个城市的记录按页码顺序合并
+        """
+
+        jobs = [(city, page) for city in cities for page in range(1, page_num + 1)]
+        records = {city: [] for city in cities}
+        for (city, _), page_records in zip(
+            jobs, ListingExtractor.extract_pages(jobs, workers, root_path)
+        ):
+            if page_records is not None:
+                records[city].extend(page_records)
+        return records
+
+
+    @staticmethod
+    def _first(div, name: str) -> str:
+
+        """
+        字段的第一个文本节点(去掉首尾空白)，不存在时返回None
+        """
+
+        texts = ListingExtractor.XPATH[name](div)
+        return texts[0].strip() if texts else None
+
+
+    @staticmethod
+    def extract_listing(div) -> dict:
+
+        """
+        提取单个房源的全部字段
+        """
+
+        first = ListingExtractor._first
+        xpath = ListingExtractor.XPATH
+
+        # ------ 价格与面积，去掉单位 ------ #
+        unit_price = first(div, "UNIT_PRICE")
+        house_area = first(div, "HOUSE_AREA")
+
+        # ------ 地址：区域+板块+街道+小区名称 ------ #
+        house_loc = "".join(
+            part.strip() for part in xpath["HOUSE_LOCATION"](div)
+        ) + "".join(xpath["COMMUNITY_LOCATION"](div))
+
+        # ------ 房龄 ------ #
+        house_age = first(div, "HOUSE_AGE")
+        house_age = 2024 - int(house_age[:-3]) \
+            if house_age and house_age[0].isdigit() else np.nan
+
+        # ------ 交易信息的tag：是否近地铁与房本年限 ------ #
+        tags = ["".join(span.split()) for span in xpath["HOUSE_TAG"](div)]
+        if "满五年" in tags:
+            housing_period = "满五年"
+        elif "满二年" in tags:
+            housing_period = "满二年"
+        else:
+            housing_period = np.nan
+
+        # ------ 楼层(高中低)与楼层总数 ------ #
+        floors = ["".join(text.split()) for text in xpath["HOUSE_FLOOR"](div)]
+        floor_type, floor_sum = np.nan, np.nan
+        if len(floors) > 2:
+            if floors[2][:2] in ["低层", "中层", "高层"]:
+                floor_type = floors[2][:2]
+            digits = "".join([i for i in floors[2] if i.isdigit()])
+            floor_sum = int(digits) if digits else np.nan
+
+        return {
+            "houseLoc": house_loc,
+            "unitPrice": unit_price[:-3] if unit_price is not None else np.nan,
+            "housePrice": first(div, "HOUSE_PRICE"),
+            "houseArea": house_area[:-1] if house_area is not None else np.nan,
+            "houseBedroom": first(div, "HOUSE_BEDROOM_NUM"),
+            "houseLivingRoom": first(div, "HOUSE_LIVINGROOM_NUM"),
+            "houseBathroom": first(div, "HOUSE_BATHROOM_NUM"),
+            "houseOrientation": first(div, "HOUSE_FACING"),
+            "houseAge": house_age,
+            "houseSubway": 1 if "近地铁" in tags else 0,
+            "houseHousingPeriod": housing_period,
+            "houseFloorType": floor_type,
+            "houseFloorSum": floor_sum,
+        }
@@ -7,10 +7,9 @@
 # Description:                                             #
 # A pipeline for preprocessing 58 same city data crawled   #
 # ======================================================== #
-import os
 import numpy as np
 import pandas as pd
-from geopy.distance import geodesic
+from typing import Literal
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
@@ -19,15 +18,36 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.preprocessing import FunctionTransformer
 from sklearn.base import BaseEstimator, TransformerMixin
 
-from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
 from src.common.infoTool.const import CONST_TABLE
+from src.common.locTool.distance import GeoDistance
 
 
 class PipeLineFor58HousingData(BaseEstimator, TransformerMixin):
 
     """
     设计实现58同城房价数据的特征工程
+    fit时学习全部状态(缺失值的填充值、标准化参数、分类变量的编码以及哑变量的列)，
+    transform时只应用已经学习到的状态，对新房源的打分不会重新拟合，输出的特征空间保持一致
     """
+
+    # ------ 输出格式的版本，修改处理逻辑后需要增加，使ProcessedDataCache中的旧缓存失效 ------ #
+    VERSION = 1
+
+    # ------ 各个类别的列 ------ #
+    DUMMY_ATTRIBS = [
+        "houseOrientation", "houseHousingPeriod", "houseFloorType"
+    ]
+    NUM_ATTRIBS = [
+        "longitude", "latitude", "houseArea", "houseAge",
+        "houseFloorSum", "distance"
+    ]
+    CAT_ATTRIBS = [
+        "houseBedroom", "houseBathroom", "houseLivingRoom",
+        "houseSubway", "busAround", "shopping_mallAround",
+        "parkAround", "subwayAround", "schoolAround"
+    ]
+    LOG_ATTRIBS = ["unitPrice"]
     
     def __init__(self, city_name: str=None, is_save: bool=False) -> None:
         
@@ -39,28 +59,53 @@ class PipeLineFor58HousingData(BaseEstimator, TransformerMixin):
             exit(1)
     
 
-    def fit(self, X, y=None):
+    def fit(self, X: pd.DataFrame, y=None):
+
+        """
+        学习预处理所需的全部状态
+        """
+
+        self._fit(self._clean(X))
         return self
 
 
+    def fit_transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
+
+        """
+        只清洗一次数据，拟合后直接应用；is_save=True时保存处理后的训练数据
+        """
+
+        X = self._clean(X)
+        self._fit(X)
+        X_df = self._apply(X)
+
+        # ------ 第五步，持久化存储，只保存拟合所用的数据，transform处理的新数据不覆盖 ------ #
+        if self.is_save:
+            # 以列式存储，同时导出csv文件
+            DatasetIO.saveDataset(
+                X_df, "processed_data/%s_housing_data_processed" % self.city_name,
+                is_export_csv=True
+            )
+        return X_df
+
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
 
-        # ------ 第〇步，分离各个类别 ------ #
-        dummy_attribs = [
-            "houseOrientation", "houseHousingPeriod", "houseFloorType"
-        ]
-        num_attribs = [
-            "longitude", "latitude", "houseArea", "houseAge", 
-            "houseFloorSum", "distance"
-        ]
-        cat_attribs = [
-            "houseBedroom", "houseBathroom", "houseLivingRoom", 
-            "houseSubway", "busAround", "shopping_mallAround", 
-            "parkAround", "subwayAround", "schoolAround"
-        ]
-        log_attribs = ["unitPrice"]
-
-        # ------ 第一步，数据清洗与特征工程 ------ #
+        """
+        使用fit学习到的状态处理数据，不重新拟合
+        """
+
+        if not hasattr(self, "preprocessor_"):
+            raise ValueError("PipeLineFor58HousingData is not fitted yet...")
+        return self._apply(self._clean(X))
+
+
+    def _clean(self, X: pd.DataFrame) -> pd.DataFrame:
+
+        """
+        第一步，数据清洗与特征工程，不包含需要学习的状态
+        """
+
         pipeline_step_1 = Pipeline([
             # 计算并添加距离市中心的距离
             ("distance_to_city_center", DistanceToCityCenter(self.city_name)),
@@ -69,7 +114,10 @@ class PipeLineFor58HousingData(BaseEstimator, TransformerMixin):
             # 去掉ID和houseLoc列
             ("drop_columns", DropColumns()),
         ])
-        X = pipeline_step_1.fit_transform(X)
+        return pipeline_step_1.fit_transform(X.copy())
+
+
+    def _fit(self, X: pd.DataFrame) -> None:
 
         # ------ 第二步，数据预处理 ------ #
         num_pipeline = Pipeline([
@@ -82,64 +130,77 @@ class PipeLineFor58HousingData(BaseEstimator, TransformerMixin):
         cat_pipeline = Pipeline([
             # 填充缺失值，填充策略为以出现次数最多的类别填充
             ("imputer", SimpleImputer(strategy="most_frequent")),
-            # 对部分分类变量编码
-            ("ordinal_encoder", OrdinalEncoder()),
+            # 对部分分类变量编码，未见过的类别编码为-1
+            ("ordinal_encoder", OrdinalEncoder(
+                handle_unknown="use_encoded_value", unknown_value=-1
+            )),
         ])      # 分类变量处理
 
         # ------ 第三步，整合为一个管道 ------ #
-        pipeline_step_2 = ColumnTransformer([
-            ("num", num_pipeline, num_attribs),
-            ("cat", cat_pipeline, cat_attribs),
-            ("dummy", "passthrough", dummy_attribs),
+        self.preprocessor_ = ColumnTransformer([
+            ("num", num_pipeline, self.NUM_ATTRIBS),
+            ("cat", cat_pipeline, self.CAT_ATTRIBS),
+            ("dummy", "passthrough", self.DUMMY_ATTRIBS),
             # 对房价和单位房价取对数
-            ("target", FunctionTransformer(np.log), log_attribs),
-        ]) 
-        X = pipeline_step_2.fit_transform(X)
+            ("target", FunctionTransformer(np.log), self.LOG_ATTRIBS),
+        ]).fit(X)
+
+        # ------ 记录哑变量的列，之后的数据按照这些列对齐 ------ #
+        # 分类变量先转换为object，与_apply中一样按取值排序，保证删除的是同一个类别
+        self.dummy_columns_ = pd.get_dummies(
+            X[self.DUMMY_ATTRIBS].astype(object), drop_first=True
+        ).columns.tolist()
+
+
+    def _apply(self, X: pd.DataFrame) -> pd.DataFrame:
+
+        X = self.preprocessor_.transform(X)
 
         # ------ 第四步，以DataFrame的形式输出，并对剩余分类变量编码 ------ #
         X_df = pd.DataFrame(
-            X, columns=num_attribs + cat_attribs + dummy_attribs + log_attribs
+            X, columns=self.NUM_ATTRIBS + self.CAT_ATTRIBS +
+            self.DUMMY_ATTRIBS + self.LOG_ATTRIBS
         )
-        X_df_dummy = pd.get_dummies(X_df[dummy_attribs], drop_first=True)
+        # 新数据中未出现的类别补0，训练时未出现的类别丢弃
+        X_df_dummy = pd.get_dummies(
+            X_df[self.DUMMY_ATTRIBS], drop_first=False
+        ).reindex(columns=self.dummy_columns_, fill_value=False)
         target = X_df["unitPrice"]
         X_df.drop(
-            dummy_attribs + [
+            self.DUMMY_ATTRIBS + [
                 "unitPrice", "longitude", "latitude", "houseSubway"
             ], 
             axis=1, inplace=True
         )
         X_df = pd.concat([X_df, X_df_dummy], axis=1)
         X_df["unitPrice"] = target
-
-        # ------ 第五步，持久化存储 ------ #
-        if self.is_save:
-            # 创建存放数据的文件夹
-            folder_name = "processed_data"
-            data_folder = os.path.join(FilesIO.getDataset(), folder_name)
-            if not os.path.exists(data_folder):
-                os.mkdir(data_folder)
-            else:
-                pass
-
-            # 以csv形式存储
-            X_df.to_csv(
-                FilesIO.getDataset(
-                    "%s/%s_housing_data_processed.csv" % 
-                    (folder_name, self.city_name)
-                ), index=False, encoding="utf-8-sig"
-            )
         return X_df
 
 
 class DistanceToCityCenter(BaseEstimator, TransformerMixin):
 
     """
-    数据处理模块——计算到市中心的距离
+    数据处理模块——计算到市中心(以及其他参考点)的距离
+    所有房源一次向量化计算，不再逐行调用geopy
     """
 
-    def __init__(self, city_name: str=None) -> None:
+    def __init__(
+            self, city_name: str=None,
+            method: Literal["vincenty", "haversine"]="vincenty",
+            references: dict[str, tuple[float, float]]=None
+    ) -> None:
+
+        """
+        city_name: 城市名称，默认参考点为CONST_TABLE["CITY_CENTER"]中的市中心
+        method: "vincenty"为WGS84椭球面距离(与geopy.distance.geodesic相差不超过1mm)，
+                "haversine"为球面距离(更快，相对误差不超过0.5%)
+        references: 参考点，列名->(纬度, 经度)，例如{"distance": 市中心, "distanceCBD": CBD}，
+                    默认只计算到市中心的距离，列名为distance
+        """
 
         self.city_name = city_name
+        self.method = method
+        self.references = references
 
 
     def fit(self, X, y=None):
@@ -149,19 +210,23 @@ class DistanceToCityCenter(BaseEstimator, TransformerMixin):
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
 
         """
-        计算到市中心的距离
+        计算到各个参考点的距离(km)
         """
 
-        city_center_location = (
-            CONST_TABLE["CITY_CENTER"][self.city_name]["LAT"],
-            CONST_TABLE["CITY_CENTER"][self.city_name]["LNG"]
-        )
+        references = self.references if self.references is not None else {
+            "distance": (
+                CONST_TABLE["CITY_CENTER"][self.city_name]["LAT"],
+                CONST_TABLE["CITY_CENTER"][self.city_name]["LNG"]
+            )
+        }
+        distance = GeoDistance.vincenty if self.method == "vincenty" \
+            else GeoDistance.haversine
         X.dropna(subset=["latitude", "longitude"], inplace=True)
         X.reset_index(drop=True, inplace=True)
-        for i in range(len(X)):
-            loc = (X.loc[i, "latitude"], X.loc[i, "longitude"])
-            distance = geodesic(loc, city_center_location).kilometers
-            X.loc[i, "distance"] = distance
+        lat = X["latitude"].to_numpy(dtype=float)
+        lng = X["longitude"].to_numpy(dtype=float)
+        for column, (ref_lat, ref_lng) in references.items():
+            X[column] = distance(lat, lng, ref_lat, ref_lng)
         return X
 
 
@@ -198,5 +263,10 @@ class ReplaceNAtoNone(BaseEstimator, TransformerMixin):
         某些列中NA并不代表缺失值，替换为None
         """
 
-        X["houseHousingPeriod"].fillna("None", inplace=True)
+        column = X["houseHousingPeriod"]
+        # 解析得到的数据中该列为分类变量，需要先添加None这一类别
+        if isinstance(column.dtype, pd.CategoricalDtype) and \
+           "None" not in column.cat.categories:
+            column = column.cat.add_categories("None")
+        X["houseHousingPeriod"] = column.fillna("None")
         return X
@@ -7,7 +7,6 @@
 # Description:                                      #
 # A pipeline for preprocessing the paper dataset    #
 # ================================================= #
-import os
 import numpy as np
 import pandas as pd
 from typing import Literal
@@ -16,43 +15,84 @@ from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OrdinalEncoder
 from sklearn.preprocessing import StandardScaler
-from sklearn.preprocessing import FunctionTransformer
 from sklearn.base import BaseEstimator, TransformerMixin
 
-from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
 
 
 class PipeLineForPaperHousingData(BaseEstimator, TransformerMixin):
 
     """
     实现论文中提到的数据的预处理流程
+    fit时学习全部状态(删除的列、连续变量与分类变量的划分、缺失值的填充值、标准化参数与编码)，
+    transform时只应用已经学习到的状态，因此test.csv可以直接使用train.csv上拟合的管道
     """
 
     def __init__(
             self,file_name: Literal["train", "test"]="train",
             is_drop: bool=True, is_replace: bool=True, is_save: bool=False, 
+            drop_threshold: float=0.9,
     ) -> None:
+
+        """
+        file_name: 持久化存储时的文件名前缀
+        is_drop: 是否删除重复值太多的列
+        is_replace: 是否将并非缺失值的NA替换为None
+        is_save: 是否持久化存储处理后的数据
+        drop_threshold: 出现次数最多的值占比不低于该值的列会被删除
+        """
         
         self.is_save = is_save
         self.is_drop = is_drop
+        self.drop_threshold = drop_threshold
         self.file_name = file_name
         self.is_replace = is_replace
     
 
-    def fit(self, X, y=None):
+    def fit(self, X: pd.DataFrame, y=None):
+
+        """
+        学习预处理所需的全部状态
+        """
+
+        self._fit(X)
         return self
 
+
+    def fit_transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
+
+        """
+        只清洗一次数据，拟合后直接应用
+        """
+
+        return self._apply(self._fit(X))
+
     
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
 
+        """
+        使用fit学习到的状态处理数据，不重新拟合，没有目标值的数据(test.csv)只输出特征
+        """
+
+        if not hasattr(self, "preprocessor_"):
+            raise ValueError("PipeLineForPaperHousingData is not fitted yet...")
+        return self._apply(self.cleaner_.transform(X))
+
+
+    def _fit(self, X: pd.DataFrame) -> pd.DataFrame:
+
+        """
+        拟合全部状态，返回清洗后的数据
+        """
+
         # ------ 第一步，数据清洗 ------ #
-        pipeline_step_1 = Pipeline([
+        self.cleaner_ = Pipeline([
             # 某些NA值并非缺失值，这部分替换为None
             ("replace_na", ReplaceNAtoNone(self.is_replace)),
             # 去掉重复值太多的列
-            ("drop_columns", DropColumns(self.is_drop)),
+            ("drop_columns", DropColumns(self.is_drop, self.drop_threshold)),
         ])
-        X = pipeline_step_1.fit_transform(X)
+        X = self.cleaner_.fit_transform(X)
 
         # ------ 第二步，数据预处理 ------ #
         num_pipeline = Pipeline([
@@ -65,42 +105,46 @@ class PipeLineForPaperHousingData(BaseEstimator, TransformerMixin):
         cat_pipeline = Pipeline([
             # 填充缺失值，填充策略为以出现次数最多的类别填充
             ("imputer", SimpleImputer(strategy="most_frequent")),
-            # 对分类变量编码
-            ("ordinal_encoder", OrdinalEncoder()),
+            # 对分类变量编码，未见过的类别编码为-1
+            ("ordinal_encoder", OrdinalEncoder(
+                handle_unknown="use_encoded_value", unknown_value=-1
+            )),
         ])      # 分类变量处理
 
-        # ------ 分别提取连续变量和分类变量的列名 ------ #
-        num_attribs = [col for col in X.columns if str(X[col].dtype) == 'float64']
-        cat_attribs = [col for col in X.columns if str(X[col].dtype) != 'float64']
+        # ------ 分别提取连续变量和分类变量的列名，最后一列为目标值 ------ #
+        # 整数列同样是连续变量，test.csv中含缺失值的整数列会读为浮点数，
+        # 只认float64会把它们当作分类变量编码，未见过的取值全部变为-1
+        self.target_ = X.columns[-1]
+        features = X.columns[:-1]
+        self.num_attribs_ = [col for col in features if pd.api.types.is_numeric_dtype(X[col])]
+        self.cat_attribs_ = [col for col in features if not pd.api.types.is_numeric_dtype(X[col])]
         
-        # ------ 第三步，整合为一个管道 ------ #
-        pipeline_step_2 = ColumnTransformer([
-            ("num", num_pipeline, num_attribs),
-            ("cat", cat_pipeline, cat_attribs[:-1]),
-            # 对目标值取对数
-            ("target", FunctionTransformer(np.log), [cat_attribs[-1]]),
-        ])      
-        X = pipeline_step_2.fit_transform(X)
+        # ------ 第三步，整合为一个管道，目标值取对数不需要拟合，在_apply中处理 ------ #
+        self.preprocessor_ = ColumnTransformer([
+            ("num", num_pipeline, self.num_attribs_),
+            ("cat", cat_pipeline, self.cat_attribs_),
+        ]).fit(X)
+        return X
+
+
+    def _apply(self, X: pd.DataFrame) -> pd.DataFrame:
 
         # ------ 第四步，以DataFrame的形式输出 ------ #
-        X_df = pd.DataFrame(X, columns=num_attribs + cat_attribs)
+        X_df = pd.DataFrame(
+            self.preprocessor_.transform(X),
+            columns=self.num_attribs_ + self.cat_attribs_, index=X.index
+        )
+        if self.target_ in X.columns:
+            # 对目标值取对数
+            X_df[self.target_] = np.log(X[self.target_])
+        X_df.reset_index(drop=True, inplace=True)
 
         # ------ 第五步，持久化存储 ------ #
         if self.is_save:
-            # 创建存放数据的文件夹
-            folder_name = "house-prices-advanced-regression-techniques"
-            data_folder = os.path.join(FilesIO.getDataset(), folder_name)
-            if not os.path.exists(data_folder):
-                os.mkdir(data_folder)
-            else:
-                pass
-
-            # 以csv形式存储
-            X_df.to_csv(
-                FilesIO.getDataset(
-                    "%s/%s_housing_data_processed.csv" % 
-                    (folder_name, self.file_name)
-                ), index=False, encoding="utf-8-sig"
+            # 以列式存储，同时导出csv文件
+            DatasetIO.saveDataset(
+                X_df, "house-prices-advanced-regression-techniques/%s_housing_data_processed" % self.file_name,
+                is_export_csv=True
             )
         return X_df
     
@@ -131,9 +175,9 @@ class ReplaceNAtoNone(BaseEstimator, TransformerMixin):
             "BsmtFinType2", "FireplaceQu", "GarageType", "GarageFinish",
             "GarageQual", "GarageCond", "PoolQC", "Fence", "MiscFeature"
         ]
+        X = X.copy()
         if self.is_replace:
-            for col in cols_to_replace:
-                X[col].fillna("None", inplace=True)
+            X[cols_to_replace] = X[cols_to_replace].fillna("None")
         return X
 
 
@@ -141,32 +185,71 @@ class DropColumns(BaseEstimator, TransformerMixin):
 
     """
     数据预处理模块——删除部分数据
+    需要删除的列在fit时确定，transform时删除相同的列
     """
 
-    def __init__(self, is_drop: bool) -> None:
+    def __init__(self, is_drop: bool, threshold: float=0.9) -> None:
+
+        """
+        is_drop: 是否删除
+        threshold: 出现次数最多的值(包括NaN)占比不低于该值的列会被删除
+        """
 
         self.is_drop = is_drop
+        self.threshold = threshold
         
 
-    def fit(self, X, y=None):
+    def fit(self, X: pd.DataFrame, y=None):
+
+        """
+        找出重复值占比超过阈值的列以及NaN太多的列，不删除时不需要统计
+        """
+
+        if not self.is_drop:
+            self.cols_to_drop_ = []
+            return self
+        dominance = self.dominance(X)
+        self.cols_to_drop_ = dominance.index[dominance >= self.threshold].tolist()
+        self.cols_to_drop_.append('Id')
         return self
 
 
+    @staticmethod
+    def dominance(X: pd.DataFrame) -> pd.Series:
+
+        """
+        每一列中出现次数最多的值(NaN也视为一个值)的占比
+        每一列先编码为整数，加上各列的偏移量后用一次bincount统计所有列所有值的出现次数，
+        再按列取最大值，复杂度与数据量成线性，与每列不同值的个数无关
+        """
+
+        if len(X) == 0 or len(X.columns) == 0:
+            return pd.Series(0.0, index=X.columns)
+
+        # 按列存储，每一列的编码在内存中连续
+        codes = np.empty((len(X), len(X.columns)), dtype=np.int64, order="F")
+        offsets = np.empty(len(X.columns), dtype=np.int64)
+        offset = 0
+        for j, (_, values) in enumerate(X.items()):
+            col_codes, uniques = pd.factorize(values.to_numpy())
+            # NaN的编码为-1，改为单独的一类
+            col_codes[col_codes < 0] = len(uniques)
+            codes[:, j] = col_codes + offset
+            offsets[j] = offset
+            offset += len(uniques) + 1
+
+        counts = np.bincount(codes.ravel(order="F"), minlength=offset)
+        top = np.maximum.reduceat(counts, offsets)
+        return pd.Series(top / len(X), index=X.columns)
+
+
     def transform(self, X:pd.DataFrame) -> pd.DataFrame:
 
         """
-        删除重复值占比超过90%的列以及NaN太多的列
+        删除fit时找出的列
         """
 
-        cols_to_drop = []
-        for col in X.columns:
-            values_count = X[col].value_counts(dropna=False)
-            for value in values_count:
-                if value / values_count.sum(skipna=False) >= 0.9:
-                    cols_to_drop.append(col)
-                    break
-        cols_to_drop.append('Id')
         if self.is_drop:
-            return X.drop(columns=cols_to_drop)
+            return X.drop(columns=self.cols_to_drop_, errors="ignore")
         else:
             return X
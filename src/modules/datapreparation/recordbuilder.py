@@ -0,0 +1,198 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-07                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A schema-driven columnar builder that converts every field    #
+# to its final dtype on append and stores it in growable typed  #
+# arrays                                                        #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+
+
+class ColumnarRecordBuilder:
+
+    """
+    按schema逐条追加记录的列式构建器
+    每一列是预先分配的类型化数组，容量不足时成倍扩容；字段在追加时即转换为最终类型，
+    最后由这些数组直接构建DataFrame，不再经过object类型的中间列表
+    schema: 列名->类型，类型可以是
+        float64/float32: 浮点数，缺失值为NaN；需要保留精确值的列(价格、面积)应使用float64
+        int8/int16: 整数，缺失值由掩码记录，输出为可空整数(Int8/Int16)
+        category: 分类变量，存储为int16编码，缺失值编码为-1
+        str: 字符串
+    """
+
+    KINDS = {
+        "float64": np.float64, "float32": np.float32, "int8": np.int8, "int16": np.int16,
+        "category": np.int16, "str": object,
+    }
+
+    def __init__(self, schema: dict[str, str], capacity: int=1024) -> None:
+
+        """
+        schema: 列名->类型
+        capacity: 初始容量(条)
+        """
+
+        for column, kind in schema.items():
+            if kind not in self.KINDS:
+                raise ValueError("Unknown kind %s of column %s..." % (kind, column))
+        self.schema = dict(schema)
+        self.size = 0
+        self.capacity = max(1, capacity)
+        self._values = {
+            column: self._allocate(kind, self.capacity)
+            for column, kind in self.schema.items()
+        }
+        # 整数列的缺失值掩码，以及分类变量的取值->编码
+        self._masks = {
+            column: np.zeros(self.capacity, dtype=bool)
+            for column, kind in self.schema.items() if kind in ("int8", "int16")
+        }
+        self._categories = {
+            column: {} for column, kind in self.schema.items() if kind == "category"
+        }
+
+
+    def __len__(self) -> int:
+        return self.size
+
+
+    @staticmethod
+    def _allocate(kind: str, capacity: int) -> np.ndarray:
+        if kind in ("float64", "float32"):
+            return np.full(capacity, np.nan, dtype=ColumnarRecordBuilder.KINDS[kind])
+        if kind == "category":
+            return np.full(capacity, -1, dtype=np.int16)
+        if kind == "str":
+            return np.full(capacity, None, dtype=object)
+        return np.zeros(capacity, dtype=ColumnarRecordBuilder.KINDS[kind])
+
+
+    @staticmethod
+    def to_number(value) -> float:
+
+        """
+        将提取到的文本(或数字)转换为浮点数，缺失或无法转换时返回NaN
+        """
+
+        if value is None:
+            return np.nan
+        if isinstance(value, str):
+            try:
+                return float(value)
+            except ValueError:
+                return np.nan
+        return float(value)
+
+
+    def _grow(self, size: int) -> None:
+
+        """
+        成倍扩容，保证至少能容纳size条记录
+        """
+
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        for column, kind in self.schema.items():
+            values = self._allocate(kind, capacity)
+            values[:self.size] = self._values[column][:self.size]
+            self._values[column] = values
+        for column, mask in self._masks.items():
+            self._masks[column] = np.zeros(capacity, dtype=bool)
+            self._masks[column][:self.size] = mask[:self.size]
+        self.capacity = capacity
+
+
+    def _set(self, column: str, i: int, value) -> None:
+
+        """
+        转换单个字段并写入第i条记录
+        """
+
+        kind = self.schema[column]
+        if kind == "str":
+            self._values[column][i] = value if isinstance(value, str) else None
+        elif kind == "category":
+            # NaN和None都视为缺失
+            if isinstance(value, str):
+                codes = self._categories[column]
+                self._values[column][i] = codes.setdefault(value, len(codes))
+        elif kind in ("float64", "float32"):
+            self._values[column][i] = self.to_number(value)
+        else:
+            number = self.to_number(value)
+            if number != number:
+                self._masks[column][i] = True
+            else:
+                self._values[column][i] = int(number)
+
+
+    def append(self, record: dict) -> None:
+
+        """
+        追加一条记录，record中缺少的列视为缺失值
+        """
+
+        if self.size == self.capacity:
+            self._grow(self.size + 1)
+        set_value = self._set
+        for column in self.schema:
+            set_value(column, self.size, record.get(column))
+        self.size += 1
+
+
+    def extend(self, records: list[dict]) -> None:
+        self._grow(self.size + len(records))
+        for record in records:
+            self.append(record)
+
+
+    def extend_columns(self, columns: dict[str, list]) -> None:
+
+        """
+        按列追加多条记录，各列的长度必须相同，缺少的列视为缺失值
+        """
+
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(
+                "Columns of different lengths: %s..." %
+                {column: len(values) for column, values in columns.items()}
+            )
+        n = lengths.pop() if lengths else 0
+        self._grow(self.size + n)
+        for column in self.schema:
+            values = columns.get(column)
+            for k in range(n):
+                self._set(column, self.size + k, None if values is None else values[k])
+        self.size += n
+
+
+    def build(self) -> pd.DataFrame:
+
+        """
+        由已追加的记录构建DataFrame，数组按实际长度截取
+        """
+
+        data = {}
+        for column, kind in self.schema.items():
+            values = self._values[column][:self.size]
+            if kind == "category":
+                data[column] = pd.Categorical.from_codes(
+                    values, categories=list(self._categories[column])
+                )
+            elif kind in ("int8", "int16"):
+                data[column] = pd.arrays.IntegerArray(
+                    values, self._masks[column][:self.size]
+                )
+            else:
+                data[column] = values
+        return pd.DataFrame(data, copy=False)
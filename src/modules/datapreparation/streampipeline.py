@@ -0,0 +1,405 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-09                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# A streaming crawl -> parse -> geocode -> POI -> store         #
+# pipeline whose stages run concurrently and are connected by   #
+# bounded queues                                                #
+# ============================================================= #
+import time
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from typing import Callable
+from concurrent.futures import Future
+
+from src.common.fileTool.pagestore import PageStore
+from src.common.fileTool.datasetio import DatasetIO
+from src.common.fileTool.parsecache import PageParseCache
+from src.common.infoTool.const import CONST_TABLE
+from src.common.locTool.poiinfo import POICollector
+from src.common.locTool.poiindex import POIIndex
+from src.common.locTool.poicache import POICache
+from src.common.locTool.geobatch import BatchGeocoder
+from src.common.locTool.enrichcache import EnrichmentCache
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+from src.modules.datapreparation.listingextractor import ListingExtractor
+from src.modules.datapreparation.recordbuilder import ColumnarRecordBuilder
+
+_DONE = object()        # 队列的结束标记
+
+
+class StreamingHousingPipeline:
+
+    """
+    单个城市的流式数据管道：爬取 -> 解析 -> 地址解析 -> 检索周边设施 -> 存储
+    各阶段同时运行并由有界队列连接：一页下载完成后立即解析，解析出的新房源立即进行地址解析，
+    得到坐标后立即检索周边设施；队列满时上游阶段等待，内存占用有上限。
+    整个城市的用时接近最慢的单个阶段，而不是各阶段之和。
+    周边设施默认以每个房源自身的坐标检索；is_poi_cache=True时同一geohash格子内的房源以格子中心检索(与HousingDataParser相同)，
+    两种方式的结果都与房源到达的先后无关，因此在地址解析与检索结果相同时，
+    得到的数据集与HousingDataSpider + HousingDataParser(is_single_pass=True)在相同的is_poi_cache下相同
+    """
+
+    def __init__(
+            self, city: str=None, spider: HousingDataSpider=None,
+            is_async: bool=False, queue_size: int=64,
+            geocode_concurrency: int=8, poi_concurrency: int=16,
+            is_offline_poi: bool=False, is_poi_cache: bool=False,
+            is_incremental: bool=True, is_streaming: bool=True, is_save: bool=True
+    ) -> None:
+
+        """
+        city: 城市名称，例如北京市(city="BJ")
+        spider: 尚未开始爬取的爬虫(is_start=False)，用于设置请求头、代理池、限流等，
+                默认使用HousingDataSpider(city=city, is_start=False)
+        is_async: 是否使用asyncio并发爬取
+        queue_size: 各阶段之间队列的容量
+        geocode_concurrency: 同时进行的地址解析请求数
+        poi_concurrency: 同时检索周边设施的房源数
+        is_offline_poi: 是否使用本地POI快照(POIIndex)统计周边设施
+        is_poi_cache: 在线检索周边设施时是否使用POICache，见HousingDataParser
+        is_incremental: 是否读取PageParseCache与EnrichmentCache，只处理内容变化的页面与新房源，
+                        结果合并到已有的数据集中(见HousingDataParser)
+        is_streaming: 设置为False时各阶段依次运行(队列不限容量)，用于对比
+        is_save: 是否将结果存入row_data/<city>_housing_data
+        """
+
+        # ------ 检查输入 ------ #
+        if city is None or type(city) != str:
+            print("ERROR: Inappropriate input of city name...")
+            exit(1)
+        elif city not in list(CONST_TABLE["CITY"].keys()) or\
+             city not in list(CONST_TABLE["URL"].keys()) or\
+             city not in list(CONST_TABLE["CITY_CENTER"].keys()):
+            print("ERROR: City name not included, please add it in const.py")
+            exit(1)
+        else:
+            self.city = city
+        self.spider = spider if spider is not None \
+            else HousingDataSpider(city=city, is_start=False)
+        self.is_async = is_async
+        self.queue_size = queue_size
+        self.geocode_concurrency = geocode_concurrency
+        self.poi_concurrency = poi_concurrency
+        self.is_offline_poi = is_offline_poi
+        self.is_poi_cache = is_poi_cache
+        self.is_streaming = is_streaming
+        self.is_save = is_save
+        self.is_incremental = is_incremental
+        self.parse_cache = PageParseCache.getDefault() if is_incremental else None
+        self.enrich_cache = EnrichmentCache.getDefault() if is_incremental else None
+
+        # ------ 各阶段共享的状态 ------ #
+        self.pages = {}             # 页码->该页的记录
+        self.enrichment = {}        # 房源地址->经纬度与周边设施的数量
+        self.stage_time = {}        # 阶段->(开始时间, 结束时间, 累计处理时间)
+        self._seen = set()          # 已经送入地址解析的房源地址
+        self._to_cache = {}         # 尚未写入EnrichmentCache的补充信息
+        self._poi_futures = {}      # (类别, geohash)->检索结果，同一个格子只检索一次
+        self._poi_index = None
+        self._geocoder = None
+        self._lock = threading.Lock()
+
+
+    def run(self) -> pd.DataFrame:
+
+        """
+        运行整个管道，返回该城市的数据集
+        """
+
+        start_time = time.time()
+        size = self.queue_size if self.is_streaming else 0
+        pages, listings, coords, results = (queue.Queue(size) for _ in range(4))
+        if self.is_offline_poi:
+            self._poi_index = POIIndex.load(self.city)
+        self._geocoder = BatchGeocoder(
+            city=CONST_TABLE["CITY"][self.city], concurrency=self.geocode_concurrency
+        )
+        if self.enrich_cache is not None:
+            self.enrich_cache.evict()
+            self.enrich_cache.reset_stats()
+        if self.parse_cache is not None:
+            self.parse_cache.evict(ListingExtractor.VERSION)
+            self.parse_cache.reset_stats()
+
+        # ------ 启动各个阶段，依次运行时等待上一阶段结束再启动下一阶段 ------ #
+        stages = [
+            ("crawl", self._crawl, None, pages, 1),
+            ("parse", self._parse, pages, listings, 1),
+            ("geocode", self._geocode, listings, coords, self.geocode_concurrency),
+            ("poi", self._collect_poi, coords, results, self.poi_concurrency),
+            ("store", self._store, results, None, 1),
+        ]
+        closers = []
+        for name, func, inbox, outbox, workers in stages:
+            closers.append(self._start_stage(name, func, inbox, outbox, workers))
+            if not self.is_streaming:
+                closers[-1].join()
+        for closer in closers:
+            closer.join()
+        self._flush_cache()
+
+        # ------ 按页码顺序组装数据集，增量运行时合并到已有的数据集中 ------ #
+        df = self._assemble()
+        if self.is_incremental:
+            df = DatasetIO.mergeDataset(
+                df, "row_data/%s_housing_data" % self.city, key="houseLoc", id_column="ID"
+            )
+        if self.is_save:
+            DatasetIO.saveDataset(
+                df, "row_data/%s_housing_data" % self.city, is_export_csv=True
+            )
+        print(
+            "Pipeline of %s: %d listings, %s, total %.2fs" % (
+                self.city, len(df), self.summary(), time.time() - start_time
+            )
+        )
+        print("Geocode of %s: %s" % (self.city, self._geocoder.summary()))
+        if self.enrich_cache is not None:
+            print("Enrichment cache: %s" % self.enrich_cache.summary())
+        if self.is_poi_cache and not self.is_offline_poi:
+            print("POI cache: %s" % POICache.getDefault().summary())
+        return df
+
+
+    def summary(self) -> str:
+
+        """
+        各阶段的运行时间(从开始到结束)与累计处理时间
+        """
+
+        return ", ".join(
+            "%s %.2fs (busy %.2fs)" % (name, end - start, busy)
+            for name, (start, end, busy) in self.stage_time.items()
+        )
+
+
+    def _start_stage(
+            self, name: str, func: Callable, inbox: queue.Queue,
+            outbox: queue.Queue, workers: int
+    ) -> threading.Thread:
+
+        """
+        启动一个阶段的workers个线程，返回等待它们结束的线程
+        每个线程从inbox中取出一项，将func返回的各项放入outbox；
+        inbox为None时该阶段为数据源，func直接向outbox放入数据。
+        所有线程结束后向outbox放入结束标记，单项失败时打印错误并继续
+        """
+
+        self.stage_time[name] = (time.time(), time.time(), 0.0)
+
+        def record(elapsed: float) -> None:
+            with self._lock:
+                start, _, busy = self.stage_time[name]
+                self.stage_time[name] = (start, time.time(), busy + elapsed)
+
+        def work() -> None:
+            if inbox is None:
+                begin = time.time()
+                func(outbox)
+                record(time.time() - begin)
+                return
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    # 放回结束标记，使同一阶段的其他线程也能结束
+                    inbox.put(_DONE)
+                    return
+                begin = time.time()
+                try:
+                    outputs = func(item)
+                except Exception as e:
+                    print("ERROR: Stage %s failed on %s (%s)..." % (name, item, e))
+                    outputs = []
+                record(time.time() - begin)
+                for output in outputs:
+                    outbox.put(output)
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        def close() -> None:
+            for thread in threads:
+                thread.join()
+            if outbox is not None:
+                outbox.put(_DONE)
+
+        closer = threading.Thread(target=close, daemon=True)
+        closer.start()
+        return closer
+
+
+    def _crawl(self, pages: queue.Queue) -> None:
+
+        """
+        数据源：先送出仓库中已有且不需要重新获取的页面，再爬取其余页面，每获取一页立即送入队列
+        """
+
+        for page in range(1, self.spider.page_num + 1):
+            if page not in self.spider.pending_pages:
+                text = self.spider.store.get(self.city, page)
+                if text is not None:
+                    pages.put((page, text))
+        self.spider.on_page = lambda page, text: pages.put((page, text))
+        self.spider.crawl(self.is_async)
+
+
+    def _parse(self, item: tuple[int, str]) -> list[str]:
+
+        """
+        提取一页的房源，返回需要地址解析的新房源地址；已有缓存的房源直接使用缓存的补充信息
+        """
+
+        page, text = item
+        content_hash = PageStore.content_hash(text)
+        records = self.parse_cache.get(content_hash, ListingExtractor.VERSION) \
+            if self.parse_cache is not None else None
+        if records is None:
+            records = ListingExtractor.extract_text(text)
+            if self.parse_cache is not None:
+                self.parse_cache.put(content_hash, ListingExtractor.VERSION, records)
+        self.pages[page] = records
+
+        # ------ 同一地址只处理一次 ------ #
+        new = []
+        for record in records:
+            if record["houseLoc"] not in self._seen:
+                self._seen.add(record["houseLoc"])
+                new.append(record["houseLoc"])
+        if self.enrich_cache is None:
+            return new
+
+        columns = ["longitude", "latitude"] + list(CONST_TABLE["POI"])
+        outputs = []
+        for house_loc, enrichment in zip(new, self.enrich_cache.get_many(self.city, new)):
+            # 周边设施的类别增加后，旧记录视为不存在
+            if enrichment is None or any(column not in enrichment for column in columns):
+                outputs.append(house_loc)
+            else:
+                self.enrichment[house_loc] = enrichment
+        return outputs
+
+
+    def _geocode(self, house_loc: str) -> list[tuple[str, float, float]]:
+
+        """
+        地址解析，返回(房源地址, 经度, 纬度)，解析失败时坐标为NaN
+        规范化后相同的地址只请求一次，同时到达的相同地址共享同一个请求
+        """
+
+        lng, lat = self._geocoder.geocode(house_loc)
+        return [(house_loc, lng, lat)]
+
+
+    def _collect_poi(self, item: tuple[str, float, float]) -> list[tuple[str, dict]]:
+
+        """
+        检索一个房源的周边设施，返回(房源地址, 补充信息)
+        """
+
+        house_loc, lng, lat = item
+        enrichment = {"longitude": lng, "latitude": lat}
+        if self._poi_index is not None:
+            counts = self._poi_index.count_all(
+                CONST_TABLE["POI"], np.array([lat]), np.array([lng]), radius=1000,
+                max_count=POIIndex.API_PAGE_SIZE
+            )
+            enrichment.update({column: float(count[0]) for column, count in counts.items()})
+        else:
+            for column, category in CONST_TABLE["POI"].items():
+                enrichment[column] = self._count_poi(category, lat, lng)
+        return [(house_loc, enrichment)]
+
+
+    def _count_poi(self, category: str, lat: float, lng: float) -> float:
+
+        """
+        检索一个类别的周边设施数量，失败时返回NaN
+        默认以房源自身的坐标检索；is_poi_cache=True时位于同一个geohash格子内的房源(与POICache的键一致)只检索一次，
+        检索中心为格子的中心，先到的房源负责检索，正在检索时后到的房源等待并共享结果
+        """
+
+        cache = POICache.getDefault() if self.is_poi_cache else None
+        if cache is None or np.isnan(lat) or np.isnan(lng):
+            future = Future()
+            is_owner = True
+        else:
+            cell = cache.geohash(lat, lng, cache.precision)
+            lat, lng = cache.cell_center(cell)
+            key = (category, cell)
+            with self._lock:
+                future = self._poi_futures.get(key)
+                is_owner = future is None
+                if is_owner:
+                    future = self._poi_futures[key] = Future()
+        if is_owner:
+            try:
+                future.set_result(POICollector(
+                    query=category, lat=lat, lng=lng, radius=1000,
+                    cache=cache, is_cache=cache is not None
+                ).num_of_query)
+            except Exception:
+                future.set_result(None)
+        num_of_query = future.result()
+        return np.nan if num_of_query is None else float(num_of_query)
+
+
+    def _store(self, item: tuple[str, dict]) -> list:
+
+        """
+        保存一个房源的补充信息，完整的(没有NaN)每100条写入一次EnrichmentCache
+        """
+
+        house_loc, enrichment = item
+        self.enrichment[house_loc] = enrichment
+        if self.enrich_cache is not None and \
+           not any(np.isnan(value) for value in enrichment.values()):
+            self._to_cache[house_loc] = {
+                column: float(value) for column, value in enrichment.items()
+            }
+            if len(self._to_cache) >= 100:
+                self._flush_cache()
+        return []
+
+
+    def _flush_cache(self) -> None:
+        if self.enrich_cache is not None and self._to_cache:
+            self.enrich_cache.put_many(self.city, self._to_cache)
+            self._to_cache = {}
+
+
+    def _assemble(self) -> pd.DataFrame:
+
+        """
+        按页码顺序合并各页的记录并去重，添加补充信息，列的顺序与HousingDataParser一致
+        """
+
+        builder = ColumnarRecordBuilder(ListingExtractor.SCHEMA)
+        for page in sorted(self.pages):
+            builder.extend(self.pages[page])
+        df = builder.build()
+        df.drop_duplicates(inplace=True, subset=["houseLoc"], keep="first")
+        df.reset_index(drop=True, inplace=True)
+
+        addresses = df["houseLoc"].tolist()
+        values = {
+            column: np.array([
+                self.enrichment.get(address, {}).get(column, np.nan)
+                for address in addresses
+            ], dtype=float)
+            for column in ["longitude", "latitude"] + list(CONST_TABLE["POI"])
+        }
+        df.insert(1, "longitude", values["longitude"])
+        df.insert(2, "latitude", values["latitude"])
+        df.insert(0, "ID", range(1, len(df) + 1))
+        for column in CONST_TABLE["POI"]:
+            df.insert(
+                len(df.columns), column, pd.Series(values[column]).astype("Int64")
+            )
+        return df
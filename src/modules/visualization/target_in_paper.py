@@ -16,7 +16,7 @@ import matplotlib.pyplot as plt
 matplotlib.rcParams['font.family'] = 'SimHei'
 matplotlib.rcParams['axes.unicode_minus'] = False
 
-from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.datasetio import DatasetIO
 from src.common.fileTool.figuresio import FiguresIO
 
 
@@ -30,9 +30,10 @@ class DrawTargetInPaper:
         """
 
         # ------ 读取数据 ------ #
-        data = pd.read_csv(FilesIO.getDataset(
-            "house-prices-advanced-regression-techniques/train.csv"
-        ))
+        data = DatasetIO.loadDataset(
+            "house-prices-advanced-regression-techniques/train",
+            columns=["SalePrice"]
+        )
 
         # ------ 绘制图像 ------ #
         _, ax = plt.subplots(1, 2, figsize=(20, 8), dpi=100)
@@ -0,0 +1,127 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Shared fixtures, so that the tests never touch the network    #
+# or the real datasets                                          #
+# ============================================================= #
+import os
+import threading
+import pandas as pd
+import pytest
+
+from benchmarks.stubserver import ListingStubServer
+from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.pagestore import PageStore
+from src.common.fileTool.parsecache import PageParseCache
+from src.common.locTool.enrichcache import EnrichmentCache
+from src.common.locTool.gazetteer import Gazetteer
+from src.common.locTool.geocache import GeocodeCache
+from src.common.locTool.poicache import POICache
+from src.common.netTool.session import SessionPool
+
+
+@pytest.fixture(scope="session")
+def server() -> ListingStubServer:
+    with ListingStubServer(listings_per_page=10) as server:
+        yield server
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch) -> str:
+
+    """
+    将datasets目录重定向到临时目录，返回该目录
+    """
+
+    root = str(tmp_path / "datasets")
+    os.makedirs(root)
+    monkeypatch.setattr(
+        FilesIO, "getDataset",
+        staticmethod(lambda filename=None: root if filename is None else os.path.join(root, filename))
+    )
+    return root
+
+
+class FakeResponse:
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+
+    def json(self) -> dict:
+        return self.data
+
+
+class FakeBaiduSession:
+
+    """
+    代替百度地图接口的会话，记录每个请求的参数
+    地址解析总是返回同一个坐标，地址中含有"不存在"时返回解析失败；
+    周边设施检索返回poi_counts[类别]条结果，默认为3条
+    """
+
+    def __init__(self, delay: float=0.0) -> None:
+        self.delay = delay
+        self.requests = []
+        self.poi_counts = {}
+        self.in_flight = 0
+        self.peak = 0               # 同时进行的最大请求数
+        self._lock = threading.Lock()
+
+
+    @property
+    def addresses(self) -> list[str]:
+        return [params["address"] for params in self.requests if "address" in params]
+
+
+    def get(self, url: str, params: dict=None, **kwargs) -> FakeResponse:
+        with self._lock:
+            self.requests.append(dict(params))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        if self.delay:
+            threading.Event().wait(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if "address" not in params:
+            count = self.poi_counts.get(params["query"], 3)
+            return FakeResponse({"status": 0, "results": [{}] * count})
+        if "不存在" in params["address"]:
+            return FakeResponse({"status": 1, "msg": "Not found"})
+        return FakeResponse({
+            "status": 0, "result": {"location": {"lng": 104.07, "lat": 30.66}}
+        })
+
+
+@pytest.fixture
+def baidu(monkeypatch) -> FakeBaiduSession:
+    session = FakeBaiduSession(delay=0.05)
+    monkeypatch.setitem(SessionPool._sessions, "baidu", session)
+    return session
+
+
+@pytest.fixture
+def workspace(datasets, baidu, monkeypatch) -> PageStore:
+
+    """
+    完整运行HousingDataParser的环境：数据集与页面仓库位于临时目录，各个缓存重新创建，
+    离线地址查找表为空，百度地图接口由baidu代替；返回页面仓库
+    """
+
+    root = os.path.join(datasets, "webtexts")
+    os.makedirs(root)
+    monkeypatch.setattr(
+        FilesIO, "getHTMLtext",
+        staticmethod(lambda filename=None: root if filename is None else os.path.join(root, filename))
+    )
+    for cache_class in (PageParseCache, EnrichmentCache, GeocodeCache, POICache):
+        monkeypatch.setattr(cache_class, "_default", None)
+    monkeypatch.setattr(Gazetteer, "_default", Gazetteer(pd.DataFrame(columns=Gazetteer.COLUMNS)))
+    yield PageStore()
+    for cache_class in (PageParseCache, EnrichmentCache, GeocodeCache, POICache):
+        if cache_class.__dict__.get("_default") is not None:
+            cache_class._default.close()
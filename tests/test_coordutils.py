@@ -0,0 +1,51 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Vectorized coordinate conversion against CoordTransformer     #
+# ============================================================= #
+import numpy as np
+
+from src.common.locTool.coordutils import CoordTransformer
+
+# 成都、北京、上海、广州附近的百度坐标
+BD_LNG = np.array([104.0723, 116.4040, 121.4800, 113.2700, 104.1500])
+BD_LAT = np.array([30.6637, 39.9150, 31.2360, 23.1350, 30.5800])
+
+
+def test_vectorized_matches_scalar():
+    lng, lat = CoordTransformer.bd09_to_wgs84(BD_LNG, BD_LAT)
+    for i in range(len(BD_LNG)):
+        transformer = CoordTransformer(BD_LNG[i], BD_LAT[i])
+        assert np.isclose(lng[i], transformer.res_lng, rtol=0, atol=1e-12)
+        assert np.isclose(lat[i], transformer.res_lat, rtol=0, atol=1e-12)
+
+
+def test_scalar_input():
+    lng, lat = CoordTransformer.bd09_to_wgs84(BD_LNG[0], BD_LAT[0])
+    transformer = CoordTransformer(BD_LNG[0], BD_LAT[0])
+    assert np.ndim(lng) == 0
+    assert np.isclose(lng, transformer.res_lng, rtol=0, atol=1e-12)
+    assert np.isclose(lat, transformer.res_lat, rtol=0, atol=1e-12)
+
+
+def test_bd09_gcj02_roundtrip():
+    lng, lat = CoordTransformer.gcj02_to_bd09(*CoordTransformer.bd09_to_gcj02(BD_LNG, BD_LAT))
+    # BD-09与GCJ-02之间的转换是近似互逆的，误差在1e-5度(约1米)以内
+    assert np.allclose(lng, BD_LNG, rtol=0, atol=1e-5)
+    assert np.allclose(lat, BD_LAT, rtol=0, atol=1e-5)
+
+
+def test_iterations_reduce_error():
+    # 单次近似为米级误差，迭代后再正向转换应回到原坐标
+    errors = []
+    for iterations in (1, 3):
+        wgs_lng, wgs_lat = CoordTransformer.gcj02_to_wgs84(BD_LNG, BD_LAT, iterations)
+        gcj_lng, gcj_lat = CoordTransformer.wgs84_to_gcj02(wgs_lng, wgs_lat)
+        errors.append(np.max(np.abs(np.concatenate([gcj_lng - BD_LNG, gcj_lat - BD_LAT]))))
+    assert errors[0] < 1e-4
+    assert errors[1] < 1e-9
+    assert errors[1] < errors[0]
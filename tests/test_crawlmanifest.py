@@ -0,0 +1,79 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Pending pages, expiry and resumption of the crawl manifest    #
+# ============================================================= #
+import os
+import time
+
+from src.common.fileTool.pagestore import PageStore
+from src.modules.datapreparation.crawlmanifest import CrawlManifest
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+
+
+def make_manifest(tmp_path, max_age=None) -> CrawlManifest:
+    store = PageStore(str(tmp_path))
+    folder = os.path.join(str(tmp_path), "CD_htmls")
+    os.makedirs(folder, exist_ok=True)
+    return CrawlManifest(folder, "CD", store, max_age)
+
+
+def test_pending(tmp_path):
+    manifest = make_manifest(tmp_path)
+    for page in (1, 2):
+        manifest.store.put("CD", page, "<html>%d</html>" % page)
+        manifest.record(page, "ok", "<html>%d</html>" % page)
+    manifest.record(3, "failed")
+    assert manifest.pending(range(1, 6)) == [3, 4, 5]
+
+    # 重新启动后从磁盘读取清单
+    assert make_manifest(tmp_path).pending(range(1, 6)) == [3, 4, 5]
+
+
+def test_missing_page_is_pending(tmp_path):
+    # 清单中记录成功，但页面已经不在仓库中
+    manifest = make_manifest(tmp_path)
+    manifest.record(1, "ok", "<html>1</html>")
+    assert manifest.pending(range(1, 2)) == [1]
+
+
+def test_max_age(tmp_path):
+    manifest = make_manifest(tmp_path, max_age=60)
+    for page in (1, 2):
+        manifest.store.put("CD", page, "<html>%d</html>" % page)
+    manifest.record(1, "ok", "<html>1</html>", fetched_at=time.time() - 120)
+    manifest.record(2, "ok", "<html>2</html>")
+    assert manifest.pending(range(1, 3)) == [1]
+
+
+def test_adopts_legacy_pages(tmp_path):
+    manifest = make_manifest(tmp_path)
+    with open(manifest.store.legacy_path("CD", 1), "w", encoding="utf-8") as f:
+        f.write("<html>旧</html>")
+    assert manifest.pending(range(1, 3)) == [2]
+    assert manifest.pages[1]["hash"] == PageStore.content_hash("<html>旧</html>")
+
+
+def test_broken_manifest_is_rebuilt(tmp_path):
+    manifest = make_manifest(tmp_path)
+    with open(manifest.path, "w", encoding="utf-8") as f:
+        f.write("{broken")
+    assert make_manifest(tmp_path).pages == {}
+
+
+def test_spider_resumes(server, tmp_path):
+    spider = HousingDataSpider(
+        city="CD", base_url=server.base_url, save_path=str(tmp_path), rate=1000,
+        page_num=6, max_retry=2, is_start=False
+    )
+    spider.pending_pages = [1, 2, 3]
+    spider.crawl()
+    resumed = HousingDataSpider(
+        city="CD", base_url=server.base_url, save_path=str(tmp_path),
+        page_num=6, is_start=False
+    )
+    assert resumed.pending_pages == [4, 5, 6]
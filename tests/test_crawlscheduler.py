@@ -0,0 +1,73 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# The multi-city scheduler shares one limiter, one global       #
+# semaphore and one executor between the cities                 #
+# ============================================================= #
+import time
+import threading
+from contextlib import ExitStack
+
+from benchmarks.stubserver import ListingStubServer
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+from src.modules.datapreparation.crawlscheduler import MultiCityCrawlScheduler
+
+CITIES = ["CD", "BJ", "SH"]
+
+
+def make_scheduler(stack, tmp_path, **kwargs) -> MultiCityCrawlScheduler:
+    base_urls = {
+        city: stack.enter_context(ListingStubServer(listings_per_page=5)).base_url
+        for city in CITIES
+    }
+    return MultiCityCrawlScheduler(
+        cities=CITIES, rate=1000, burst=10, page_num=4, max_retry=2,
+        base_urls=base_urls, save_path=str(tmp_path), **kwargs
+    )
+
+
+def test_shared_limiter_semaphore_and_executor(tmp_path, monkeypatch):
+    calls = []
+
+    async def crawl_async(self, global_semaphore=None, executor=None):
+        calls.append((self.city, global_semaphore, executor))
+
+    monkeypatch.setattr(HousingDataSpider, "crawl_async", crawl_async)
+    with ExitStack() as stack:
+        scheduler = make_scheduler(stack, tmp_path)
+        assert all(spider.limiter is scheduler.limiter for spider in scheduler.spiders.values())
+        scheduler.run()
+    assert sorted(city for city, _, _ in calls) == sorted(CITIES)
+    assert len({id(semaphore) for _, semaphore, _ in calls}) == 1
+    assert len({id(executor) for _, _, executor in calls}) == 1
+    assert calls[0][1] is not None and calls[0][2] is not None
+
+
+def test_global_concurrency(tmp_path, monkeypatch):
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+    request_page = HousingDataSpider._request_page
+
+    def counting(self, page):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        try:
+            return request_page(self, page)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    monkeypatch.setattr(HousingDataSpider, "_request_page", counting)
+    with ExitStack() as stack:
+        scheduler = make_scheduler(stack, tmp_path, concurrency=4, global_concurrency=2)
+        report = scheduler.run()
+    assert all(item["done"] == 4 for item in report.values())
+    assert peak[0] <= 2
+    # 所有城市的请求都由同一个限流器计数
+    assert scheduler.limiter.stats.successes == 4 * len(CITIES)
@@ -0,0 +1,53 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Sequential and asyncio crawls against the local listing       #
+# server                                                        #
+# ============================================================= #
+import threading
+
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+
+PAGE_NUM = 8
+
+
+def make_spider(server, save_path, **kwargs) -> HousingDataSpider:
+    return HousingDataSpider(
+        city="CD", base_url=server.base_url, save_path=save_path, rate=1000,
+        burst=PAGE_NUM, page_num=PAGE_NUM, max_retry=2, is_start=False, **kwargs
+    )
+
+
+def test_async_crawl_stores_every_page(server, tmp_path):
+    spider = make_spider(server, str(tmp_path), concurrency=4)
+    spider.crawl(is_async=True)
+    assert spider.done_pages == PAGE_NUM
+    assert spider.failed_pages == 0
+    for page in range(1, PAGE_NUM + 1):
+        assert spider.store.get("CD", page) == server.build_page(page)
+
+
+def test_async_matches_sequential(server, tmp_path):
+    sequential = make_spider(server, str(tmp_path / "sequential"))
+    sequential.crawl(is_async=False)
+    concurrent = make_spider(server, str(tmp_path / "async"), concurrency=4)
+    concurrent.crawl(is_async=True)
+    assert sequential.store.index("CD") == concurrent.store.index("CD")
+
+
+def test_on_page_runs_off_the_event_loop(server, tmp_path):
+    threads = {}
+    spider = make_spider(
+        server, str(tmp_path), concurrency=4,
+        on_page=lambda page, text: threads.setdefault(page, threading.get_ident())
+    )
+    spider.crawl(is_async=True)
+    assert sorted(threads) == list(range(1, PAGE_NUM + 1))
+    # 所有页面由同一个处理线程依次处理，不在事件循环所在的主线程中
+    assert len(set(threads.values())) == 1
+    assert threading.get_ident() not in threads.values()
+
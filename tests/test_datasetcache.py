@@ -0,0 +1,97 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Hits and misses of the processed-dataset cache                #
+# ============================================================= #
+import os
+import glob
+import pandas as pd
+import pytest
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from src.common.fileTool.datasetio import DatasetIO
+from src.common.fileTool.datasetcache import ProcessedDataCache
+
+NAME = "row_data/CD_housing_data"
+
+
+class Scale(BaseEstimator, TransformerMixin):
+
+    VERSION = 1
+
+    def __init__(self, factor: float=2.0) -> None:
+        self.factor = factor
+
+
+    def fit(self, X, y=None):
+        self.mean_ = X["unitPrice"].mean()
+        return self
+
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        return X.assign(unitPrice=(X["unitPrice"] - self.mean_) * self.factor)
+
+
+@pytest.fixture
+def cache(datasets) -> ProcessedDataCache:
+    DatasetIO.saveDataset(
+        pd.DataFrame({"houseLoc": ["a", "b", "c"], "unitPrice": [1.0, 2.0, 6.0]}), NAME
+    )
+    return ProcessedDataCache(os.path.join(datasets, ProcessedDataCache.FOLDER_NAME))
+
+
+def cached_files(cache: ProcessedDataCache) -> list[str]:
+    return glob.glob(os.path.join(cache.root_path, "*.pkl"))
+
+
+def test_hit(cache):
+    data, pipeline = cache.fit_transform(NAME, Scale())
+    cached_data, cached_pipeline = cache.fit_transform(NAME, Scale())
+    pd.testing.assert_frame_equal(cached_data, data)
+    assert cached_data["unitPrice"].tolist() == [-4.0, -2.0, 6.0]
+    assert cached_pipeline.mean_ == pipeline.mean_ == 3.0
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.summary() == "1 hits, 1 misses"
+
+
+def test_same_content_from_csv_hits(cache):
+    cache.fit_transform(NAME, Scale())
+    # 由csv重新生成列式存储，文件字节可能不同，但内容相同
+    DatasetIO.exportCSV(NAME)
+    os.remove(DatasetIO.getPath(NAME))
+    cache.fit_transform(NAME, Scale())
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_data_change_misses(cache):
+    cache.fit_transform(NAME, Scale())
+    DatasetIO.saveDataset(
+        pd.DataFrame({"houseLoc": ["a", "b", "c"], "unitPrice": [1.0, 2.0, 9.0]}), NAME
+    )
+    data, _ = cache.fit_transform(NAME, Scale())
+    assert data["unitPrice"].tolist() == [-6.0, -4.0, 10.0]
+    assert (cache.hits, cache.misses) == (0, 2)
+    # 同一数据集的旧缓存被删除
+    assert len(cached_files(cache)) == 1
+
+
+def test_config_change_misses(cache, monkeypatch):
+    cache.fit_transform(NAME, Scale())
+    data, _ = cache.fit_transform(NAME, Scale(factor=1.0))
+    assert data["unitPrice"].tolist() == [-2.0, -1.0, 3.0]
+    monkeypatch.setattr(Scale, "VERSION", 2)
+    cache.fit_transform(NAME, Scale(factor=1.0))
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_broken_cache_recomputed(cache):
+    cache.fit_transform(NAME, Scale())
+    with open(cached_files(cache)[0], "wb") as f:
+        f.write(b"broken")
+    data, _ = cache.fit_transform(NAME, Scale())
+    assert data["unitPrice"].tolist() == [-4.0, -2.0, 6.0]
+    assert (cache.hits, cache.misses) == (0, 2)
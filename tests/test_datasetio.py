@@ -0,0 +1,89 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Columnar dataset storage: typed round-trip, projection and    #
+# refreshing from a newer csv                                   #
+# ============================================================= #
+import os
+import pandas as pd
+import pytest
+
+from src.common.fileTool.datasetio import DatasetIO
+
+NAME = "row_data/CD_housing_data"
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "ID": pd.array([1, 2, 3], dtype="Int64"),
+        "houseLoc": ["银港水晶城", "蓝光COCO", None],
+        "unitPrice": [12000.0, 15500.5, float("nan")],
+        "schoolAround": pd.array([3, None, 10], dtype="Int64"),
+    })
+
+
+def test_roundtrip_keeps_dtypes(datasets, df):
+    path = DatasetIO.saveDataset(df, NAME)
+    assert path == os.path.join(datasets, NAME + ".parquet")
+    pd.testing.assert_frame_equal(DatasetIO.loadDataset(NAME), df)
+
+
+def test_feather(datasets, df):
+    DatasetIO.saveDataset(df, NAME, fmt="feather")
+    assert DatasetIO.resolvePath(NAME).endswith(".feather")
+    pd.testing.assert_frame_equal(DatasetIO.loadDataset(NAME), df)
+
+
+def test_projection(datasets, df):
+    DatasetIO.saveDataset(df, NAME)
+    loaded = DatasetIO.loadDataset(NAME, columns=["unitPrice", "ID"])
+    assert loaded.columns.tolist() == ["unitPrice", "ID"]
+    pd.testing.assert_frame_equal(loaded, df[["unitPrice", "ID"]])
+
+
+def test_exported_csv_not_reconverted(datasets, df):
+    path = DatasetIO.saveDataset(df, NAME, is_export_csv=True)
+    assert os.path.exists(DatasetIO.getPath(NAME, "csv"))
+    mtime = os.path.getmtime(path)
+    assert DatasetIO.resolvePath(NAME) == path
+    assert os.path.getmtime(path) == mtime
+
+
+def test_csv_only_converted(datasets, df):
+    os.makedirs(os.path.dirname(DatasetIO.getPath(NAME, "csv")))
+    df.to_csv(DatasetIO.getPath(NAME, "csv"), index=False)
+    assert not os.path.exists(DatasetIO.getPath(NAME))
+    loaded = DatasetIO.loadDataset(NAME)
+    assert os.path.exists(DatasetIO.getPath(NAME))
+    assert loaded["houseLoc"].tolist()[:2] == ["银港水晶城", "蓝光COCO"]
+
+
+def test_newer_csv_refreshes_parquet(datasets, df):
+    path = DatasetIO.saveDataset(df, NAME, is_export_csv=True)
+    mtime = os.path.getmtime(path) - 10
+    os.utime(path, (mtime, mtime))
+    df.assign(unitPrice=[1.0, 2.0, 3.0]).to_csv(DatasetIO.getPath(NAME, "csv"), index=False)
+    assert DatasetIO.loadDataset(NAME)["unitPrice"].tolist() == [1.0, 2.0, 3.0]
+    # 刷新后列式存储不比csv旧，下次直接读取
+    mtime = os.path.getmtime(path)
+    assert mtime >= os.path.getmtime(DatasetIO.getPath(NAME, "csv"))
+    assert DatasetIO.resolvePath(NAME) == path
+    assert os.path.getmtime(path) == mtime
+
+
+def test_missing_dataset(datasets):
+    with pytest.raises(FileNotFoundError):
+        DatasetIO.loadDataset(NAME)
+
+
+def test_load_cities(datasets, df):
+    DatasetIO.saveDataset(df, "row_data/CD_housing_data")
+    DatasetIO.saveDataset(df.head(1), "row_data/BJ_housing_data")
+    cities = DatasetIO.loadCities(columns=["ID"], cities=["CD", "BJ"])
+    assert cities.columns.tolist() == ["city", "ID"]
+    assert cities["city"].tolist() == ["CD", "CD", "CD", "BJ"]
@@ -0,0 +1,80 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Haversine and Vincenty distances and DistanceToCityCenter    #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+
+from src.common.locTool.distance import GeoDistance
+from src.modules.datapreparation.pipeline58 import DistanceToCityCenter
+from src.common.infoTool.const import CONST_TABLE
+
+
+def dms(degrees: float, minutes: float, seconds: float) -> float:
+    sign = -1 if degrees < 0 else 1
+    return sign * (abs(degrees) + minutes / 60 + seconds / 3600)
+
+
+def test_vincenty_reference():
+    # Vincenty(1975)论文中的算例: Flinders Peak -> Buninyong, 54972.271m
+    distance = GeoDistance.vincenty(
+        dms(-37, 57, 3.72030), dms(144, 25, 29.52440),
+        dms(-37, 39, 10.15610), dms(143, 55, 35.38390)
+    )
+    assert abs(distance * 1000 - 54972.271) < 0.01
+
+
+def test_zero_distance():
+    assert GeoDistance.haversine(30.66, 104.07, 30.66, 104.07) == 0
+    assert GeoDistance.vincenty(30.66, 104.07, 30.66, 104.07) == 0
+
+
+def test_one_degree_of_latitude():
+    # 赤道上经度1度约111.32km，子午线上纬度1度约110.57km
+    assert abs(GeoDistance.vincenty(0, 0, 0, 1) - 111.3195) < 1e-3
+    assert abs(GeoDistance.vincenty(0, 0, 1, 0) - 110.5743) < 1e-3
+
+
+def test_haversine_close_to_vincenty():
+    rng = np.random.default_rng(0)
+    lat1, lat2 = rng.uniform(18, 53, (2, 1000))
+    lng1, lng2 = rng.uniform(73, 135, (2, 1000))
+    haversine = GeoDistance.haversine(lat1, lng1, lat2, lng2)
+    vincenty = GeoDistance.vincenty(lat1, lng1, lat2, lng2)
+    assert np.all(np.abs(haversine - vincenty) <= 0.005 * vincenty)
+
+
+def test_broadcasting():
+    # 一个中心点到多个点的距离，与逐个计算相同
+    lat = np.array([30.60, 30.70, 30.80])
+    lng = np.array([104.00, 104.10, 104.20])
+    distance = GeoDistance.vincenty(30.66, 104.07, lat, lng)
+    assert distance.shape == (3,)
+    for i in range(3):
+        assert np.isclose(distance[i], GeoDistance.vincenty(30.66, 104.07, lat[i], lng[i]))
+
+
+def test_distance_to_city_center():
+    X = pd.DataFrame({
+        "latitude": [30.60, np.nan, 30.80], "longitude": [104.00, 104.10, 104.20]
+    })
+    X = DistanceToCityCenter("CD").fit_transform(X)
+    center = CONST_TABLE["CITY_CENTER"]["CD"]
+    # 坐标缺失的房源被丢弃
+    assert X.index.tolist() == [0, 1]
+    assert np.allclose(
+        X["distance"], GeoDistance.vincenty(X["latitude"], X["longitude"], center["LAT"], center["LNG"])
+    )
+
+
+def test_distance_to_references_by_haversine():
+    X = pd.DataFrame({"latitude": [30.60, 30.80], "longitude": [104.00, 104.20]})
+    references = {"distance": (30.66, 104.07), "distanceCBD": (30.57, 104.06)}
+    X = DistanceToCityCenter(method="haversine", references=references).fit_transform(X)
+    for column, (lat, lng) in references.items():
+        assert np.allclose(X[column], GeoDistance.haversine(X["latitude"], X["longitude"], lat, lng))
@@ -0,0 +1,69 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# DropColumns.dominance against the per-column value_counts     #
+# rule it replaced                                              #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.common.fileTool.datasetio import DatasetIO
+from src.modules.datapreparation.pipelinepaper import DropColumns
+
+
+def dominance_by_value_counts(X: pd.DataFrame) -> pd.Series:
+    # 原来逐列调用value_counts的实现
+    return pd.Series(
+        [X[col].value_counts(dropna=False).max() / len(X) for col in X.columns],
+        index=X.columns
+    )
+
+
+def cols_to_drop_by_value_counts(X: pd.DataFrame, threshold: float) -> list[str]:
+    cols_to_drop = []
+    for col in X.columns:
+        values_count = X[col].value_counts(dropna=False)
+        for value in values_count:
+            if value / values_count.sum(skipna=False) >= threshold:
+                cols_to_drop.append(col)
+                break
+    cols_to_drop.append("Id")
+    return cols_to_drop
+
+
+@pytest.fixture(scope="module")
+def train() -> pd.DataFrame:
+    return DatasetIO.loadDataset("house-prices-advanced-regression-techniques/train")
+
+
+def test_dominance_matches_value_counts(train):
+    pd.testing.assert_series_equal(
+        DropColumns.dominance(train), dominance_by_value_counts(train)
+    )
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.9, 0.99])
+def test_cols_to_drop_match_value_counts(train, threshold):
+    drop = DropColumns(is_drop=True, threshold=threshold).fit(train)
+    assert drop.cols_to_drop_ == cols_to_drop_by_value_counts(train, threshold)
+
+
+def test_nan_counts_as_a_value():
+    X = pd.DataFrame({
+        "a": [np.nan, np.nan, np.nan, 1.0],
+        "b": ["x", None, "y", "z"],
+        "c": [1, 1, 2, 2],
+    })
+    pd.testing.assert_series_equal(DropColumns.dominance(X), dominance_by_value_counts(X))
+    assert DropColumns.dominance(X).tolist() == [0.75, 0.25, 0.5]
+
+
+def test_empty_frame():
+    X = pd.DataFrame({"a": pd.Series(dtype=float)})
+    assert DropColumns.dominance(X).tolist() == [0.0]
+    assert DropColumns(is_drop=False).fit(X).cols_to_drop_ == []
@@ -0,0 +1,78 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Exact and fuzzy lookup of the offline gazetteer               #
+# ============================================================= #
+import pandas as pd
+import pytest
+
+from src.common.locTool.gazetteer import Gazetteer
+from src.common.locTool.geobatch import BatchGeocoder
+from src.common.locTool.geocache import GeocodeCache
+
+ENTRIES = pd.DataFrame({
+    "city": ["成都市", "成都市", "成都市", "北京市"],
+    "houseLoc": [
+        "高新区天府大道北段银港水晶城D区", "锦江区东大街紫东楼段太古里公寓",
+        "武侯区人民南路四段棕北小区", "朝阳区建国路万达广场",
+    ],
+    "longitude": [104.06, 104.08, 104.07, 116.47],
+    "latitude": [30.58, 30.65, 30.63, 39.91],
+})
+
+
+def jaccard(a: str, b: str) -> float:
+    a, b = Gazetteer.ngrams(a), Gazetteer.ngrams(b)
+    return len(a & b) / len(a | b)
+
+
+def test_exact_match_after_normalization():
+    gazetteer = Gazetteer(ENTRIES)
+    assert len(gazetteer) == 4
+    assert gazetteer.match("成都市", "高新区天府大道北段 银港水晶城（D区）") == (104.06, 30.58, 1.0)
+
+
+def test_fuzzy_match_above_threshold():
+    query = "高新区天府大道北段银港水晶城D区1栋"
+    similarity = jaccard(query, "高新区天府大道北段银港水晶城D区")
+    gazetteer = Gazetteer(ENTRIES, threshold=0.8)
+    assert similarity >= 0.8
+    assert gazetteer.match("成都市", query) == pytest.approx((104.06, 30.58, similarity))
+
+
+def test_threshold():
+    query = "高新区天府大道北段银港水晶城E区"
+    similarity = jaccard(query, "高新区天府大道北段银港水晶城D区")
+    assert 0 < similarity < 1
+    assert Gazetteer(ENTRIES, threshold=similarity).match("成都市", query) is not None
+    assert Gazetteer(ENTRIES, threshold=similarity + 1e-6).match("成都市", query) is None
+
+
+def test_dissimilar_or_other_city_misses():
+    gazetteer = Gazetteer(ENTRIES)
+    assert gazetteer.match("成都市", "青羊区宽窄巷子") is None
+    assert gazetteer.match("北京市", "高新区天府大道北段银港水晶城D区") is None
+    assert gazetteer.match("上海市", "朝阳区建国路万达广场") is None
+    assert gazetteer.match("成都市", "") is None
+    assert (gazetteer.hits, gazetteer.misses) == (0, 4)
+
+
+def test_empty_gazetteer():
+    gazetteer = Gazetteer(pd.DataFrame(columns=Gazetteer.COLUMNS))
+    assert len(gazetteer) == 0
+    assert gazetteer.match("成都市", "高新区天府大道北段银港水晶城D区") is None
+
+
+def test_geocoder_tries_gazetteer_before_api(baidu, tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode_cache.sqlite"))
+    geocoder = BatchGeocoder("成都市", cache=cache, gazetteer=Gazetteer(ENTRIES))
+    lng, lat = geocoder.geocode_many(["高新区天府大道北段银港水晶城D区1栋", "青羊区宽窄巷子"])
+    # 只有查找表中没有的地址请求接口
+    assert baidu.addresses == ["青羊区宽窄巷子"]
+    assert (lng[0], lat[0]) == (104.06, 30.58)
+    assert "1 gazetteer hits" in geocoder.summary()
+    cache.close()
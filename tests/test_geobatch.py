@@ -0,0 +1,84 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Coalescing of duplicate addresses in BatchGeocoder            #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.common.locTool.coordutils import CoordTransformer
+from src.common.locTool.gazetteer import Gazetteer
+from src.common.locTool.geobatch import BatchGeocoder
+from src.common.locTool.geocache import GeocodeCache
+
+ADDRESSES = [
+    "银港水晶城（D区）", "银港水晶城 (D区)", "银港水晶城(D区)",
+    "太古里公寓", "太古里 公寓", "不存在的小区",
+]
+
+
+@pytest.fixture
+def geocode_cache(tmp_path) -> GeocodeCache:
+    cache = GeocodeCache(str(tmp_path / "geocode_cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def empty_gazetteer() -> Gazetteer:
+    return Gazetteer(pd.DataFrame(columns=Gazetteer.COLUMNS))
+
+
+def make_geocoder(geocode_cache, empty_gazetteer, concurrency=4) -> BatchGeocoder:
+    return BatchGeocoder(
+        "成都市", concurrency=concurrency, cache=geocode_cache, gazetteer=empty_gazetteer
+    )
+
+
+def test_one_request_per_key(baidu, geocode_cache, empty_gazetteer):
+    geocoder = make_geocoder(geocode_cache, empty_gazetteer)
+    lng, lat = geocoder.geocode_many(ADDRESSES)
+    assert len(baidu.addresses) == 3
+    expected = CoordTransformer(104.07, 30.66)
+    assert np.allclose(lng[:5], expected.res_lng)
+    assert np.allclose(lat[:5], expected.res_lat)
+    assert np.isnan(lng[5]) and np.isnan(lat[5])
+    assert "6 addresses, 3 unique keys" in geocoder.summary()
+    assert "3 API calls" in geocoder.summary()
+    assert "3 duplicate API calls saved" in geocoder.summary()
+
+
+def test_results_kept_between_calls(baidu, geocode_cache, empty_gazetteer):
+    geocoder = make_geocoder(geocode_cache, empty_gazetteer)
+    geocoder.geocode_many(ADDRESSES[:3])
+    geocoder.geocode("银港水晶城D区")
+    assert len(baidu.addresses) == 1
+    assert "4 addresses, 1 unique keys" in geocoder.summary()
+    assert "3 duplicate API calls saved" in geocoder.summary()
+
+
+def test_concurrent_duplicates_share_request(baidu, geocode_cache, empty_gazetteer):
+    # 同一个键正在请求时，其他线程等待并共享结果
+    geocoder = make_geocoder(geocode_cache, empty_gazetteer)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(geocoder.geocode, ["银港水晶城（D区）"] * 16))
+    assert len(baidu.addresses) == 1
+    assert len(set(results)) == 1
+
+
+def test_cache_hits_are_not_api_calls(baidu, geocode_cache, empty_gazetteer):
+    make_geocoder(geocode_cache, empty_gazetteer).geocode_many(ADDRESSES)
+    geocoder = make_geocoder(geocode_cache, empty_gazetteer)
+    geocoder.geocode_many(ADDRESSES)
+    # 第二次只有解析失败的地址再次请求
+    assert len(baidu.addresses) == 4
+    summary = geocoder.summary()
+    assert "2 cache hits" in summary
+    assert "1 API calls" in summary
+    assert "0 duplicate API calls saved" in summary
@@ -0,0 +1,93 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# The persistent geocoding cache and its SQLite base class      #
+# ============================================================= #
+import time
+import pytest
+
+from src.common.fileTool.filesio import FilesIO
+from src.common.fileTool.sqlitecache import SQLiteCache
+from src.common.locTool.geocache import GeocodeCache
+from src.common.locTool.poicache import POICache
+from src.common.locTool.lnglat import GetLongitudeLatitude
+
+
+@pytest.fixture
+def cache(tmp_path) -> GeocodeCache:
+    cache = GeocodeCache(str(tmp_path / "geocode_cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_normalize():
+    assert GeocodeCache.normalize("银港水晶城（D区）") == GeocodeCache.normalize("银港水晶城 (D区)")
+    assert GeocodeCache.normalize("ＡＢＣ１２３") == "ABC123"
+    assert GeocodeCache.normalize(None) == ""
+
+
+def test_normalized_key(cache):
+    cache.put("成都市", "银港水晶城（D区）", 104.1, 30.6, 104.09, 30.59)
+    assert cache.get("成都市", "银港水晶城 (D区)") == {
+        "bd_lng": 104.1, "bd_lat": 30.6, "lng": 104.09, "lat": 30.59
+    }
+    assert cache.get("北京市", "银港水晶城（D区）") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.summary() == "1 hits, 1 misses (hit rate 50.0%)"
+
+
+def test_persistent(tmp_path):
+    path = str(tmp_path / "geocode.sqlite")
+    cache = GeocodeCache(path)
+    cache.put("成都市", "太古里", 104.1, 30.6, 104.09, 30.59)
+    cache.close()
+    cache = GeocodeCache(path)
+    assert cache.get("成都市", "太古里") is not None
+    cache.close()
+
+
+def test_ttl_and_evict(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode.sqlite"), ttl=60)
+    cache.put("成都市", "旧地址", 104.1, 30.6, 104.09, 30.59)
+    cache.put("成都市", "新地址", 104.1, 30.6, 104.09, 30.59)
+    with cache._lock:
+        cache._conn.execute(
+            "UPDATE geocode SET created_at = ? WHERE address = ?", (time.time() - 120, "旧地址")
+        )
+        cache._conn.commit()
+    assert cache.get("成都市", "旧地址") is None
+    assert cache.get("成都市", "新地址") is not None
+    assert cache.evict() == 1
+    assert GeocodeCache(str(tmp_path / "forever.sqlite"), ttl=None).evict() == 0
+    cache.close()
+
+
+def test_get_default_per_subclass(monkeypatch, tmp_path):
+    monkeypatch.setattr(FilesIO, "getDataset", staticmethod(lambda filename=None: str(tmp_path)))
+    monkeypatch.setattr(GeocodeCache, "_default", None)
+    monkeypatch.setattr(POICache, "_default", None)
+    geocode_cache, poi_cache = GeocodeCache.getDefault(), POICache.getDefault()
+    assert type(geocode_cache) is GeocodeCache
+    assert type(poi_cache) is POICache
+    assert GeocodeCache.getDefault() is geocode_cache
+    assert POICache.getDefault() is poi_cache
+    assert "_default" not in SQLiteCache.__dict__
+    assert geocode_cache.path == str(tmp_path / GeocodeCache.FILE_NAME)
+    geocode_cache.close()
+    poi_cache.close()
+
+
+def test_lookup_reads_and_writes_cache(baidu, cache):
+    first = GetLongitudeLatitude("成都市", "太古里", cache=cache, is_gazetteer=False)
+    second = GetLongitudeLatitude("成都市", "太古里 ", cache=cache, is_gazetteer=False)
+    assert len(baidu.addresses) == 1
+    assert (first.source, second.source) == ("api", "cache")
+    assert (second.longtitude, second.latitude) == (first.longtitude, first.latitude)
+    assert (second.bd_longitude, second.bd_latitude) == (104.07, 30.66)
+
+    GetLongitudeLatitude("成都市", "太古里", cache=cache, is_cache=False, is_gazetteer=False)
+    assert len(baidu.addresses) == 2
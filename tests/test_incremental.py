@@ -0,0 +1,86 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Incremental re-runs of HousingDataParser: cached pages and    #
+# listings, and merging into the existing dataset               #
+# ============================================================= #
+import pandas as pd
+
+from src.common.fileTool.datasetio import DatasetIO
+from src.common.fileTool.parsecache import PageParseCache
+from src.common.locTool.enrichcache import EnrichmentCache
+from src.common.infoTool.const import CONST_TABLE
+from src.modules.datapreparation.dataparser import HousingDataParser
+
+PAGE_NUM = 6
+NAME = "row_data/CD_housing_data"
+
+
+def fill_store(server, store, changed: dict[int, int]=None) -> None:
+
+    """
+    存入前PAGE_NUM页，changed: 页码->替换为stub服务器的第几页
+    """
+
+    changed = changed or {}
+    for page in range(1, PAGE_NUM + 1):
+        store.put("CD", page, server.build_page(changed.get(page, page)))
+
+
+def test_rerun_hits_caches(server, workspace, baidu):
+    fill_store(server, workspace)
+    first = HousingDataParser(city="CD").df
+    listings = PAGE_NUM * server.listings_per_page
+    assert len(first) == listings
+    assert len(baidu.addresses) == listings
+    assert len(baidu.requests) == listings * (1 + len(CONST_TABLE["POI"]))
+
+    # 内容没有变化，全部页面读取解析缓存，全部房源读取补充信息缓存，不发送请求
+    baidu.requests.clear()
+    second = HousingDataParser(city="CD").df
+    parse_cache, enrich_cache = PageParseCache.getDefault(), EnrichmentCache.getDefault()
+    assert (parse_cache.hits, parse_cache.misses) == (PAGE_NUM, 0)
+    assert (enrich_cache.hits, enrich_cache.misses) == (listings, 0)
+    assert baidu.requests == []
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_changed_page_only(server, workspace, baidu):
+    fill_store(server, workspace)
+    first = HousingDataParser(city="CD").df
+
+    # 第2页换成新的房源
+    fill_store(server, workspace, {2: 100})
+    baidu.requests.clear()
+    second = HousingDataParser(city="CD").df
+    parse_cache, enrich_cache = PageParseCache.getDefault(), EnrichmentCache.getDefault()
+    new = server.listings_per_page
+    assert (parse_cache.hits, parse_cache.misses) == (PAGE_NUM - 1, 1)
+    assert enrich_cache.misses == new
+    assert len(baidu.addresses) == new
+    assert len(baidu.requests) == new * (1 + len(CONST_TABLE["POI"]))
+
+    # 第2页原来的房源保留在已有数据集中，排在本次解析的房源之后，ID重新编号
+    removed = first[first["houseLoc"].str.contains("第2页")]
+    assert len(second) == len(first) + new
+    assert second["ID"].tolist() == list(range(1, len(second) + 1))
+    assert second["houseLoc"].tolist()[-new:] == removed["houseLoc"].tolist()
+    pd.testing.assert_frame_equal(
+        second.tail(new).drop(columns="ID").reset_index(drop=True),
+        removed.drop(columns="ID").reset_index(drop=True), check_categorical=False
+    )
+    pd.testing.assert_frame_equal(DatasetIO.loadDataset(NAME), second, check_categorical=False)
+
+
+def test_not_incremental_replaces_dataset(server, workspace, baidu):
+    fill_store(server, workspace)
+    HousingDataParser(city="CD")
+    fill_store(server, workspace, {2: 100})
+    df = HousingDataParser(city="CD", is_incremental=False).df
+    assert len(df) == PAGE_NUM * server.listings_per_page
+    assert not df["houseLoc"].str.contains("第2页").any()
+    assert len(DatasetIO.loadDataset(NAME)) == len(df)
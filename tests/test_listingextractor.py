@@ -0,0 +1,74 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Single-pass extraction against the whole-page xpath parser    #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+from src.modules.datapreparation.dataparser import HousingDataParser
+from src.modules.datapreparation.listingextractor import ListingExtractor
+from src.modules.datapreparation.recordbuilder import ColumnarRecordBuilder
+
+
+def parse_by_xpath(tree) -> pd.DataFrame:
+
+    """
+    只调用HousingDataParser._parse_page_by_xpath，不运行整个解析流程
+    """
+
+    parser = HousingDataParser.__new__(HousingDataParser)
+    parser.builder = ColumnarRecordBuilder(ListingExtractor.SCHEMA)
+    parser._parse_page_by_xpath(tree)
+    return parser.builder.build()
+
+
+def parse_single_pass(tree) -> pd.DataFrame:
+    builder = ColumnarRecordBuilder(ListingExtractor.SCHEMA)
+    builder.extend(ListingExtractor.extract(tree))
+    return builder.build()
+
+
+def test_matches_xpath_parser(server):
+    for page in (1, 2, 7):
+        tree = etree.HTML(server.build_page(page))
+        expected = parse_by_xpath(tree)
+        assert len(expected) == server.listings_per_page
+        pd.testing.assert_frame_equal(parse_single_pass(tree), expected)
+
+
+def test_one_record_per_listing():
+    tree = etree.HTML(
+        '<html><body><section>' + "".join(
+            '<div class="property"><a><div class="property-content"></div></a></div>'
+            for _ in range(3)
+        ) + '</section></body></html>'
+    )
+    records = ListingExtractor.extract(tree)
+    assert len(records) == 3
+    assert records[0]["houseLoc"] == ""
+    assert np.isnan(records[0]["unitPrice"])
+    assert records[0]["houseSubway"] == 0
+
+
+def test_missing_field_does_not_shift_columns(server):
+    # 去掉第一个房源的建造年份，只有该房源的房龄缺失，其余房源不受影响
+    text = server.build_page(1)
+    start = text.index("年建造</p>")
+    start = text.rindex("<p>", 0, start)
+    text = text[:start] + text[text.index("</p>", start) + 4:]
+    tree = etree.HTML(text)
+    expected = parse_single_pass(etree.HTML(server.build_page(1)))
+    df = parse_single_pass(tree)
+    assert pd.isna(df.loc[0, "houseAge"])
+    pd.testing.assert_series_equal(df["houseAge"][1:], expected["houseAge"][1:])
+    pd.testing.assert_frame_equal(df.drop(columns="houseAge"), expected.drop(columns="houseAge"))
+
+
+def test_extract_text():
+    assert ListingExtractor.extract_text("<html></html>") == []
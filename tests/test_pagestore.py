@@ -0,0 +1,81 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Deduplication, legacy fallback and concurrent writers of the  #
+# compressed page store                                         #
+# ============================================================= #
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from src.common.fileTool.pagestore import PageStore
+
+
+def put_pages(root_path: str, pages: range) -> None:
+    store = PageStore(root_path)
+    for page in pages:
+        store.put("CD", page, "<html>%d</html>" % page)
+
+
+def test_put_get_and_dedup(tmp_path):
+    store = PageStore(str(tmp_path))
+    first = store.put("CD", 1, "<html>一</html>")
+    second = store.put("CD", 2, "<html>一</html>")
+    assert first == second
+    assert store.get("CD", 1) == store.get("CD", 2) == "<html>一</html>"
+    assert store.index("CD") == {1: first, 2: first}
+    assert len(os.listdir(os.path.dirname(store.object_path(first)))) == 1
+    assert store.get("CD", 3) is None
+    assert not store.has("CD", 3)
+
+
+def test_index_shared_between_instances(tmp_path):
+    # 另一个实例写入后，已经读取过索引的实例能看到新的页面
+    reader, writer = PageStore(str(tmp_path)), PageStore(str(tmp_path))
+    assert not reader.has("CD", 1)
+    writer.put("CD", 1, "<html>1</html>")
+    assert reader.has("CD", 1)
+    assert reader.get("CD", 1) == "<html>1</html>"
+
+
+def test_legacy_fallback_and_migrate(tmp_path):
+    store = PageStore(str(tmp_path))
+    os.makedirs(os.path.join(str(tmp_path), "CD_htmls"))
+    with open(store.legacy_path("CD", 1), "w", encoding="utf-8") as f:
+        f.write("<html>旧</html>")
+    assert store.get("CD", 1) == "<html>旧</html>"
+    assert store.migrate("CD", is_remove=True) == 1
+    assert not os.path.exists(store.legacy_path("CD", 1))
+    assert store.get("CD", 1) == "<html>旧</html>"
+
+
+def test_concurrent_instances_keep_every_page(tmp_path):
+    # 每个线程使用各自的实例写入不同的页面，索引中不应丢失任何页面
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(
+            put_pages, [str(tmp_path)] * 4, [range(i, 200, 4) for i in range(4)]
+        ))
+    assert sorted(PageStore(str(tmp_path)).index("CD")) == list(range(200))
+
+
+def test_concurrent_processes_keep_every_page(tmp_path):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        list(executor.map(
+            put_pages, [str(tmp_path)] * 2, [range(0, 60, 2), range(1, 60, 2)]
+        ))
+    store = PageStore(str(tmp_path))
+    assert sorted(store.index("CD")) == list(range(60))
+    assert not os.path.exists(store._index_path("CD") + ".lock")
+
+
+def test_stale_lock_is_ignored(tmp_path):
+    store = PageStore(str(tmp_path))
+    store.put("CD", 1, "<html>1</html>")
+    lock_path = store._index_path("CD") + ".lock"
+    open(lock_path, "w").close()
+    os.utime(lock_path, (0, 0))
+    store.put("CD", 2, "<html>2</html>")
+    assert sorted(store.index("CD")) == [1, 2]
@@ -0,0 +1,89 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Parsing pages in a process pool against the serial parse      #
+# ============================================================= #
+import pandas as pd
+
+from src.common.fileTool.pagestore import PageStore
+from src.modules.datapreparation.dataparser import HousingDataParser
+from src.modules.datapreparation.listingextractor import ListingExtractor
+from src.modules.datapreparation.recordbuilder import ColumnarRecordBuilder
+
+PAGE_NUM = 12
+
+
+def fill_store(server, root_path: str, cities: list[str]) -> PageStore:
+    store = PageStore(root_path)
+    for k, city in enumerate(cities):
+        for page in range(1, PAGE_NUM + 1):
+            # 第5页缺失
+            if page != 5:
+                store.put(city, page, server.build_page(page + 100 * k))
+    return store
+
+
+def parse(store: PageStore, workers: int) -> pd.DataFrame:
+
+    """
+    只运行HousingDataParser的页面提取阶段
+    """
+
+    parser = HousingDataParser.__new__(HousingDataParser)
+    parser.city = "CD"
+    parser.store = store
+    parser.is_single_pass = True
+    parser.workers = workers
+    parser.parse_cache = None
+    parser.builder = ColumnarRecordBuilder(ListingExtractor.SCHEMA)
+    parser._parse_data()
+    return parser.df
+
+
+def frame(records: list[dict]) -> pd.DataFrame:
+
+    """
+    子进程返回的NaN不是同一个对象，记录转换为DataFrame后再比较
+    """
+
+    builder = ColumnarRecordBuilder(ListingExtractor.SCHEMA)
+    builder.extend(records)
+    return builder.build()
+
+
+def test_workers_match_serial(server, tmp_path):
+    store = fill_store(server, str(tmp_path), ["CD"])
+    serial = parse(store, None)
+    assert len(serial) == (PAGE_NUM - 1) * server.listings_per_page
+    pd.testing.assert_frame_equal(parse(store, 2), serial)
+
+
+def test_extract_pages_keeps_order(server, tmp_path):
+    store = fill_store(server, str(tmp_path), ["CD", "BJ"])
+    jobs = [(city, page) for city in ("CD", "BJ") for page in range(1, PAGE_NUM + 1)]
+    results = list(ListingExtractor.extract_pages(jobs, workers=2, root_path=store.root_path))
+    assert len(results) == len(jobs)
+    for (city, page), records in zip(jobs, results):
+        text = store.get(city, page)
+        if text is None:
+            assert records is None
+        else:
+            pd.testing.assert_frame_equal(frame(records), frame(ListingExtractor.extract_text(text)))
+
+
+def test_extract_cities(server, tmp_path):
+    store = fill_store(server, str(tmp_path), ["CD", "BJ"])
+    records = ListingExtractor.extract_cities(
+        ["CD", "BJ"], workers=2, root_path=store.root_path, page_num=PAGE_NUM
+    )
+    for city in ("CD", "BJ"):
+        expected = []
+        for page in range(1, PAGE_NUM + 1):
+            text = store.get(city, page)
+            if text is not None:
+                expected.extend(ListingExtractor.extract_text(text))
+        pd.testing.assert_frame_equal(frame(records[city]), frame(expected))
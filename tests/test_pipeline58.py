@@ -0,0 +1,68 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# The fit/transform split of PipeLineFor58HousingData           #
+# ============================================================= #
+import pickle
+import pandas as pd
+import pytest
+
+from src.common.fileTool.datasetio import DatasetIO
+from src.modules.datapreparation.pipeline58 import PipeLineFor58HousingData
+
+
+@pytest.fixture(scope="module")
+def dataset() -> pd.DataFrame:
+    return DatasetIO.loadDataset("row_data/CD_housing_data")
+
+
+@pytest.fixture(scope="module")
+def fitted(dataset) -> tuple[PipeLineFor58HousingData, pd.DataFrame]:
+    pipeline = PipeLineFor58HousingData("CD")
+    return pipeline, pipeline.fit_transform(dataset)
+
+
+def test_transform_before_fit(dataset):
+    with pytest.raises(ValueError):
+        PipeLineFor58HousingData("CD").transform(dataset)
+
+
+def test_fit_transform_equals_fit_then_transform(dataset, fitted):
+    _, X_df = fitted
+    pd.testing.assert_frame_equal(
+        PipeLineFor58HousingData("CD").fit(dataset).transform(dataset), X_df
+    )
+
+
+def test_transform_does_not_refit(dataset, fitted):
+    pipeline, X_df = fitted
+    preprocessor = pipeline.preprocessor_
+    state = pickle.dumps(preprocessor)
+    dummy_columns = list(pipeline.dummy_columns_)
+
+    # 与训练数据分布不同的少量新房源
+    new_data = dataset.sort_values("unitPrice").head(20)
+    new_df = pipeline.transform(new_data)
+
+    assert pipeline.preprocessor_ is preprocessor
+    assert pickle.dumps(pipeline.preprocessor_) == state
+    assert pipeline.dummy_columns_ == dummy_columns
+    assert new_df.columns.tolist() == X_df.columns.tolist()
+    # 新房源的结果与其在全部数据中处理的结果一致
+    pd.testing.assert_frame_equal(
+        new_df, X_df.iloc[dataset.index.get_indexer(new_data.index)].reset_index(drop=True)
+    )
+
+
+def test_unseen_categories(dataset, fitted):
+    pipeline, X_df = fitted
+    new_data = dataset.head(5).copy()
+    new_data["houseOrientation"] = "未知朝向"
+    new_df = pipeline.transform(new_data)
+    assert new_df.columns.tolist() == X_df.columns.tolist()
+    orientation = [column for column in new_df.columns if column.startswith("houseOrientation_")]
+    assert not new_df[orientation].to_numpy().any()
@@ -0,0 +1,60 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# The paper pipeline fitted on train.csv and applied to         #
+# test.csv                                                      #
+# ============================================================= #
+import pandas as pd
+import pytest
+
+from src.common.fileTool.datasetio import DatasetIO
+from src.modules.datapreparation.pipelinepaper import PipeLineForPaperHousingData
+
+
+@pytest.fixture(scope="module")
+def train() -> pd.DataFrame:
+    return DatasetIO.loadDataset("house-prices-advanced-regression-techniques/train")
+
+
+@pytest.fixture(scope="module")
+def test() -> pd.DataFrame:
+    return DatasetIO.loadDataset("house-prices-advanced-regression-techniques/test")
+
+
+@pytest.fixture(scope="module")
+def fitted(train) -> tuple[PipeLineForPaperHousingData, pd.DataFrame]:
+    pipeline = PipeLineForPaperHousingData()
+    return pipeline, pipeline.fit_transform(train)
+
+
+def test_transform_before_fit(train):
+    with pytest.raises(ValueError):
+        PipeLineForPaperHousingData().transform(train)
+
+
+def test_fit_transform_equals_fit_then_transform(train, fitted):
+    _, X_df = fitted
+    pd.testing.assert_frame_equal(PipeLineForPaperHousingData().fit(train).transform(train), X_df)
+
+
+def test_integer_columns_are_numeric(fitted):
+    pipeline, _ = fitted
+    assert pipeline.target_ == "SalePrice"
+    for column in ("LotArea", "YearBuilt", "BsmtFinSF1", "GarageCars"):
+        assert column in pipeline.num_attribs_
+    assert "MSZoning" in pipeline.cat_attribs_
+
+
+def test_transform_test_csv(test, fitted):
+    pipeline, X_df = fitted
+    X_kaggle = pipeline.transform(test)
+    # test.csv没有目标值，只输出特征
+    assert X_kaggle.columns.tolist() == X_df.columns.drop("SalePrice").tolist()
+    assert len(X_kaggle) == len(test)
+    assert not X_kaggle.isna().any().any()
+    # 整数列不再作为分类变量编码，test.csv中未见过的取值很少
+    assert (X_kaggle[pipeline.cat_attribs_] == -1).sum().sum() <= 10
@@ -0,0 +1,87 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# The geohash-keyed POI cache and its reuse across radii        #
+# ============================================================= #
+import time
+import numpy as np
+import pytest
+
+from src.common.locTool.poicache import POICache
+
+
+@pytest.fixture
+def cache(tmp_path) -> POICache:
+    cache = POICache(str(tmp_path / "poi_cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def center() -> tuple[float, float]:
+    return POICache.cell_center(POICache.geohash(30.66, 104.07))
+
+
+def test_geohash_reference():
+    # 维基百科中的例子
+    assert POICache.geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert POICache.geohash(57.64911, 10.40744, 5) == "u4pru"
+
+
+def test_cell_center_inverts_geohash():
+    rng = np.random.default_rng(0)
+    for lat, lng in zip(rng.uniform(-90, 90, 100), rng.uniform(-180, 180, 100)):
+        code = POICache.geohash(lat, lng, 7)
+        center_lat, center_lng = POICache.cell_center(code)
+        assert POICache.geohash(center_lat, center_lng, 7) == code
+        # 精度为7的格子约为0.0014 x 0.0014度
+        assert abs(center_lat - lat) <= 180 / 2 ** 17
+        assert abs(center_lng - lng) <= 360 / 2 ** 18
+
+
+def test_shares_cell(cache):
+    lat, lng = center()
+    cache.put("公交", lat, lng, 1000, 7)
+    assert cache.get("公交", lat + 1e-5, lng - 1e-5, 1000) == 7
+    assert cache.get("地铁", lat, lng, 1000) is None
+    assert cache.get("公交", np.nan, lng, 1000) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_reuse_across_radii(cache):
+    lat, lng = center()
+    cache.put("公交", lat, lng, 1000, 7)
+    cache.put("地铁", lat, lng, 1000, 0)
+    cache.put("学校", lat, lng, 500, POICache.API_PAGE_SIZE)
+    # 1000m内有7个无法确定500m或2000m内的数量
+    assert cache.get("公交", lat, lng, 500) is None
+    assert cache.get("公交", lat, lng, 2000) is None
+    # 1000m内没有，500m内也没有
+    assert cache.get("地铁", lat, lng, 500) == 0
+    assert cache.get("地铁", lat, lng, 2000) is None
+    # 500m内已达到上限，1000m内也达到上限
+    assert cache.get("学校", lat, lng, 1000) == POICache.API_PAGE_SIZE
+    assert cache.get("学校", lat, lng, 200) is None
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_exact_radius_preferred(cache):
+    lat, lng = center()
+    cache.put("公园", lat, lng, 2000, 0)
+    cache.put("公园", lat, lng, 500, 3)
+    assert cache.get("公园", lat, lng, 500) == 3
+
+
+def test_expired_record_not_reused(tmp_path):
+    cache = POICache(str(tmp_path / "poi_cache.sqlite"), ttl=60)
+    lat, lng = center()
+    cache.put("地铁", lat, lng, 1000, 0)
+    with cache._lock:
+        cache._conn.execute("UPDATE poi SET created_at = ?", (time.time() - 120,))
+        cache._conn.commit()
+    assert cache.get("地铁", lat, lng, 500) is None
+    assert cache.get("地铁", lat, lng, 1000) is None
+    cache.close()
@@ -0,0 +1,71 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# The bounded pool of POI search jobs in HousingDataParser      #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+
+from src.common.infoTool.const import CONST_TABLE
+from src.modules.datapreparation.dataparser import HousingDataParser
+
+LAT = [30.6601, 30.6602, 30.7000, np.nan, 30.6000]
+LNG = [104.0701, 104.0702, 104.1000, np.nan, 104.0000]
+
+
+def make_parser(poi_concurrency: int) -> HousingDataParser:
+
+    """
+    只运行HousingDataParser的周边设施检索阶段
+    """
+
+    parser = HousingDataParser.__new__(HousingDataParser)
+    parser.city = "CD"
+    parser.poi_concurrency = poi_concurrency
+    parser.is_poi_cache = False
+    parser.df = pd.DataFrame({
+        "houseLoc": ["地址%d" % i for i in range(len(LAT))], "longitude": LNG, "latitude": LAT
+    })
+    parser.enrichment = {
+        column: np.full(len(LAT), np.nan) for column in CONST_TABLE["POI"]
+    }
+    return parser
+
+
+def test_one_job_per_listing_and_category(baidu):
+    baidu.poi_counts = {"学校": 1, "地铁": 2, "公园": 0, "购物": 4, "公交": 10}
+    parser = make_parser(poi_concurrency=4)
+    parser._parse_poi_online(np.array([0, 1, 2, 4]))
+
+    # 同一个格子内的房源也各自以自身的坐标检索
+    locations = {params["location"] for params in baidu.requests}
+    assert len(baidu.requests) == 4 * len(CONST_TABLE["POI"])
+    assert len(locations) == 4
+    assert "%s,%s" % (LAT[0], LNG[0]) in locations
+
+    # 结果按CONST_TABLE["POI"]的顺序添加，没有检索的行保持缺失
+    assert parser.df.columns.tolist()[-5:] == list(CONST_TABLE["POI"])
+    for column, category in CONST_TABLE["POI"].items():
+        assert str(parser.df[column].dtype) == "Int64"
+        assert parser.df[column].tolist()[:3] == [baidu.poi_counts[category]] * 3
+        assert parser.df[column].isna().tolist() == [False, False, False, True, False]
+
+
+def test_in_flight_limit(baidu):
+    parser = make_parser(poi_concurrency=3)
+    parser._parse_poi_online(np.array([0, 1, 2, 4]))
+    assert len(baidu.requests) == 20
+    assert baidu.peak == 3
+
+
+def test_cached_rows_are_not_searched(baidu):
+    parser = make_parser(poi_concurrency=4)
+    for column in CONST_TABLE["POI"]:
+        parser.enrichment[column][:] = 7
+    parser._parse_poi_online(np.array([2]))
+    assert len(baidu.requests) == len(CONST_TABLE["POI"])
+    assert parser.df["busAround"].tolist() == [7, 7, 3, 7, 7]
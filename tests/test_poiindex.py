@@ -0,0 +1,62 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# KD-tree POI counts against a brute-force haversine count      #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+
+from src.common.locTool.poiindex import EARTH_RADIUS, POIIndex
+
+rng = np.random.default_rng(0)
+POI = pd.DataFrame({
+    "category": rng.choice(["公交", "地铁", "学校"], 3000),
+    "lat": rng.uniform(30.55, 30.75, 3000),
+    "lng": rng.uniform(103.95, 104.20, 3000),
+})
+LAT = np.append(rng.uniform(30.55, 30.75, 200), np.nan)
+LNG = np.append(rng.uniform(103.95, 104.20, 200), 104.0)
+
+
+def brute_force(category: str, radius: float) -> np.ndarray:
+    poi = POI[POI["category"] == category]
+    lat1, lng1 = np.radians(LAT[:, None]), np.radians(LNG[:, None])
+    lat2, lng2 = np.radians(poi["lat"].to_numpy()), np.radians(poi["lng"].to_numpy())
+    a = np.sin((lat2 - lat1) / 2) ** 2 + \
+        np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    distance = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(a))
+    counts = (distance <= radius).sum(axis=1).astype(float)
+    counts[np.isnan(LAT)] = np.nan
+    return counts
+
+
+def test_matches_brute_force():
+    index = POIIndex(POI)
+    for category in ("公交", "地铁", "学校"):
+        for radius in (300, 1000, 2500):
+            np.testing.assert_array_equal(
+                index.count(category, LAT, LNG, radius), brute_force(category, radius)
+            )
+
+
+def test_max_count_and_unknown_category():
+    index = POIIndex(POI)
+    counts = index.count("公交", LAT, LNG, 2500, max_count=POIIndex.API_PAGE_SIZE)
+    np.testing.assert_array_equal(
+        counts, np.minimum(brute_force("公交", 2500), POIIndex.API_PAGE_SIZE)
+    )
+    counts = index.count("医院", LAT, LNG)
+    assert np.all(counts[:-1] == 0) and np.isnan(counts[-1])
+
+
+def test_count_all_and_load(tmp_path):
+    path = str(tmp_path / "CD_poi.csv")
+    POI.to_csv(path, index=False)
+    index = POIIndex.load(path=path)
+    counts = index.count_all({"busAround": "公交", "subwayAround": "地铁"}, LAT, LNG)
+    assert list(counts) == ["busAround", "subwayAround"]
+    np.testing.assert_array_equal(counts["subwayAround"], brute_force("地铁", 1000))
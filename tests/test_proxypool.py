@@ -0,0 +1,85 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Health scoring, eviction and cooldown of the proxy pool       #
+# ============================================================= #
+import random
+from collections import Counter
+import pytest
+
+from src.common.infoTool.proxypool import ProxyPool
+
+PROXIES = ["10.0.0.1:8080", "10.0.0.2:8080", "10.0.0.3:8080"]
+
+
+@pytest.fixture(autouse=True)
+def seed() -> None:
+    random.seed(0)
+
+
+def test_rolling_latency_and_success_rate():
+    pool = ProxyPool(PROXIES, alpha=0.5)
+    pool.report(PROXIES[0], True, 1.0)
+    pool.report(PROXIES[0], True, 3.0)
+    pool.report(PROXIES[0], False)
+    health = pool.stats()[PROXIES[0]]
+    assert health["latency"] == pytest.approx(2.0)
+    assert health["success_rate"] == pytest.approx(0.5)
+    assert health["failures"] == 1
+    assert health["requests"] == 3
+
+
+def test_fast_reliable_proxy_is_preferred():
+    pool = ProxyPool(PROXIES)
+    for _ in range(5):
+        pool.report(PROXIES[0], True, 0.1)
+        pool.report(PROXIES[1], True, 1.0)
+        pool.report(PROXIES[2], True, 1.0)
+    pool.report(PROXIES[2], False)
+    counts = Counter(pool.acquire() for _ in range(3000))
+    assert counts[PROXIES[0]] > counts[PROXIES[1]] > counts[PROXIES[2]] > 0
+    # 权重与 成功率/延迟 成正比，约为10倍
+    assert counts[PROXIES[0]] / counts[PROXIES[1]] == pytest.approx(10, rel=0.3)
+
+
+def test_new_proxy_uses_median_latency():
+    pool = ProxyPool(PROXIES[:2])
+    pool.report(PROXIES[0], True, 0.5)
+    counts = Counter(pool.acquire() for _ in range(2000))
+    assert counts[PROXIES[1]] == pytest.approx(1000, rel=0.15)
+
+
+def test_consecutive_failures_evict():
+    pool = ProxyPool(PROXIES, max_failures=3, cooldown=60)
+    for _ in range(3):
+        pool.report(PROXIES[0], False)
+    health = pool.stats()[PROXIES[0]]
+    assert health["disabled_until"] > 0
+    assert health["success_rate"] == 0.5
+    assert PROXIES[0] not in {pool.acquire() for _ in range(500)}
+
+
+def test_low_success_rate_evicts():
+    pool = ProxyPool(PROXIES, alpha=0.9, max_failures=10, min_success_rate=0.2)
+    pool.report(PROXIES[0], False)
+    assert pool.stats()[PROXIES[0]]["disabled_until"] > 0
+
+
+def test_all_in_cooldown_returns_earliest():
+    pool = ProxyPool(PROXIES[:2], max_failures=1, cooldown=60)
+    pool.report(PROXIES[0], False)
+    pool.report(PROXIES[1], False)
+    pool.health[PROXIES[1]]["disabled_until"] -= 30
+    assert pool.acquire() == PROXIES[1]
+
+
+def test_back_in_rotation_after_cooldown():
+    pool = ProxyPool(PROXIES[:2], max_failures=1, cooldown=60)
+    pool.report(PROXIES[0], False)
+    assert {pool.acquire() for _ in range(200)} == {PROXIES[1]}
+    pool.health[PROXIES[0]]["disabled_until"] = 0.0
+    assert {pool.acquire() for _ in range(200)} == set(PROXIES[:2])
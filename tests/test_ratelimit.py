@@ -0,0 +1,88 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Token bucket, backoff and retries of the rate limiter         #
+# ============================================================= #
+import asyncio
+import pytest
+
+from src.common.netTool.ratelimit import BackoffPolicy, RateLimiter, TokenBucket
+
+URL = "https://cd.58.com/ershoufang/"
+
+
+class Flaky:
+
+    """
+    前failures次调用返回None(失败)，之后返回"ok"
+    """
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+
+    def __call__(self) -> str:
+        self.calls += 1
+        return None if self.calls <= self.failures else "ok"
+
+
+def make_limiter(max_retry=None) -> RateLimiter:
+    return RateLimiter(
+        rate=1000, capacity=10, max_retry=max_retry, backoff=BackoffPolicy(base=0.001)
+    )
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # 桶已空，第三个令牌需要等待约1/rate秒，第四个约2/rate秒
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_penalize_and_reward():
+    bucket = TokenBucket(rate=8)
+    for _ in range(10):
+        bucket.penalize()
+    assert bucket.rate == bucket.min_rate == 1
+    for _ in range(20):
+        bucket.reward()
+    assert bucket.rate == 8
+
+
+def test_backoff_delay_bounds():
+    backoff = BackoffPolicy(base=1.0, factor=2.0, max_delay=5.0)
+    for retry, limit in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)]:
+        assert all(0 <= backoff.delay(retry) <= limit for _ in range(100))
+
+
+def test_call_retries_until_success():
+    limiter, func = make_limiter(), Flaky(2)
+    assert limiter.call(URL, func) == "ok"
+    assert func.calls == 3
+    assert (limiter.stats.attempts, limiter.stats.retries, limiter.stats.successes) == (3, 2, 1)
+
+
+def test_call_gives_up_after_max_retry():
+    limiter, func = make_limiter(max_retry=1), Flaky(5)
+    assert limiter.call(URL, func) is None
+    assert func.calls == 2
+    assert limiter.stats.failures == 1
+
+
+def test_call_async():
+    limiter, func = make_limiter(), Flaky(1)
+    assert asyncio.run(limiter.call_async(URL, func)) == "ok"
+    assert func.calls == 2
+
+
+def test_bucket_per_host():
+    limiter = make_limiter()
+    assert limiter.bucket("https://cd.58.com/a") is limiter.bucket("https://cd.58.com/b")
+    assert limiter.bucket("https://cd.58.com/a") is not limiter.bucket("https://bj.58.com/a")
@@ -0,0 +1,89 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Dtypes and missing values of ColumnarRecordBuilder            #
+# ============================================================= #
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modules.datapreparation.recordbuilder import ColumnarRecordBuilder
+from src.modules.datapreparation.listingextractor import ListingExtractor
+
+SCHEMA = {
+    "houseLoc": "str", "unitPrice": "float64", "houseArea": "float32",
+    "houseSubway": "int8", "houseAge": "int16", "houseOrientation": "category",
+}
+
+
+def test_dtypes():
+    builder = ColumnarRecordBuilder(SCHEMA)
+    builder.append({
+        "houseLoc": "银港水晶城", "unitPrice": "12345.67", "houseArea": "89.5",
+        "houseSubway": "1", "houseAge": 2008, "houseOrientation": "南北",
+    })
+    df = builder.build()
+    assert pd.api.types.is_string_dtype(df["houseLoc"])
+    assert df.dtypes.astype(str).tolist()[1:] == ["float64", "float32", "Int8", "Int16", "category"]
+    assert df.iloc[0].tolist() == ["银港水晶城", 12345.67, np.float32(89.5), 1, 2008, "南北"]
+
+
+def test_missing_values():
+    builder = ColumnarRecordBuilder(SCHEMA)
+    builder.append({
+        "houseLoc": np.nan, "unitPrice": "暂无", "houseArea": None,
+        "houseSubway": "", "houseAge": np.nan, "houseOrientation": np.nan,
+    })
+    # 缺少的列同样视为缺失值
+    builder.append({})
+    df = builder.build()
+    assert df["houseLoc"].isna().all()
+    assert df["unitPrice"].isna().all() and df["houseArea"].isna().all()
+    assert df["houseSubway"].isna().all() and df["houseAge"].isna().all()
+    assert df["houseOrientation"].isna().all()
+    assert df["houseOrientation"].cat.categories.tolist() == []
+
+
+def test_integer_zero_is_not_missing():
+    builder = ColumnarRecordBuilder({"houseSubway": "int8"})
+    builder.extend([{"houseSubway": 0}, {"houseSubway": None}, {"houseSubway": "1"}])
+    assert builder.build()["houseSubway"].tolist() == [0, pd.NA, 1]
+
+
+def test_categories_in_order_of_appearance():
+    builder = ColumnarRecordBuilder({"houseOrientation": "category"})
+    builder.extend_columns({"houseOrientation": ["南", "北", None, "南"]})
+    column = builder.build()["houseOrientation"]
+    assert column.cat.categories.tolist() == ["南", "北"]
+    assert column.cat.codes.tolist() == [0, 1, -1, 0]
+
+
+def test_growth_keeps_records():
+    builder = ColumnarRecordBuilder({"unitPrice": "float64", "houseAge": "int16"}, capacity=1)
+    for i in range(100):
+        builder.append({"unitPrice": i + 0.5, "houseAge": None if i % 3 == 0 else i})
+    df = builder.build()
+    assert len(builder) == len(df) == 100 and builder.capacity == 128
+    assert df["unitPrice"].tolist() == [i + 0.5 for i in range(100)]
+    assert df["houseAge"].isna().tolist() == [i % 3 == 0 for i in range(100)]
+
+
+def test_extend_columns_lengths():
+    builder = ColumnarRecordBuilder(SCHEMA)
+    with pytest.raises(ValueError):
+        builder.extend_columns({"houseLoc": ["a", "b"], "unitPrice": [1.0]})
+    with pytest.raises(ValueError):
+        ColumnarRecordBuilder({"houseLoc": "text"})
+
+
+def test_prices_keep_float64_precision():
+    builder = ColumnarRecordBuilder(ListingExtractor.SCHEMA)
+    builder.append({"unitPrice": "16777217", "housePrice": "123.45", "houseArea": "89.01"})
+    df = builder.build()
+    # float32只有24位尾数，16777217无法精确表示
+    assert df.loc[0, "unitPrice"] == 16777217
+    assert df.loc[0, "housePrice"] == 123.45 and df.loc[0, "houseArea"] == 89.01
@@ -0,0 +1,85 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# Shared sessions, default timeout and the cookie policy        #
+# ============================================================= #
+import time
+import socket
+import threading
+import pytest
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from src.common.netTool.session import SessionPool
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+
+    """
+    每次响应都设置cookie，并在响应体中返回请求带上的cookie
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = (self.headers.get("Cookie") or "").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Set-Cookie", "captcha=1; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def sessions(monkeypatch) -> None:
+    monkeypatch.setattr(SessionPool, "_sessions", {})
+    yield
+    SessionPool.closeAll()
+
+
+@pytest.fixture
+def cookie_url() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CookieHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d/" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_same_name_same_session(sessions):
+    session = SessionPool.getSession("crawler", max_retries=0)
+    assert SessionPool.getSession("crawler") is session
+    assert SessionPool.getSession("baidu") is not session
+
+
+def test_default_timeout(sessions):
+    # 只接受连接、从不响应的服务器
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    session = SessionPool.getSession("slow", max_retries=0, timeout=0.2)
+    start_time = time.time()
+    with pytest.raises(requests.RequestException):
+        session.get("http://127.0.0.1:%d/" % listener.getsockname()[1])
+    assert time.time() - start_time < 2
+    listener.close()
+
+
+def test_cookies(sessions, cookie_url):
+    session = SessionPool.getSession("default")
+    session.get(cookie_url)
+    assert session.get(cookie_url).text == "captcha=1"
+
+    session = SessionPool.getSession("crawler", is_cookies=False)
+    session.get(cookie_url)
+    assert session.get(cookie_url).text == ""
+    assert len(session.cookies) == 0
@@ -0,0 +1,82 @@
+# ============================================================= #
+# @Author: Fantasy_Silence                                      #
+# @Time: 2024-06-12                                             #
+# @IDE: Visual Studio Code & PyCharm                            #
+# @Python: 3.9.7                                                #
+# ============================================================= #
+# @Description:                                                 #
+# StreamingHousingPipeline against HousingDataSpider +          #
+# HousingDataParser                                             #
+# ============================================================= #
+import zlib
+import pandas as pd
+import pytest
+
+from conftest import FakeBaiduSession, FakeResponse
+from src.common.fileTool.filesio import FilesIO
+from src.common.netTool.session import SessionPool
+from src.modules.datapreparation.datacrawler import HousingDataSpider
+from src.modules.datapreparation.dataparser import HousingDataParser
+from src.modules.datapreparation.streampipeline import StreamingHousingPipeline
+
+PAGE_NUM = 6
+
+
+class VaryingBaiduSession(FakeBaiduSession):
+
+    """
+    地址解析与周边设施检索的结果由请求参数决定，不同房源的坐标与数量不同，
+    部分房源落在同一个geohash格子内
+    """
+
+    def get(self, url: str, params: dict=None, **kwargs) -> FakeResponse:
+        with self._lock:
+            self.requests.append(dict(params))
+        if "address" in params:
+            h = zlib.crc32(params["address"].encode("utf-8")) % 200
+            return FakeResponse({"status": 0, "result": {"location": {
+                "lng": 104.0 + (h % 20) * 0.01, "lat": 30.6 + (h // 20) * 0.01
+            }}})
+        h = zlib.crc32((params["location"] + params["query"]).encode("utf-8"))
+        return FakeResponse({"status": 0, "results": [{}] * (h % 11)})
+
+
+@pytest.fixture
+def baidu(monkeypatch) -> VaryingBaiduSession:
+    session = VaryingBaiduSession()
+    monkeypatch.setitem(SessionPool._sessions, "baidu", session)
+    return session
+
+
+def make_pipeline(server, **kwargs) -> StreamingHousingPipeline:
+    spider = HousingDataSpider(
+        city="CD", base_url=server.base_url, save_path=FilesIO.getHTMLtext(),
+        rate=1000, burst=PAGE_NUM, page_num=PAGE_NUM, max_retry=2, is_start=False
+    )
+    return StreamingHousingPipeline(city="CD", spider=spider, is_save=False, **kwargs)
+
+
+@pytest.mark.parametrize("is_poi_cache", [False, True])
+def test_matches_parser(server, workspace, baidu, is_poi_cache):
+    streamed = make_pipeline(server, is_incremental=False, is_poi_cache=is_poi_cache).run()
+    assert len(streamed) == PAGE_NUM * server.listings_per_page
+    parsed = HousingDataParser(city="CD", is_incremental=False, is_poi_cache=is_poi_cache).df
+    pd.testing.assert_frame_equal(streamed, parsed, check_categorical=False)
+
+
+def test_streaming_matches_sequential_stages(server, workspace, baidu):
+    streamed = make_pipeline(server, is_incremental=False).run()
+    sequential = make_pipeline(server, is_incremental=False, is_streaming=False).run()
+    pd.testing.assert_frame_equal(streamed, sequential, check_categorical=False)
+
+
+def test_incremental_matches_parser(server, workspace, baidu):
+    # 先爬取全部页面，并由解析器生成已有的数据集
+    make_pipeline(server, is_incremental=False).run()
+    HousingDataParser(city="CD")
+    # 第2页换成新的房源后，两种方式都只处理新房源并合并到已有的数据集中
+    workspace.put("CD", 2, server.build_page(100))
+    streamed = make_pipeline(server).run()
+    parsed = HousingDataParser(city="CD").df
+    assert len(parsed) == (PAGE_NUM + 1) * server.listings_per_page
+    pd.testing.assert_frame_equal(streamed, parsed, check_categorical=False)